@@ -1,16 +1,34 @@
+import uuid
+
 import dash
 from dash import dcc, html
 import dash_bootstrap_components as dbc
 from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
 import dash_table
 import pandas as pd
 
 
 from src.app_utility.app_tools import get_most_recent_august_start, remove_starting_the
 from src.app_utility.create_output_tables import (
+    get_league_tables_chunked,
+    get_league_tables_streaming,
     get_team_and_league_data,
     get_team_and_league_data_filtered_summarised,
 )
+from src.app_utility.yaml_loader import load_yaml_file
+from src.data_prep.crawl_cancellation import (
+    CrawlCancelled,
+    crawl_context,
+    crawl_registry,
+)
+from src.data_prep.league_chunks import get_progress
+
+# Build tables from running aggregates or stored chunks for very large leagues
+yaml_file_path = "conf/parameters.yaml"
+parameters = load_yaml_file(yaml_file_path)
+streaming_aggregation = parameters["streaming_aggregation"]
+large_league = parameters["large_league"]
 
 # Initialize the Dash app
 external_stylesheets = [dbc.themes.BOOTSTRAP]
@@ -76,6 +94,7 @@ select_inputs = html.Div(
                             min=0,
                             max=99999999,
                             step=1,
+                            debounce=0.75,
                             style={"width": "100%"},
                         ),
                     ],
@@ -108,6 +127,18 @@ select_inputs = html.Div(
     ]
 )
 
+# Progress of large-league crawls, polled while a league is being crawled in chunks
+crawl_progress = html.Div(
+    children=[
+        html.Div(id="crawl-progress", style={"font-size": "smaller"}),
+        dcc.Interval(
+            id="crawl-progress-interval",
+            interval=2000,
+            disabled=not large_league["enabled"],
+        ),
+    ]
+)
+
 github_link = html.I(
     [
         dbc.Row(
@@ -256,28 +287,45 @@ current_seasons_table = table_dash_format(
 # Enclosing both intro and select_inputs within a grey box
 container = dbc.Card(
     [
-        dbc.CardBody([intro, select_inputs, github_link]),
+        dbc.CardBody([intro, select_inputs, crawl_progress, github_link]),
     ],
     style={"background-color": "#f8f9fa", "margin": "10px", "max-width": "700px"},
 )
 
-app.layout = html.Div(
-    children=[
-        container,
-        league_summary_table,
-        winner_table,
-        list_of_champions_table,
-        all_time_table,
-        season_overview_table,
-        current_seasons_table,
-        previous_seasons_table,
-        html.Br(),
-    ],
-    style={
-        "margin": "45px",
-        "max-width": "1280px",
-    },
-)
+
+def serve_layout():
+    """
+    Builds the app layout for each page load, with a new client ID.
+
+    The client ID identifies the browser tab, so a newer league request from the same tab
+    can cancel the crawl it supersedes.
+
+    Returns:
+    --------
+    layout : html.Div
+        The app layout.
+    """
+    return html.Div(
+        children=[
+            dcc.Store(id="client-id", data=str(uuid.uuid4())),
+            container,
+            league_summary_table,
+            winner_table,
+            list_of_champions_table,
+            all_time_table,
+            season_overview_table,
+            current_seasons_table,
+            previous_seasons_table,
+            html.Br(),
+        ],
+        style={
+            "margin": "45px",
+            "max-width": "1280px",
+        },
+    )
+
+
+app.layout = serve_layout
 
 
 @app.callback(
@@ -299,18 +347,24 @@ app.layout = html.Div(
     ],
     Input(component_id="league-id", component_property="value"),
     Input(component_id="year-select", component_property="value"),
+    State(component_id="client-id", component_property="data"),
     prevent_initial_call=True,
 )
-def dash_get_team_and_league_data(league_id, season_start_year):
+def dash_get_team_and_league_data(league_id, season_start_year, client_id):
     """
     This function retrieves various data elements related to a specific league for display on a dashboard.
 
+    A new request from the same client cancels the client's previous crawl if it is still
+    running, and the superseded callback returns without updating the page.
+
     Parameters:
     -----------
     league_id : int
         The ID of the league.
     season_start_year : int
         The starting year of the season.
+    client_id : str
+        The ID of the browser tab making the request.
 
     Returns:
     --------
@@ -344,36 +398,80 @@ def dash_get_team_and_league_data(league_id, season_start_year):
         DataTable containing information about the current season of the league.
     """
 
-    (
-        league_data,
-        manager_information,
-        team_ids,
-        final_gw_finished,
-        season_history,
-        season_current_df,
-        season_history_df,
-        current_gamekweek,
-        team_data,
-    ) = get_team_and_league_data(league_id=league_id)
-
-    (
-        league_name,
-        league_summary_kpis,
-        seasons_top_three_output,
-        titles_won_summary_output,
-        season_overview_output,
-        season_current_df_output,
-        season_history_df_output,
-        all_time_table_output,
-    ) = get_team_and_league_data_filtered_summarised(
-        league_data=league_data,
-        manager_information=manager_information,
-        team_ids=team_ids,
-        season_current_df=season_current_df,
-        season_history_df=season_history_df,
-        season_start_year=season_start_year[0],
-        team_data=team_data,
-    )
+    if league_id is None:
+        raise PreventUpdate
+
+    crawl_handle = crawl_registry.start(client_id)
+    try:
+        with crawl_context(crawl_handle):
+            if large_league["enabled"]:
+                (
+                    league_name,
+                    league_summary_kpis,
+                    seasons_top_three_output,
+                    titles_won_summary_output,
+                    season_overview_output,
+                    season_current_df_output,
+                    season_history_df_output,
+                    all_time_table_output,
+                    final_gw_finished,
+                    current_gamekweek,
+                ) = get_league_tables_chunked(
+                    league_id=league_id, season_start_year=season_start_year[0]
+                )
+            elif streaming_aggregation:
+                (
+                    league_name,
+                    league_summary_kpis,
+                    seasons_top_three_output,
+                    titles_won_summary_output,
+                    season_overview_output,
+                    season_current_df_output,
+                    season_history_df_output,
+                    all_time_table_output,
+                    final_gw_finished,
+                    current_gamekweek,
+                ) = get_league_tables_streaming(
+                    league_id=league_id, season_start_year=season_start_year[0]
+                )
+            else:
+                (
+                    league_data,
+                    manager_information,
+                    team_ids,
+                    final_gw_finished,
+                    season_history,
+                    season_current_df,
+                    season_history_df,
+                    current_gamekweek,
+                    team_data,
+                ) = get_team_and_league_data(
+                    league_id=league_id, season_start_year=season_start_year[0]
+                )
+    except CrawlCancelled:
+        raise PreventUpdate
+    finally:
+        crawl_registry.finish(client_id, crawl_handle)
+
+    if not (large_league["enabled"] or streaming_aggregation):
+        (
+            league_name,
+            league_summary_kpis,
+            seasons_top_three_output,
+            titles_won_summary_output,
+            season_overview_output,
+            season_current_df_output,
+            season_history_df_output,
+            all_time_table_output,
+        ) = get_team_and_league_data_filtered_summarised(
+            league_data=league_data,
+            manager_information=manager_information,
+            team_ids=team_ids,
+            season_current_df=season_current_df,
+            season_history_df=season_history_df,
+            season_start_year=season_start_year[0],
+            team_data=team_data,
+        )
 
     # league_summary_kpis.reset_index(inplace=True)
     league_summary_kpis.reset_index(inplace=True)
@@ -476,6 +574,36 @@ def dash_get_team_and_league_data(league_id, season_start_year):
     )
 
 
+@app.callback(
+    Output(component_id="crawl-progress", component_property="children"),
+    Input(component_id="crawl-progress-interval", component_property="n_intervals"),
+    State(component_id="league-id", component_property="value"),
+)
+def dash_get_crawl_progress(n_intervals, league_id):
+    """
+    Shows the progress of the league's large-league crawl.
+
+    Parameters:
+    -----------
+    n_intervals : int
+        The number of times the progress interval has fired.
+    league_id : int
+        The ID of the league.
+
+    Returns:
+    --------
+    progress_text : str
+        The pages and teams crawled so far, or an empty string if the league is not being
+        crawled in chunks.
+    """
+    if league_id is None:
+        return ""
+    progress = get_progress(league_id=int(league_id))
+    if progress is None or progress["complete"]:
+        return ""
+    return f"Crawled {progress['pages']:,} pages ({progress['teams']:,} teams)..."
+
+
 if __name__ == "__main__":
     # app.run_server(debug=False)
     app.run_server(debug=False, host="0.0.0.0")
@@ -1,11 +1,24 @@
+import collections
+import copy
+import threading
+import time
+
 import pandas as pd
 
-from src.data_prep.load_data import (
-    get_league_data,
-    get_league_history,
-    get_current_season_information,
-    get_managers_information_league,
+from src.app_utility.yaml_loader import load_yaml_file
+from src.data_prep.load_data import get_current_season_information
+from src.data_prep import league_database, league_store
+from src.data_prep.entry_records import ManagerProfile
+from src.data_prep.league_chunks import iter_chunks
+from src.data_prep.league_crawl import (
+    crawl_league,
+    crawl_league_in_chunks,
+    refresh_league,
 )
+from src.data_prep.crawl_cancellation import CrawlCancelled, raise_if_cancelled
+from src.data_prep.fetch_scheduler import fetch_key_context
+from src.data_prep.season_aggregates import SeasonAggregator
+from src.data_prep.single_flight import SingleFlight
 from src.data_prep.reshape_data import (
     summarise_season_current,
     summarise_season_history,
@@ -31,13 +44,95 @@ from src.data_prep.output_league_summary import (
     get_league_summary_kpis,
 )
 
+# Set how long the aggregates of large leagues are kept
+yaml_file_path = "conf/parameters.yaml"
+parameters = load_yaml_file(yaml_file_path)
+league_aggregates_parameters = parameters["league_aggregates"]
+
+# Concurrent requests for the same league share one crawl
+league_flight = SingleFlight()
+
+# Aggregates of recently built large leagues, see get_league_aggregates
+league_aggregates = collections.OrderedDict()
+league_aggregates_lock = threading.Lock()
+
+
+def get_team_and_league_data(league_id, season_start_year=None):
+    """
+    Gets the league, team and season data for a league.
 
-def get_team_and_league_data(league_id):
-    league_data, team_data = get_league_data(league_id=league_id)
+    Concurrent calls for the same league and start year, for example from several user
+    sessions, wait on one crawl and each receive their own copy of its result. The crawl's
+    fetches go into the league's own queue on the fair-share fetch scheduler.
+
+    Raises CrawlCancelled if the current crawl handle is cancelled while the data is fetched.
+
+    Parameters
+    ----------
+    league_id : int
+        The ID of the league.
+    season_start_year : int, optional
+        The first season the caller will use. Earlier seasons may be left out of the season
+        history when it is read from the league store.
+
+    Returns
+    -------
+    tuple
+        The values returned by build_team_and_league_data.
+    """
+    return run_league_flight(
+        league_id,
+        (int(league_id), season_start_year),
+        build_team_and_league_data,
+        league_id,
+        season_start_year,
+    )
 
-    manager_information = get_managers_information_league(team_data=team_data)
 
-    season_history = get_league_history(team_data=team_data)
+def run_league_flight(league_id, key, function, *args):
+    """
+    Runs a league build once for all concurrent callers with the same key.
+
+    Parameters
+    ----------
+    league_id : int
+        The ID of the league, used as the league's fetch scheduler key.
+    key : hashable
+        The single-flight key of the build.
+    function : callable
+        The build function.
+    *args
+        Arguments for the build function.
+
+    Returns
+    -------
+    result : object
+        The result of the build, copied for callers that shared another caller's build.
+    """
+    while True:
+        try:
+            with fetch_key_context(f"league-{int(league_id)}"):
+                result, shared = league_flight.do(key, function, *args)
+            break
+        except CrawlCancelled:
+            # A shared crawl that was cancelled by its own client is run again
+            raise_if_cancelled()
+    if shared:
+        result = copy.deepcopy(result)
+    return result
+
+
+def build_team_and_league_data(league_id, season_start_year=None):
+    if league_store.league_store_enabled or league_database.league_database_enabled:
+        stored = load_team_and_league_data(
+            league_id=league_id, season_start_year=season_start_year
+        )
+        if stored is not None:
+            return stored
+
+    league_data, team_data, manager_information, season_history = refresh_league(
+        league_id=league_id
+    )
 
     final_gw_finished, current_season_year, team_ids, current_gamekweek = (
         get_current_season_information()
@@ -53,6 +148,17 @@ def get_team_and_league_data(league_id):
 
     season_history_df = summarise_season_history(season_history=season_history)
 
+    if league_store.league_store_enabled:
+        league_store.write_league_tables(
+            league_id=league_id,
+            league_name=get_league_name(league_data=league_data),
+            season_name=current_season_year,
+            season_history_df=season_history_df,
+            season_current_df=season_current_df,
+            final_gw_finished=final_gw_finished,
+            current_gamekweek=current_gamekweek,
+        )
+
     return (
         league_data,
         manager_information,
@@ -66,6 +172,90 @@ def get_team_and_league_data(league_id):
     )
 
 
+def load_team_and_league_data(league_id, season_start_year=None):
+    """
+    Loads a league's data from the Parquet league store or the league database instead
+    of crawling it.
+
+    The Parquet store is read first. Its manager information and team rows are rebuilt
+    from the stored current season table, which holds the fields the output tables use.
+
+    Parameters
+    ----------
+    league_id : int
+        The ID of the league.
+    season_start_year : int, optional
+        Only the Parquet partitions of seasons starting in or after this year are read.
+        Every stored column is used by the output tables, so all columns are read.
+
+    Returns
+    -------
+    tuple or None
+        The values returned by build_team_and_league_data, with None for the raw season
+        history, or None if the league is not stored or its tables are stale.
+    """
+    final_gw_finished, current_season_year, team_ids, current_gamekweek = (
+        get_current_season_information()
+    )
+    tables = None
+    if league_store.league_store_enabled:
+        tables = league_store.read_league_tables(
+            league_id=league_id, season_start_year=season_start_year
+        )
+    if tables is None and league_database.league_database_enabled:
+        tables = league_database.read_league_tables(
+            league_id=league_id, team_ids=team_ids
+        )
+    if tables is None:
+        return None
+
+    # Tables stored in an earlier gameweek or season are rebuilt
+    if tables["season_name"] != current_season_year or tables[
+        "current_gamekweek"
+    ] != str(current_gamekweek):
+        return None
+
+    season_current_df = tables["season_current_df"]
+    # The league database stores the members' profiles and standings rows, the
+    # Parquet store only the current season table they are rebuilt from
+    manager_information = tables.get("manager_information")
+    team_data = tables.get("team_data")
+    if manager_information is None:
+        manager_information = [
+            ManagerProfile(
+                entry=row.team_id,
+                summary_overall_rank=row.rank,
+                player_region_iso_code_long=row.nationality,
+                favourite_team=row.favourite_team,
+            )
+            for row in season_current_df.itertuples(index=False)
+        ]
+        team_data = [
+            {
+                "entry": row.team_id,
+                "entry_name": row.team_name,
+                "player_name": row.manager_name,
+                "total": row.total_points,
+                "rank": row.league_position,
+            }
+            for row in season_current_df.itertuples(index=False)
+        ]
+
+    league_data = {"league": {"name": tables["league_name"]}}
+
+    return (
+        league_data,
+        manager_information,
+        team_ids,
+        tables["final_gw_finished"],
+        None,
+        season_current_df,
+        tables["season_history_df"],
+        current_gamekweek,
+        team_data,
+    )
+
+
 def get_team_and_league_data_filtered_summarised(
     league_data,
     manager_information,
@@ -133,3 +323,218 @@ def get_team_and_league_data_filtered_summarised(
         season_history_df_output,
         all_time_table_output,
     )
+
+
+def get_league_aggregates(key, function, league_id):
+    """
+    Gets the aggregates of every season of a large league, building them once per league.
+
+    The aggregates of the last `cache_size` leagues are kept for `max_age` seconds, see
+    `league_aggregates` in conf/parameters.yaml, so a new start year only filters them
+    again instead of crawling the league. Concurrent builds of a league share one crawl.
+
+    Parameters
+    ----------
+    key : tuple
+        The cache and single-flight key of the build.
+    function : callable
+        Builds the aggregates from the league ID.
+    league_id : int
+        The ID of the league.
+
+    Returns
+    -------
+    aggregates : tuple
+        The league data, team data, manager information and SeasonAggregator of the
+        league. They are shared between callers and must not be modified.
+    """
+    with league_aggregates_lock:
+        cached = league_aggregates.get(key)
+        if cached is not None and time.monotonic() < cached[0]:
+            league_aggregates.move_to_end(key)
+            return cached[1]
+
+    aggregates = run_league_flight(league_id, key, function, league_id)
+
+    with league_aggregates_lock:
+        expires_at = time.monotonic() + league_aggregates_parameters["max_age"]
+        league_aggregates[key] = (expires_at, aggregates)
+        league_aggregates.move_to_end(key)
+        while len(league_aggregates) > league_aggregates_parameters["cache_size"]:
+            league_aggregates.popitem(last=False)
+    return aggregates
+
+
+def get_league_tables_streaming(league_id, season_start_year):
+    """
+    Gets the output tables of a league from running per-team aggregates.
+
+    Used for leagues beyond `page_limit`: every standings page is fetched and each team's
+    past seasons are folded into a SeasonAggregator as they arrive, so the full season
+    history is never held in memory. The previous seasons table lists the podium finishes
+    of each season rather than every team's seasons.
+
+    The aggregates cover every season and are kept per league, see get_league_aggregates,
+    so only the tables are built again for a new start year.
+
+    Parameters
+    ----------
+    league_id : int
+        The ID of the league.
+    season_start_year : int
+        The start year of the seasons to include.
+
+    Returns
+    -------
+    tuple
+        The values returned by get_team_and_league_data_filtered_summarised, followed by
+        final_gw_finished and current_gamekweek.
+    """
+    league_data, team_data, manager_information, season_aggregator = (
+        get_league_aggregates(
+            ("aggregates", int(league_id)), build_league_aggregates_streaming, league_id
+        )
+    )
+    return build_league_tables_from_aggregates(
+        league_data=league_data,
+        team_data=team_data,
+        manager_information=manager_information,
+        season_aggregator=season_aggregator,
+        season_start_year=season_start_year,
+    )
+
+
+def build_league_aggregates_streaming(league_id):
+    return crawl_league(
+        league_id=league_id,
+        page_limit=None,
+        season_history=SeasonAggregator(),
+    )
+
+
+def get_league_tables_chunked(league_id, season_start_year):
+    """
+    Gets the output tables of a league crawled in chunks by the large-league mode.
+
+    Every standings page is crawled in chunks that are stored as they finish, see
+    crawl_league_in_chunks, so an interrupted crawl resumes where it stopped. The
+    aggregates are then built from the stored chunks, one chunk at a time, through a
+    SeasonAggregator, and kept per league, see get_league_aggregates.
+
+    Parameters
+    ----------
+    league_id : int
+        The ID of the league.
+    season_start_year : int
+        The start year of the seasons to include.
+
+    Returns
+    -------
+    tuple
+        The values returned by get_league_tables_streaming.
+    """
+    league_data, team_data, manager_information, season_aggregator = (
+        get_league_aggregates(
+            ("chunked", int(league_id)), build_league_aggregates_chunked, league_id
+        )
+    )
+    return build_league_tables_from_aggregates(
+        league_data=league_data,
+        team_data=team_data,
+        manager_information=manager_information,
+        season_aggregator=season_aggregator,
+        season_start_year=season_start_year,
+    )
+
+
+def build_league_aggregates_chunked(league_id):
+    state = crawl_league_in_chunks(league_id=league_id)
+
+    season_aggregator = SeasonAggregator()
+    team_data = []
+    manager_information = []
+    for chunk_team_data, chunk_manager_information, histories in iter_chunks(
+        int(league_id)
+    ):
+        team_data.extend(chunk_team_data)
+        manager_information.extend(chunk_manager_information)
+        for team in chunk_team_data:
+            season_aggregator.add_team(
+                team=team, records=histories.get(team["entry"], ())
+            )
+
+    return state.league_data, team_data, manager_information, season_aggregator
+
+
+def build_league_tables_from_aggregates(
+    league_data, team_data, manager_information, season_aggregator, season_start_year
+):
+    final_gw_finished, current_season_year, team_ids, current_gamekweek = (
+        get_current_season_information()
+    )
+
+    season_current_df = summarise_season_current(
+        league_data=league_data,
+        team_data=team_data,
+        manager_information=manager_information,
+        current_season_year=current_season_year,
+        team_ids=team_ids,
+    )
+
+    # Podium finishes hold every season's champion, best rank and most points
+    podium_df = season_aggregator.get_podium_df(season_start_year=season_start_year)
+
+    season_overview = season_aggregator.get_season_overview(
+        manager_information=manager_information,
+        team_ids=team_ids,
+        season_start_year=season_start_year,
+    )
+
+    current_champions_output = get_current_champions(
+        df=podium_df, season_overview=season_overview
+    )
+
+    most_season_won_teams_str_output = get_most_wins(df=season_overview)
+    best_rank_teams_str = get_best_rank_points(df=podium_df, column="rank")
+
+    best_points_teams_str_output = get_best_rank_points(
+        df=podium_df, column="total_points"
+    )
+
+    number_of_teams_league = get_number_of_teams_league(team_data=team_data)
+
+    first_Season_year_data = get_first_Season_year_data(df=podium_df)
+
+    league_name = get_league_name(league_data=league_data)
+
+    league_summary_kpis = get_league_summary_kpis(
+        first_Season_year_data=first_Season_year_data,
+        number_of_teams_league=number_of_teams_league,
+        current_champions_output=current_champions_output,
+        most_season_won_teams_str_output=most_season_won_teams_str_output,
+        best_points_teams_str_output=best_points_teams_str_output,
+        best_rank_teams_str=best_rank_teams_str,
+    )
+
+    seasons_top_three_output = get_seasons_by_top_three_teams(df=podium_df)
+
+    titles_won_summary_output = get_titles_won_summary(df=season_overview)
+    season_overview_output = reformat_season_overview(df=season_overview)
+    season_current_df_output = reformat_season_current(df=season_current_df)
+    season_history_df_output = reformat_season_history(df=podium_df)
+    all_time_table_output = season_aggregator.get_all_time_table(
+        season_start_year=season_start_year
+    )
+
+    return (
+        league_name,
+        league_summary_kpis,
+        seasons_top_three_output,
+        titles_won_summary_output,
+        season_overview_output,
+        season_current_df_output,
+        season_history_df_output,
+        all_time_table_output,
+        final_gw_finished,
+        current_gamekweek,
+    )
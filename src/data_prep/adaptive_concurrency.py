@@ -0,0 +1,124 @@
+import threading
+
+from src.app_utility.yaml_loader import load_yaml_file
+
+# Set adaptive concurrency bounds
+yaml_file_path = "conf/parameters.yaml"
+parameters = load_yaml_file(yaml_file_path)
+adaptive_concurrency = parameters["adaptive_concurrency"]
+fetch_concurrency = parameters["fetch_concurrency"]
+
+
+class AIMDLimiter:
+    """
+    Limits the number of requests in flight with additive increase, multiplicative decrease.
+
+    While responses are healthy the limit grows by `increase` per limit's worth of
+    responses, so roughly one extra slot per round of requests. A 403, 429, 5xx, timeout or
+    latency spike multiplies the limit by `decrease_factor`. A latency spike is a response
+    slower than `spike_factor` times the smoothed latency of healthy responses.
+
+    The limit is decreased at most once per round trip: bad responses to requests started
+    before the last decrease are ignored, so a burst of concurrent errors only cuts it once.
+
+    Parameters
+    ----------
+    initial : float
+        The starting limit.
+    minimum : float
+        The lowest limit.
+    maximum : float
+        The highest limit.
+    increase : float
+        The additive increase per round of healthy responses.
+    decrease_factor : float
+        The multiplicative decrease on throttling, between 0 and 1.
+    spike_factor : float
+        How much slower than the smoothed latency a response must be to count as a spike.
+    """
+
+    def __init__(
+        self, initial, minimum, maximum, increase, decrease_factor, spike_factor
+    ):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.spike_factor = spike_factor
+        self.in_flight = 0
+        self.started = 0
+        self.last_decrease = 0
+        self.smoothed_latency = None
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        """
+        Blocks until a request slot is free under the current limit.
+
+        Returns
+        -------
+        ticket : int
+            The request's start sequence number, to pass back to `release`.
+        """
+        with self.condition:
+            while self.in_flight >= max(1, int(self.limit)):
+                self.condition.wait()
+            self.in_flight += 1
+            self.started += 1
+            return self.started
+
+    def release(self, ticket, latency, outcome):
+        """
+        Frees a request slot and adjusts the limit from the request's outcome.
+
+        Parameters
+        ----------
+        ticket : int
+            The ticket returned by `acquire` for the request.
+        latency : float
+            The request latency in seconds.
+        outcome : str
+            'ok' for a healthy response, or 'throttled' for a 403, 429, 5xx or timeout.
+        """
+        with self.condition:
+            self.in_flight -= 1
+            spike = (
+                self.smoothed_latency is not None
+                and latency > self.spike_factor * self.smoothed_latency
+            )
+            if outcome != "ok" or spike:
+                # Requests started before the last decrease saw the old limit
+                if ticket > self.last_decrease:
+                    self.limit = max(self.minimum, self.limit * self.decrease_factor)
+                    self.last_decrease = self.started
+            else:
+                self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+                if self.smoothed_latency is None:
+                    self.smoothed_latency = latency
+                else:
+                    self.smoothed_latency = 0.9 * self.smoothed_latency + 0.1 * latency
+            self.condition.notify_all()
+
+    def get_limit(self):
+        """
+        Gets the current concurrency limit.
+
+        Returns
+        -------
+        limit : int
+            The number of requests currently allowed in flight.
+        """
+        with self.condition:
+            return max(1, int(self.limit))
+
+
+# Process-wide limiter used by every load_data request
+concurrency_limiter = AIMDLimiter(
+    initial=adaptive_concurrency["initial"],
+    minimum=adaptive_concurrency["minimum"],
+    maximum=fetch_concurrency,
+    increase=adaptive_concurrency["increase"],
+    decrease_factor=adaptive_concurrency["decrease_factor"],
+    spike_factor=adaptive_concurrency["spike_factor"],
+)
@@ -0,0 +1,160 @@
+import contextlib
+import contextvars
+import threading
+
+
+class CrawlCancelled(Exception):
+    """
+    Raised inside a crawl that was cancelled, for example because the same client
+    started a newer crawl.
+    """
+
+
+class CrawlHandle:
+    """
+    A handle used to cancel one crawl's queued and in-flight fetches.
+
+    Fetches submitted to the fetch scheduler while the handle is current are tracked, so
+    cancelling the handle cancels the ones still queued. Fetches already running stop
+    before their next network request.
+    """
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self.futures = set()
+        self.lock = threading.Lock()
+
+    def track(self, future):
+        """
+        Tracks a queued fetch so it can be cancelled with the crawl.
+
+        Parameters
+        ----------
+        future : concurrent.futures.Future
+            The future of the queued fetch.
+        """
+        with self.lock:
+            if self.cancelled.is_set():
+                future.cancel()
+                return
+            self.futures.add(future)
+        future.add_done_callback(self._forget)
+
+    def _forget(self, future):
+        with self.lock:
+            self.futures.discard(future)
+
+    def cancel(self):
+        """
+        Cancels the crawl and every fetch of it that has not started yet.
+        """
+        with self.lock:
+            self.cancelled.set()
+            futures = list(self.futures)
+            self.futures.clear()
+        for future in futures:
+            future.cancel()
+
+    def is_cancelled(self):
+        """
+        Checks whether the crawl was cancelled.
+
+        Returns
+        -------
+        cancelled : bool
+            True if the crawl was cancelled.
+        """
+        return self.cancelled.is_set()
+
+
+# The crawl that fetches submitted from the current context belong to
+current_crawl = contextvars.ContextVar("current_crawl", default=None)
+
+
+@contextlib.contextmanager
+def crawl_context(handle):
+    """
+    Makes `handle` the current crawl for the fetches made inside the block.
+
+    Parameters
+    ----------
+    handle : CrawlHandle
+        The crawl's handle.
+    """
+    token = current_crawl.set(handle)
+    try:
+        yield handle
+    finally:
+        current_crawl.reset(token)
+
+
+def is_current_crawl_cancelled():
+    """
+    Checks whether the current crawl, if any, was cancelled.
+
+    Returns
+    -------
+    cancelled : bool
+        True if there is a current crawl and it was cancelled.
+    """
+    handle = current_crawl.get()
+    return handle is not None and handle.is_cancelled()
+
+
+def raise_if_cancelled():
+    """
+    Raises CrawlCancelled if the current crawl was cancelled.
+    """
+    if is_current_crawl_cancelled():
+        raise CrawlCancelled()
+
+
+class CrawlRegistry:
+    """
+    Keeps the latest crawl of each client, cancelling the crawl it supersedes.
+    """
+
+    def __init__(self):
+        self.crawls = {}
+        self.lock = threading.Lock()
+
+    def start(self, client_id):
+        """
+        Starts a new crawl for a client and cancels the client's previous crawl.
+
+        Parameters
+        ----------
+        client_id : str
+            The ID of the client, for example a browser session.
+
+        Returns
+        -------
+        handle : CrawlHandle
+            The handle of the new crawl.
+        """
+        handle = CrawlHandle()
+        with self.lock:
+            previous = self.crawls.get(client_id)
+            self.crawls[client_id] = handle
+        if previous is not None:
+            previous.cancel()
+        return handle
+
+    def finish(self, client_id, handle):
+        """
+        Removes a finished crawl unless a newer crawl has replaced it.
+
+        Parameters
+        ----------
+        client_id : str
+            The ID of the client.
+        handle : CrawlHandle
+            The handle of the finished crawl.
+        """
+        with self.lock:
+            if self.crawls.get(client_id) is handle:
+                del self.crawls[client_id]
+
+
+# Process-wide registry of the latest crawl per client
+crawl_registry = CrawlRegistry()
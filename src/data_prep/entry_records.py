@@ -0,0 +1,124 @@
+import json
+from typing import NamedTuple, Optional
+
+from src.data_prep import json_stream
+
+# Keys of the entry/{id}/ response that are kept, in the order the API returns them
+profile_keys = [
+    "id",
+    "favourite_team",
+    "player_region_iso_code_long",
+    "summary_overall_rank",
+]
+
+
+class ManagerProfile(NamedTuple):
+    """
+    The manager information used by the app from an entry/{id}/ response.
+    """
+
+    entry: int
+    summary_overall_rank: Optional[int]
+    player_region_iso_code_long: Optional[str]
+    favourite_team: Optional[int]
+
+
+class SeasonRecord(NamedTuple):
+    """
+    One past-season row from an entry/{id}/history/ response.
+    """
+
+    season_name: str
+    total_points: Optional[int]
+    rank: Optional[int]
+
+
+def get_manager_profile(dictionary):
+    """
+    Builds a ManagerProfile from a decoded entry/{id}/ response.
+
+    Parameters
+    ----------
+    dictionary : dict
+        The decoded entry/{id}/ response, or the subset of its keys in `profile_keys`.
+
+    Returns
+    -------
+    profile : ManagerProfile
+        The manager information used by the app.
+    """
+    profile = ManagerProfile(
+        entry=dictionary.get("id"),
+        summary_overall_rank=dictionary.get("summary_overall_rank"),
+        player_region_iso_code_long=dictionary.get("player_region_iso_code_long"),
+        favourite_team=dictionary.get("favourite_team"),
+    )
+    return profile
+
+
+def get_season_records(past):
+    """
+    Builds SeasonRecords from the 'past' rows of an entry/{id}/history/ response.
+
+    Parameters
+    ----------
+    past : list
+        The decoded 'past' rows.
+
+    Returns
+    -------
+    records : tuple
+        One SeasonRecord per past season.
+    """
+    records = tuple(
+        SeasonRecord(
+            season_name=item.get("season_name"),
+            total_points=item.get("total_points"),
+            rank=item.get("rank"),
+        )
+        for item in past
+    )
+    return records
+
+
+def decode_manager_profile(body):
+    """
+    Decodes an entry/{id}/ response body straight into a ManagerProfile.
+
+    The 'leagues' object, which holds most of the payload, is skipped without being decoded.
+
+    Parameters
+    ----------
+    body : bytes or str
+        The response body.
+
+    Returns
+    -------
+    profile : ManagerProfile
+        The manager information used by the app.
+    """
+    return get_manager_profile(
+        json_stream.decode_selected_keys(body, keys=profile_keys)
+    )
+
+
+def decode_season_records(body):
+    """
+    Decodes an entry/{id}/history/ response body into SeasonRecords.
+
+    The whole body is decoded with json.loads. A history body is small, so skipping its
+    'current' and 'chips' arrays with json_stream is slower than the C decoder, and the
+    decoded dictionary is dropped as soon as the records are built.
+
+    Parameters
+    ----------
+    body : bytes or str
+        The response body.
+
+    Returns
+    -------
+    records : tuple
+        One SeasonRecord per past season.
+    """
+    past = json.loads(body).get("past") or []
+    return get_season_records(past)
@@ -0,0 +1,143 @@
+import collections
+import threading
+import time
+
+from src.app_utility.yaml_loader import load_yaml_file
+
+# Set entry store size and freshness
+yaml_file_path = "conf/parameters.yaml"
+parameters = load_yaml_file(yaml_file_path)
+entry_store_parameters = parameters["entry_store"]
+
+
+class EntryStore:
+    """
+    A process-wide store of FPL entries keyed by entry ID.
+
+    Each entry holds its ManagerProfile and a tuple of SeasonRecords from its history.
+    An entry that sits in many leagues is fetched once and then read from the store by
+    every league build until it goes stale. The least recently used entries are evicted
+    once the store holds `max_entries` entries.
+
+    Parameters
+    ----------
+    profile_ttl : float
+        Seconds a profile stays fresh.
+    history_ttl : float
+        Seconds the past seasons stay fresh.
+    max_entries : int
+        The maximum number of entries kept.
+    """
+
+    def __init__(self, profile_ttl, history_ttl, max_entries):
+        self.ttl = {"profile": profile_ttl, "history": history_ttl}
+        self.max_entries = max_entries
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def _get_many(self, kind, entry_ids, now):
+        now = time.time() if now is None else now
+        found = {}
+        missing = []
+        with self.lock:
+            for entry_id in entry_ids:
+                entry = self.entries.get(entry_id)
+                if entry is not None and kind in entry:
+                    value, stored_at = entry[kind]
+                    if now - stored_at < self.ttl[kind]:
+                        found[entry_id] = value
+                        self.entries.move_to_end(entry_id)
+                        continue
+                missing.append(entry_id)
+        return found, missing
+
+    def _put(self, kind, entry_id, value, now):
+        now = time.time() if now is None else now
+        with self.lock:
+            entry = self.entries.setdefault(entry_id, {})
+            entry[kind] = (value, now)
+            self.entries.move_to_end(entry_id)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def get_profiles(self, entry_ids, now=None):
+        """
+        Gets the fresh profiles for a list of entries.
+
+        Parameters
+        ----------
+        entry_ids : list
+            The entry IDs to look up.
+        now : float, optional
+            The current time as a Unix timestamp.
+
+        Returns
+        -------
+        found : dict
+            Fresh ManagerProfiles keyed by entry ID.
+        missing : list
+            Entry IDs that are not stored or are stale, in the order given.
+        """
+        return self._get_many("profile", entry_ids, now)
+
+    def put_profile(self, entry_id, profile, now=None):
+        """
+        Stores the profile of an entry.
+
+        Parameters
+        ----------
+        entry_id : int
+            The entry ID.
+        profile : ManagerProfile
+            The manager's profile.
+        now : float, optional
+            The current time as a Unix timestamp.
+        """
+        self._put("profile", entry_id, profile, now)
+
+    def get_histories(self, entry_ids, now=None):
+        """
+        Gets the fresh past seasons for a list of entries.
+
+        Parameters
+        ----------
+        entry_ids : list
+            The entry IDs to look up.
+        now : float, optional
+            The current time as a Unix timestamp.
+
+        Returns
+        -------
+        found : dict
+            Tuples of SeasonRecords keyed by entry ID.
+        missing : list
+            Entry IDs that are not stored or are stale, in the order given.
+        """
+        return self._get_many("history", entry_ids, now)
+
+    def put_history(self, entry_id, past, now=None):
+        """
+        Stores the past seasons of an entry.
+
+        Parameters
+        ----------
+        entry_id : int
+            The entry ID.
+        past : tuple
+            The entry's SeasonRecords.
+        now : float, optional
+            The current time as a Unix timestamp.
+        """
+        self._put("history", entry_id, past, now)
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
+
+
+# Process-wide store shared by every league build
+entry_store = EntryStore(
+    profile_ttl=entry_store_parameters["profile_ttl"],
+    history_ttl=entry_store_parameters["history_ttl"],
+    max_entries=entry_store_parameters["max_entries"],
+)
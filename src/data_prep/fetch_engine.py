@@ -0,0 +1,128 @@
+import asyncio
+import concurrent.futures
+import contextvars
+
+from src.app_utility.yaml_loader import load_yaml_file
+from src.data_prep import crawl_cancellation, fetch_scheduler
+
+# Set global fetch concurrency
+yaml_file_path = "conf/parameters.yaml"
+parameters = load_yaml_file(yaml_file_path)
+fetch_concurrency = parameters["fetch_concurrency"]
+
+
+def get_executor():
+    """
+    Returns the process-wide fetch scheduler that runs the blocking HTTP calls.
+
+    The scheduler is shared by every event loop, so `fetch_concurrency` caps the number of
+    requests in flight across all callers in the process, and callers are served fairly.
+
+    Returns
+    -------
+    executor : fetch_scheduler.FetchScheduler
+        The shared scheduler.
+    """
+    return fetch_scheduler.scheduler
+
+
+async def fetch_urls_async(urls, fetch, concurrency=fetch_concurrency, ordered=True):
+    """
+    Fetches multiple URLs on the running event loop.
+
+    A bounded semaphore limits how many of this call's requests are in flight at once.
+    Each request runs `fetch` on the shared executor.
+
+    Parameters
+    ----------
+    urls : list
+        A list of URLs to fetch.
+    fetch : callable
+        A function taking a URL and returning the fetched data, or None on failure.
+    concurrency : int
+        The maximum number of requests in flight for this call.
+    ordered : bool
+        If True, results are returned in the same order as the URLs. If False, results
+        are returned in completion order.
+
+    Returns
+    -------
+    results : list
+        A list of (url, data) tuples. Data is None for failed requests.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.BoundedSemaphore(concurrency)
+    executor = get_executor()
+
+    async def fetch_one(url):
+        async with semaphore:
+            data = await loop.run_in_executor(executor, fetch, url)
+        return url, data
+
+    tasks = [asyncio.ensure_future(fetch_one(url)) for url in urls]
+    try:
+        if ordered:
+            return list(await asyncio.gather(*tasks))
+        return [await task for task in asyncio.as_completed(tasks)]
+    except asyncio.CancelledError:
+        # Fetches are cancelled on the scheduler when their crawl is cancelled
+        crawl_cancellation.raise_if_cancelled()
+        raise
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def run_coroutine(coroutine):
+    """
+    Runs a coroutine to completion from synchronous code.
+
+    When the calling thread already has a running event loop (for example inside an async
+    web server), the coroutine is run on a new loop in a helper thread instead.
+
+    Parameters
+    ----------
+    coroutine : coroutine
+        The coroutine to run.
+
+    Returns
+    -------
+    result : object
+        The value returned by the coroutine.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    # Copy the context so the helper thread submits to the caller's fetch queue
+    context = contextvars.copy_context()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(context.run, asyncio.run, coroutine).result()
+
+
+def fetch_urls(urls, fetch, concurrency=fetch_concurrency, ordered=True):
+    """
+    Fetches multiple URLs with the asyncio engine from synchronous code.
+
+    Parameters
+    ----------
+    urls : list
+        A list of URLs to fetch.
+    fetch : callable
+        A function taking a URL and returning the fetched data, or None on failure.
+    concurrency : int
+        The maximum number of requests in flight for this call.
+    ordered : bool
+        If True, results are returned in the same order as the URLs.
+
+    Returns
+    -------
+    results : list
+        A list of (url, data) tuples. Data is None for failed requests.
+    """
+    return run_coroutine(
+        fetch_urls_async(
+            urls=urls, fetch=fetch, concurrency=concurrency, ordered=ordered
+        )
+    )
@@ -0,0 +1,164 @@
+import collections
+import concurrent.futures
+import contextlib
+import contextvars
+import threading
+
+from src.app_utility.yaml_loader import load_yaml_file
+from src.data_prep import crawl_cancellation
+
+# Set global fetch concurrency
+yaml_file_path = "conf/parameters.yaml"
+parameters = load_yaml_file(yaml_file_path)
+fetch_concurrency = parameters["fetch_concurrency"]
+
+# The queue that fetches submitted from the current context go into
+fetch_key = contextvars.ContextVar("fetch_key", default="default")
+
+
+@contextlib.contextmanager
+def fetch_key_context(key):
+    """
+    Sends the fetches submitted inside the block to the queue for `key`.
+
+    Parameters
+    ----------
+    key : hashable
+        The queue key, for example a session or league ID.
+    """
+    token = fetch_key.set(key)
+    try:
+        yield
+    finally:
+        fetch_key.reset(token)
+
+
+class FetchScheduler(concurrent.futures.Executor):
+    """
+    A process-wide fair-share executor for fetches.
+
+    Work is queued per key (a session or league) and the worker threads take one item
+    from each non-empty queue in turn, so a 12-team league is not stuck behind a
+    5,000-entry crawl. The number of worker threads is the global concurrency cap.
+
+    Each call runs in a copy of the submitter's context, and calls submitted during a
+    crawl are tracked by its handle so cancelling the crawl cancels them while queued.
+
+    Parameters
+    ----------
+    max_workers : int
+        The maximum number of fetches running at once across all queues.
+    """
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self.queues = collections.OrderedDict()
+        self.condition = threading.Condition()
+        self.workers = []
+        self.idle_workers = 0
+        self.is_shutdown = False
+
+    def submit(self, fn, /, *args, **kwargs):
+        """
+        Queues a call under the current fetch key, as part of the current crawl.
+
+        Parameters
+        ----------
+        fn : callable
+            The function to run.
+
+        Returns
+        -------
+        future : concurrent.futures.Future
+            A future for the function's result.
+        """
+        future = concurrent.futures.Future()
+        key = fetch_key.get()
+        context = contextvars.copy_context()
+        with self.condition:
+            if self.is_shutdown:
+                raise RuntimeError("cannot schedule new fetches after shutdown")
+            self.queues.setdefault(key, collections.deque()).append(
+                (future, context, fn, args, kwargs)
+            )
+            if self.idle_workers == 0 and len(self.workers) < self.max_workers:
+                worker = threading.Thread(
+                    target=self._run_worker,
+                    name=f"fetch-{len(self.workers)}",
+                    daemon=True,
+                )
+                self.workers.append(worker)
+                worker.start()
+            self.condition.notify()
+
+        handle = crawl_cancellation.current_crawl.get()
+        if handle is not None:
+            handle.track(future)
+        return future
+
+    def _next_work(self):
+        # Take the oldest queue's next item, then move that queue to the back
+        key, queue = self.queues.popitem(last=False)
+        work = queue.popleft()
+        if queue:
+            self.queues[key] = queue
+        return work
+
+    def _run_worker(self):
+        while True:
+            with self.condition:
+                self.idle_workers += 1
+                while not self.queues and not self.is_shutdown:
+                    self.condition.wait()
+                self.idle_workers -= 1
+                if not self.queues:
+                    return
+                future, context, fn, args, kwargs = self._next_work()
+
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = context.run(fn, *args, **kwargs)
+            except BaseException as error:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def queue_depth(self):
+        """
+        Gets the number of fetches waiting in each queue.
+
+        Returns
+        -------
+        depth : dict
+            The number of queued fetches keyed by fetch key.
+        """
+        with self.condition:
+            return {key: len(queue) for key, queue in self.queues.items()}
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        """
+        Stops the worker threads once the queues are empty.
+
+        Parameters
+        ----------
+        wait : bool
+            If True, wait for the workers to finish.
+        cancel_futures : bool
+            If True, cancel the fetches that have not started.
+        """
+        with self.condition:
+            self.is_shutdown = True
+            if cancel_futures:
+                for queue in self.queues.values():
+                    for future, context, fn, args, kwargs in queue:
+                        future.cancel()
+                self.queues.clear()
+            self.condition.notify_all()
+        if wait:
+            for worker in self.workers:
+                worker.join()
+
+
+# Process-wide scheduler that every load_data fetcher submits to
+scheduler = FetchScheduler(max_workers=fetch_concurrency)
@@ -0,0 +1,194 @@
+import collections
+import concurrent.futures
+import threading
+
+from src.app_utility.yaml_loader import load_yaml_file
+
+# Set hedging parameters
+yaml_file_path = "conf/parameters.yaml"
+parameters = load_yaml_file(yaml_file_path)
+hedging_parameters = parameters["hedging"]
+
+
+class LatencyTracker:
+    """
+    Keeps the most recent request latencies and reports their percentiles.
+
+    Parameters
+    ----------
+    window : int
+        The number of recent latencies kept.
+    """
+
+    def __init__(self, window):
+        self.latencies = collections.deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def record(self, latency):
+        """
+        Records the latency of a completed request.
+
+        Parameters
+        ----------
+        latency : float
+            The request latency in seconds.
+        """
+        with self.lock:
+            self.latencies.append(latency)
+
+    def percentile(self, percentile, min_samples):
+        """
+        Gets a percentile of the recent latencies.
+
+        Parameters
+        ----------
+        percentile : float
+            The percentile, between 0 and 100.
+        min_samples : int
+            The number of latencies needed before a percentile is reported.
+
+        Returns
+        -------
+        latency : float or None
+            The latency at the percentile, or None if there are too few samples.
+        """
+        with self.lock:
+            if len(self.latencies) < min_samples:
+                return None
+            latencies = sorted(self.latencies)
+        index = min(len(latencies) - 1, int(len(latencies) * percentile / 100))
+        return latencies[index]
+
+
+class HedgeBudget:
+    """
+    Caps hedged requests at a fraction of all requests, to protect the API rate limit.
+
+    Parameters
+    ----------
+    max_fraction : float
+        The maximum number of hedges as a fraction of requests sent.
+    """
+
+    def __init__(self, max_fraction):
+        self.max_fraction = max_fraction
+        self.requests = 0
+        self.hedges = 0
+        self.lock = threading.Lock()
+
+    def record_request(self):
+        """
+        Counts a primary request.
+        """
+        with self.lock:
+            self.requests += 1
+
+    def try_hedge(self):
+        """
+        Takes a hedge from the budget if one is available.
+
+        Returns
+        -------
+        allowed : bool
+            True if a hedged request may be sent.
+        """
+        with self.lock:
+            if self.hedges + 1 > self.max_fraction * self.requests:
+                return False
+            self.hedges += 1
+            return True
+
+
+latency_tracker = LatencyTracker(window=hedging_parameters["latency_window"])
+hedge_budget = HedgeBudget(max_fraction=hedging_parameters["max_fraction"])
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Returns the executor that runs hedged requests, creating it on first use.
+
+    Returns
+    -------
+    executor : concurrent.futures.ThreadPoolExecutor
+        The executor for primary and hedged requests.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=hedging_parameters["max_workers"],
+                    thread_name_prefix="hedge",
+                )
+    return _executor
+
+
+def get_hedge_delay():
+    """
+    Gets how long to wait for a request before sending a hedge.
+
+    Returns
+    -------
+    delay : float or None
+        The configured percentile of recent latency, at least `min_delay` seconds, or
+        None while too few latencies have been observed.
+    """
+    delay = latency_tracker.percentile(
+        percentile=hedging_parameters["percentile"],
+        min_samples=hedging_parameters["min_samples"],
+    )
+    if delay is None:
+        return None
+    return max(delay, hedging_parameters["min_delay"])
+
+
+def hedged_call(function, *args, **kwargs):
+    """
+    Calls a request function, sending a duplicate if the first call is slow.
+
+    If hedging is enabled and the call has not returned within the configured percentile
+    of recently observed latency, the same call is started again and whichever finishes
+    first is used. The number of hedges is capped by the hedge budget. With hedging
+    disabled the function is simply called.
+
+    Parameters
+    ----------
+    function : callable
+        The request function. It must be safe to call twice with the same arguments.
+
+    Returns
+    -------
+    result : object
+        The value returned by the first call to finish successfully.
+    """
+    delay = get_hedge_delay() if hedging_parameters["enabled"] else None
+    if delay is None:
+        hedge_budget.record_request()
+        return function(*args, **kwargs)
+
+    hedge_budget.record_request()
+    executor = get_executor()
+    primary = executor.submit(function, *args, **kwargs)
+    done, pending = concurrent.futures.wait([primary], timeout=delay)
+    if done or not hedge_budget.try_hedge():
+        return primary.result()
+
+    hedge = executor.submit(function, *args, **kwargs)
+    pending = {primary, hedge}
+    failed = None
+    while pending:
+        done, pending = concurrent.futures.wait(
+            pending, return_when=concurrent.futures.FIRST_COMPLETED
+        )
+        # Both calls may finish in the same wait, so check every one for a success
+        for future in done:
+            if future.exception() is None:
+                for other in pending:
+                    other.cancel()
+                return future.result()
+            failed = future
+    # Every call failed
+    return failed.result()
@@ -0,0 +1,91 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.app_utility.yaml_loader import load_yaml_file
+
+# Set connection pool size and timeouts
+yaml_file_path = "conf/parameters.yaml"
+parameters = load_yaml_file(yaml_file_path)
+fetch_concurrency = parameters["fetch_concurrency"]
+connect_timeout = parameters["connect_timeout"]
+read_timeout = parameters["read_timeout"]
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def create_session(pool_size=fetch_concurrency):
+    """
+    Creates a requests session with a keep-alive connection pool.
+
+    Parameters
+    ----------
+    pool_size : int
+        The maximum number of connections kept open per host. This should match
+        the number of concurrent fetches so no request waits for a socket.
+
+    Returns
+    -------
+    session : requests.Session
+        A session that reuses TCP/TLS connections between requests.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1, pool_maxsize=pool_size, pool_block=True, max_retries=0
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
+def get_session():
+    """
+    Returns the process-wide session, creating it on first use.
+
+    Returns
+    -------
+    session : requests.Session
+        The shared session used for all FPL API calls.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def reset_session():
+    """
+    Closes the process-wide session so the next call creates a fresh pool.
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def get(url, timeout=None, **kwargs):
+    """
+    Sends a GET request through the shared session with connect/read timeouts.
+
+    Parameters
+    ----------
+    url : str
+        The URL to fetch.
+    timeout : tuple, optional
+        A (connect, read) timeout in seconds. Defaults to the values in
+        conf/parameters.yaml.
+
+    Returns
+    -------
+    response : requests.Response
+        The response returned by the server.
+    """
+    if timeout is None:
+        timeout = (connect_timeout, read_timeout)
+    return get_session().get(url, timeout=timeout, **kwargs)
@@ -0,0 +1,121 @@
+import json
+import re
+
+# A JSON string, or a single bracket or brace
+_token_pattern = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]')
+_string_pattern = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+_scalar_pattern = re.compile(r"[^,}\]\s]+")
+_whitespace_pattern = re.compile(r"\s*")
+
+_decoder = json.JSONDecoder()
+
+
+def skip_whitespace(text, position):
+    """
+    Gets the position of the next non-whitespace character.
+
+    Parameters
+    ----------
+    text : str
+        The JSON document.
+    position : int
+        The position to start from.
+
+    Returns
+    -------
+    position : int
+        The position of the next non-whitespace character.
+    """
+    return _whitespace_pattern.match(text, position).end()
+
+
+def skip_value(text, position):
+    """
+    Finds the end of the JSON value starting at `position` without decoding it.
+
+    Objects and arrays are skipped by matching brackets, jumping over whole strings so
+    brackets inside strings are ignored. No Python objects are built for the value.
+
+    Parameters
+    ----------
+    text : str
+        The JSON document.
+    position : int
+        The position where the value starts.
+
+    Returns
+    -------
+    end : int
+        The position just after the value.
+    """
+    first = text[position]
+    if first == '"':
+        return _string_pattern.match(text, position).end()
+    if first not in "[{":
+        return _scalar_pattern.match(text, position).end()
+
+    depth = 0
+    for match in _token_pattern.finditer(text, position):
+        token = match.group()
+        if token in "[{":
+            depth += 1
+        elif token in "]}":
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    raise ValueError("Unterminated JSON value")
+
+
+def decode_selected_keys(document, keys):
+    """
+    Decodes only the selected top-level keys of a JSON object.
+
+    The top-level object is walked key by key. Wanted values are decoded with the C JSON
+    decoder, other values are skipped without building Python objects for them, and the
+    walk stops as soon as every wanted key has been found. For bootstrap-static this means
+    the large 'elements' array after 'events' and 'teams' is never decoded, or even scanned.
+
+    Skipping runs in Python, so this is only faster than json.loads when the skipped values
+    are most of the document, as in entry/{id}/ and bootstrap-static responses.
+
+    Parameters
+    ----------
+    document : bytes or str
+        The JSON document. Its top-level value must be an object.
+    keys : list
+        The top-level keys to decode.
+
+    Returns
+    -------
+    data : dict
+        The decoded values of the wanted keys that are present in the document.
+    """
+    text = document.decode("utf-8") if isinstance(document, bytes) else document
+    wanted = set(keys)
+    data = {}
+
+    position = skip_whitespace(text, 0)
+    if text[position] != "{":
+        raise ValueError("Top-level JSON value is not an object")
+    position = skip_whitespace(text, position + 1)
+
+    while text[position] != "}":
+        key_match = _string_pattern.match(text, position)
+        key = json.loads(key_match.group())
+        position = skip_whitespace(text, key_match.end())
+        if text[position] != ":":
+            raise ValueError(f"Expected ':' at position {position}")
+        position = skip_whitespace(text, position + 1)
+
+        if key in wanted:
+            data[key], position = _decoder.raw_decode(text, position)
+            if len(data) == len(wanted):
+                return data
+        else:
+            position = skip_value(text, position)
+
+        position = skip_whitespace(text, position)
+        if text[position] == ",":
+            position = skip_whitespace(text, position + 1)
+
+    return data
@@ -0,0 +1,284 @@
+import collections
+import json
+import threading
+import time
+import zlib
+
+from src.app_utility.yaml_loader import load_yaml_file
+from src.data_prep import sqlite_database
+from src.data_prep.entry_records import ManagerProfile, SeasonRecord
+
+# Set chunk size and location of the large-league crawl store
+yaml_file_path = "conf/parameters.yaml"
+parameters = load_yaml_file(yaml_file_path)
+large_league_parameters = parameters["large_league"]
+chunk_pages = large_league_parameters["chunk_pages"]
+league_chunks_path = large_league_parameters["path"]
+league_chunks_max_age = large_league_parameters["max_age"]
+
+schema = [
+    """
+    CREATE TABLE IF NOT EXISTS league_crawls (
+        league_id INTEGER PRIMARY KEY,
+        league_data BLOB NOT NULL,
+        complete INTEGER NOT NULL,
+        started_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS league_chunks (
+        league_id INTEGER NOT NULL,
+        first_page INTEGER NOT NULL,
+        pages INTEGER NOT NULL,
+        teams INTEGER NOT NULL,
+        body BLOB NOT NULL,
+        PRIMARY KEY (league_id, first_page)
+    )
+    """,
+]
+
+# Pages and teams of the chunk each league is crawling in this process, see get_progress
+_chunk_progress = {}
+_chunk_progress_lock = threading.Lock()
+
+CrawlState = collections.namedtuple(
+    "CrawlState", ["league_data", "pages_done", "teams_done", "complete", "started_at"]
+)
+
+
+def get_connection():
+    """
+    Returns this thread's connection to the large-league crawl database, creating it on first use.
+
+    Returns
+    -------
+    connection : sqlite3.Connection
+        The connection for the calling thread.
+    """
+    return sqlite_database.get_connection(league_chunks_path, schema)
+
+
+def encode(value):
+    return zlib.compress(json.dumps(value, separators=(",", ":")).encode())
+
+
+def decode(body):
+    return json.loads(zlib.decompress(body))
+
+
+def get_crawl_state(league_id):
+    """
+    Gets the stored progress of a league's chunked crawl.
+
+    Parameters
+    ----------
+    league_id : int
+        The ID of the league.
+
+    Returns
+    -------
+    state : CrawlState or None
+        The league data from the first page, the number of pages and teams stored, whether
+        the last page has been stored and when the crawl started, or None if no chunk of
+        the league is stored.
+    """
+    connection = get_connection()
+    row = connection.execute(
+        """
+        SELECT league_data, complete, started_at FROM league_crawls WHERE league_id = ?
+        """,
+        (league_id,),
+    ).fetchone()
+    if row is None:
+        return None
+    pages_done, teams_done = connection.execute(
+        """
+        SELECT COALESCE(MAX(first_page + pages - 1), 0), COALESCE(SUM(teams), 0)
+        FROM league_chunks WHERE league_id = ?
+        """,
+        (league_id,),
+    ).fetchone()
+    league_data, complete, started_at = row
+    return CrawlState(
+        league_data=decode(league_data),
+        pages_done=pages_done,
+        teams_done=teams_done,
+        complete=bool(complete),
+        started_at=started_at,
+    )
+
+
+def store_chunk(
+    league_id,
+    first_page,
+    pages,
+    league_data,
+    team_data,
+    manager_information,
+    histories,
+    complete,
+    now=None,
+):
+    """
+    Stores one chunk of a league crawl and its progress in one transaction.
+
+    Parameters
+    ----------
+    league_id : int
+        The ID of the league.
+    first_page : int
+        The first standings page in the chunk.
+    pages : int
+        The number of standings pages in the chunk.
+    league_data : dict
+        The league data from the first page of the chunk, kept for the first chunk.
+    team_data : list
+        The team rows on the chunk's pages.
+    manager_information : list
+        The ManagerProfile of each team in the chunk.
+    histories : dict
+        The SeasonRecords of each team in the chunk, keyed by entry ID.
+    complete : bool
+        Whether the chunk holds the league's last page.
+    now : float, optional
+        The current time as a Unix timestamp.
+    """
+    now = time.time() if now is None else now
+    body = encode(
+        {
+            "teams": team_data,
+            "profiles": [list(profile) for profile in manager_information],
+            "histories": [
+                [entry, [list(record) for record in records]]
+                for entry, records in histories.items()
+            ],
+        }
+    )
+    connection = get_connection()
+    with connection:
+        connection.execute(
+            """
+            INSERT INTO league_crawls (league_id, league_data, complete, started_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(league_id) DO UPDATE SET complete = excluded.complete
+            """,
+            (league_id, encode({"league": league_data.get("league")}), complete, now),
+        )
+        connection.execute(
+            """
+            INSERT OR REPLACE INTO league_chunks (league_id, first_page, pages, teams, body)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (league_id, first_page, pages, len(team_data), body),
+        )
+
+
+def iter_chunks(league_id):
+    """
+    Yields the stored chunks of a league in page order, decoding one chunk at a time.
+
+    Parameters
+    ----------
+    league_id : int
+        The ID of the league.
+
+    Yields
+    ------
+    team_data : list
+        The team rows on the chunk's pages.
+    manager_information : list
+        The ManagerProfile of each team in the chunk.
+    histories : dict
+        Tuples of SeasonRecords keyed by entry ID.
+    """
+    connection = get_connection()
+    first_pages = [
+        row[0]
+        for row in connection.execute(
+            "SELECT first_page FROM league_chunks WHERE league_id = ? ORDER BY first_page",
+            (league_id,),
+        )
+    ]
+    for first_page in first_pages:
+        (body,) = connection.execute(
+            "SELECT body FROM league_chunks WHERE league_id = ? AND first_page = ?",
+            (league_id, first_page),
+        ).fetchone()
+        chunk = decode(body)
+        manager_information = [
+            ManagerProfile(*profile) for profile in chunk["profiles"]
+        ]
+        histories = {
+            entry: tuple(SeasonRecord(*record) for record in records)
+            for entry, records in chunk["histories"]
+        }
+        yield chunk["teams"], manager_information, histories
+
+
+def clear_league(league_id):
+    """
+    Deletes the stored chunks and progress of a league.
+
+    Parameters
+    ----------
+    league_id : int
+        The ID of the league.
+    """
+    connection = get_connection()
+    with connection:
+        connection.execute(
+            "DELETE FROM league_chunks WHERE league_id = ?", (league_id,)
+        )
+        connection.execute(
+            "DELETE FROM league_crawls WHERE league_id = ?", (league_id,)
+        )
+
+
+def set_chunk_progress(league_id, pages, teams):
+    """
+    Records the pages and teams of the chunk a league is crawling, or clears them.
+
+    Parameters
+    ----------
+    league_id : int
+        The ID of the league.
+    pages : int or None
+        The number of pages of the current chunk received so far. None clears the record.
+    teams : int
+        The number of teams on those pages.
+    """
+    with _chunk_progress_lock:
+        if pages is None:
+            _chunk_progress.pop(league_id, None)
+        else:
+            _chunk_progress[league_id] = (pages, teams)
+
+
+def get_progress(league_id):
+    """
+    Gets the progress of a league's chunked crawl, for display in the app.
+
+    Parameters
+    ----------
+    league_id : int
+        The ID of the league.
+
+    Returns
+    -------
+    progress : dict or None
+        'pages' and 'teams' crawled, including the chunk in progress in this process, and
+        'complete', or None if the league has not been crawled in chunks.
+    """
+    state = get_crawl_state(league_id)
+    with _chunk_progress_lock:
+        chunk_pages_done, chunk_teams_done = _chunk_progress.get(league_id, (0, 0))
+    if state is None and not chunk_pages_done:
+        return None
+    pages_done = state.pages_done if state else 0
+    teams_done = state.teams_done if state else 0
+    progress = {
+        "pages": pages_done + chunk_pages_done,
+        "teams": teams_done + chunk_teams_done,
+        "complete": bool(state and state.complete),
+    }
+    return progress
@@ -0,0 +1,471 @@
+import collections
+import concurrent.futures
+import logging
+import threading
+import time
+
+import requests
+
+from src.app_utility.yaml_loader import load_yaml_file
+from src.data_prep import (
+    adaptive_concurrency,
+    crawl_cancellation,
+    entry_store,
+    fetch_engine,
+    league_chunks,
+    league_database,
+    load_data,
+    response_cache,
+)
+from src.data_prep.output_league_summary import get_league_name
+from src.data_prep.season_history import SeasonHistoryBuilder
+
+# Set the size of the shared entry work queue
+yaml_file_path = "conf/parameters.yaml"
+parameters = load_yaml_file(yaml_file_path)
+crawl_queue_size = parameters["crawl_queue_size"]
+
+logger = logging.getLogger(__name__)
+
+
+def get_entry_urls(entry):
+    """
+    Builds the profile and history URLs for an entry.
+
+    Parameters
+    ----------
+    entry : int
+        The entry ID.
+
+    Returns
+    -------
+    urls : dict
+        The entry/{id}/ URL under 'profile' and the entry/{id}/history/ URL under 'history'.
+    """
+    urls = {
+        "profile": f"https://fantasy.premierleague.com/api/entry/{entry}/",
+        "history": f"https://fantasy.premierleague.com/api/entry/{entry}/history/",
+    }
+    return urls
+
+
+def get_page_keys():
+    """
+    Gets the paging parameter and results key of league pages for the current gameweek.
+
+    Returns
+    -------
+    page_parameter : str
+        'page_standings' once the season has started, otherwise 'page_new_entries'.
+    results_key : str
+        'standings' once the season has started, otherwise 'new_entries'.
+    """
+    final_gw_finished, current_season_year, team_ids, current_gamekweek = (
+        load_data.get_current_season_information()
+    )
+    if current_gamekweek != "Season Not Started":
+        return "page_standings", "standings"
+    return "page_new_entries", "new_entries"
+
+
+def get_known(known, entries):
+    """
+    Splits entries into those found in a dictionary and the rest.
+
+    Parameters
+    ----------
+    known : dict or None
+        Values keyed by entry ID.
+    entries : list
+        The entry IDs to look up.
+
+    Returns
+    -------
+    found : dict
+        The values of the entries in `known`.
+    missing : list
+        The entries not in `known`, in the order given.
+    """
+    known = known or {}
+    found = {entry: known[entry] for entry in entries if entry in known}
+    missing = [entry for entry in entries if entry not in found]
+    return found, missing
+
+
+def crawl_league(
+    league_id,
+    page_limit=load_data.page_limit,
+    season_history=None,
+    first_page=1,
+    on_page=None,
+    get_known_entries=None,
+):
+    """
+    Crawls a league's standings, manager profiles and histories as one pipeline.
+
+    As soon as a standings page arrives, the profile and history fetches for its entries
+    go into one bounded work queue on the shared fetch executor, while the next pages are
+    still downloading. Each result is added to the manager information or season history
+    as it completes. Entries already in the shared entry store are not fetched. Requests
+    that fail with a retryable error are retried at the end through the batch retry queue.
+
+    If `season_history` is given, for example a SeasonAggregator, each team's past seasons
+    are added to it as soon as they arrive and are not kept by the crawl. They are still
+    put in the entry store, which is bounded, so other leagues sharing the entries reuse
+    them.
+
+    If the current crawl is cancelled, its queued fetches are cancelled and CrawlCancelled
+    is raised.
+
+    Parameters
+    ----------
+    league_id : int
+        The ID of the league.
+    page_limit : int or None
+        The maximum number of standings pages to fetch. None fetches every page.
+    season_history : object, optional
+        A collector with an add_team(team, records) method. Defaults to a
+        SeasonHistoryBuilder filled in standings order once the crawl finishes.
+    first_page : int
+        The standings page to start from.
+    on_page : callable, optional
+        Called with each page payload once its entries are queued.
+    get_known_entries : callable, optional
+        Called with each page's entry IDs. Returns the profiles and the SeasonRecords
+        known for them, as two dictionaries keyed by entry ID, which are used instead of
+        the entry store or a fetch.
+
+    Returns
+    -------
+    league_data : dict
+        League data retrieved from the first page.
+    team_data : list
+        Team data extracted from all pages.
+    manager_information : list
+        Manager information for each team, as returned by get_managers_information_league.
+    season_history : SeasonHistoryBuilder or object
+        Past seasons of each team, as returned by get_league_history, or the given collector.
+    """
+    page_parameter, results_key = get_page_keys()
+
+    store = entry_store.entry_store
+    executor = fetch_engine.get_executor()
+    queue_slots = threading.BoundedSemaphore(crawl_queue_size)
+    results_lock = threading.Lock()
+    streaming = season_history is not None
+    teams = {}
+    profiles = {}
+    histories = {}
+    retry_jobs = {}
+    futures = []
+
+    def add_result(kind, entry, url, data):
+        if isinstance(data, load_data.RetryableFetchError):
+            with results_lock:
+                retry_jobs[url] = (kind, entry)
+            return
+        if data is None:
+            return
+        if kind == "profile":
+            store.put_profile(entry, data)
+            with results_lock:
+                profiles[entry] = data
+            return
+        store.put_history(entry, data)
+        with results_lock:
+            if streaming:
+                season_history.add_team(teams[entry], data)
+            else:
+                histories[entry] = data
+
+    fetch_functions = {
+        "profile": load_data.fetch_manager_profile,
+        "history": load_data.fetch_season_records,
+    }
+
+    def run_job(kind, entry, url):
+        data = load_data.fetch_url_or_error(url, fetch=fetch_functions[kind])
+        add_result(kind, entry, url, data)
+
+    def submit_job(kind, entry, url):
+        # Blocks while the work queue is full, which also paces the standings stream
+        crawl_cancellation.raise_if_cancelled()
+        queue_slots.acquire()
+        try:
+            future = executor.submit(run_job, kind, entry, url)
+        except BaseException:
+            queue_slots.release()
+            raise
+        # Free the slot when the job finishes or is cancelled
+        future.add_done_callback(lambda future: queue_slots.release())
+        futures.append(future)
+
+    league_data = None
+    team_data = []
+    for page in load_data.iter_league_pages(
+        league_id=league_id,
+        page_parameter=page_parameter,
+        results_key=results_key,
+        page_limit=page_limit,
+        first_page=first_page,
+    ):
+        crawl_cancellation.raise_if_cancelled()
+        if league_data is None:
+            league_data = page
+        page_team_data = load_data.get_page_team_data(page, results_key=results_key)
+        team_data.extend(page_team_data)
+
+        entries = [team["entry"] for team in page_team_data]
+        known_profiles, known_histories = (
+            ({}, {}) if get_known_entries is None else get_known_entries(entries)
+        )
+        stored_profiles, missing_profiles = get_known(known_profiles, entries)
+        stored_histories, missing_histories = get_known(known_histories, entries)
+        found, missing_profiles = store.get_profiles(missing_profiles)
+        stored_profiles.update(found)
+        found, missing_histories = store.get_histories(missing_histories)
+        stored_histories.update(found)
+        with results_lock:
+            teams.update(zip(entries, page_team_data))
+            profiles.update(stored_profiles)
+            if streaming:
+                for entry, records in stored_histories.items():
+                    season_history.add_team(teams[entry], records)
+            else:
+                histories.update(stored_histories)
+
+        for entry in missing_profiles:
+            submit_job("profile", entry, get_entry_urls(entry)["profile"])
+        for entry in missing_histories:
+            submit_job("history", entry, get_entry_urls(entry)["history"])
+        if on_page is not None:
+            on_page(page)
+
+    concurrent.futures.wait(futures)
+    crawl_cancellation.raise_if_cancelled()
+    for future in futures:
+        future.result()
+
+    # Retry failed requests through the end-of-batch retry queue, one batch per kind
+    for kind, fetch in fetch_functions.items():
+        urls = [
+            url for url, (job_kind, entry) in retry_jobs.items() if job_kind == kind
+        ]
+        if not urls:
+            continue
+        for url, data in load_data.fetch_urls_with_engine(urls=urls, fetch=fetch):
+            add_result(kind, retry_jobs[url][1], url, data)
+
+    logger.info(
+        "Crawled league %s: %d teams, %d entry requests, concurrency settled at %d",
+        league_id,
+        len(team_data),
+        len(futures),
+        adaptive_concurrency.concurrency_limiter.get_limit(),
+    )
+    log_revalidation_stats()
+
+    entries = [team["entry"] for team in team_data]
+    manager_information = [profiles[entry] for entry in entries if entry in profiles]
+    if not streaming:
+        season_history = SeasonHistoryBuilder()
+        for team in team_data:
+            season_history.add_team(team=team, records=histories.get(team["entry"], ()))
+
+    return league_data, team_data, manager_information, season_history
+
+
+def log_revalidation_stats():
+    """
+    Logs how often expired cache entries were revalidated rather than refetched.
+    """
+    stats = response_cache.get_revalidation_stats()
+    if not stats:
+        return
+    logger.info(
+        "Response cache revalidations in this process: %s",
+        "; ".join(
+            f"{family}: {counts['not_modified']} not modified, "
+            f"{counts['modified']} refetched, {counts['no_validator']} without validators"
+            for family, counts in sorted(stats.items(), key=lambda item: str(item[0]))
+        ),
+    )
+
+
+class EntryHistories(dict):
+    """
+    Collects teams' SeasonRecords keyed by entry ID.
+    """
+
+    def add_team(self, team, records):
+        self[team["entry"]] = records
+
+
+# One chunked crawl per league at a time in this process
+crawl_locks = collections.defaultdict(threading.Lock)
+crawl_locks_lock = threading.Lock()
+
+
+def get_crawl_lock(league_id):
+    with crawl_locks_lock:
+        return crawl_locks[league_id]
+
+
+def crawl_league_in_chunks(league_id, chunk_pages=league_chunks.chunk_pages):
+    """
+    Crawls every standings page of a league in chunks, storing each chunk as it finishes.
+
+    Each chunk of `chunk_pages` pages is crawled with crawl_league and written to the
+    large-league store together with the crawl's progress, so an interrupted crawl resumes
+    from the page after the last stored chunk. Only one chunk is held in memory at a time.
+    A complete crawl older than `max_age` in conf/parameters.yaml is started again.
+
+    Parameters
+    ----------
+    league_id : int
+        The ID of the league.
+    chunk_pages : int
+        The number of standings pages per chunk.
+
+    Returns
+    -------
+    state : CrawlState
+        The stored progress of the complete crawl.
+
+    Raises
+    ------
+    requests.HTTPError
+        If the first page of a chunk could not be fetched. The stored chunks are kept.
+    """
+    league_id = int(league_id)
+    with get_crawl_lock(league_id):
+        state = league_chunks.get_crawl_state(league_id)
+        if (
+            state is not None
+            and state.complete
+            and time.time() - state.started_at >= league_chunks.league_chunks_max_age
+        ):
+            league_chunks.clear_league(league_id)
+            state = None
+
+        page_parameter, results_key = get_page_keys()
+        while state is None or not state.complete:
+            first_page = 1 if state is None else state.pages_done + 1
+            pages = []
+            teams = [0]
+
+            def on_page(page):
+                pages.append(page[results_key]["has_next"])
+                teams[0] += len(page[results_key]["results"])
+                league_chunks.set_chunk_progress(league_id, len(pages), teams[0])
+
+            histories = EntryHistories()
+            try:
+                league_data, team_data, manager_information, histories = crawl_league(
+                    league_id=league_id,
+                    page_limit=chunk_pages,
+                    season_history=histories,
+                    first_page=first_page,
+                    on_page=on_page,
+                )
+            finally:
+                league_chunks.set_chunk_progress(league_id, None, 0)
+            if not pages:
+                raise requests.HTTPError(
+                    f"Failed to fetch page {first_page} of league {league_id}"
+                )
+
+            league_chunks.store_chunk(
+                league_id=league_id,
+                first_page=first_page,
+                pages=len(pages),
+                league_data=league_data,
+                team_data=team_data,
+                manager_information=manager_information,
+                histories=histories,
+                complete=not pages[-1],
+            )
+            state = league_chunks.get_crawl_state(league_id)
+            logger.info(
+                "Stored pages %d-%d of league %s, %d teams so far",
+                first_page,
+                state.pages_done,
+                league_id,
+                state.teams_done,
+            )
+
+    return state
+
+
+def refresh_league(league_id, page_limit=load_data.page_limit):
+    """
+    Refreshes a league from the league database, fetching only what changed.
+
+    The standings pages are always fetched, so current-season totals come from the
+    standings rows. Stored past seasons, which only change when a season ends, and
+    profiles stored in the current gameweek, see league_database.get_known_entries, are
+    reused whichever league stored them. Only the rest, such as entries no stored league
+    has, are fetched in full. The league is then saved to the league database, replacing
+    its previous membership.
+
+    Parameters
+    ----------
+    league_id : int
+        The ID of the league.
+    page_limit : int or None
+        The maximum number of standings pages to fetch. None fetches every page.
+
+    Returns
+    -------
+    tuple
+        The values returned by crawl_league.
+    """
+    if not league_database.league_database_enabled:
+        return crawl_league(league_id=league_id, page_limit=page_limit)
+
+    final_gw_finished, current_season_year, team_ids, current_gamekweek = (
+        load_data.get_current_season_information()
+    )
+    reused_histories = []
+
+    def get_known_entries(entry_ids):
+        known_profiles, known_histories = league_database.get_known_entries(
+            entry_ids=entry_ids,
+            season_name=current_season_year,
+            gameweek=current_gamekweek,
+        )
+        reused_histories.extend(known_histories)
+        return known_profiles, known_histories
+
+    season_history = EntryHistories()
+    league_data, team_data, manager_information, season_history = crawl_league(
+        league_id=league_id,
+        page_limit=page_limit,
+        season_history=season_history,
+        get_known_entries=get_known_entries,
+    )
+
+    league_database.save_league(
+        league_id=league_id,
+        league_name=get_league_name(league_data=league_data),
+        season_name=current_season_year,
+        gameweek=current_gamekweek,
+        final_gw_finished=final_gw_finished,
+        team_data=team_data,
+        manager_information=manager_information,
+        histories=season_history,
+    )
+    logger.info(
+        "Refreshed league %s: %d members, %d with stored past seasons",
+        league_id,
+        len(team_data),
+        len(reused_histories),
+    )
+
+    season_history_builder = SeasonHistoryBuilder()
+    for team in team_data:
+        season_history_builder.add_team(
+            team=team, records=season_history.get(team["entry"], ())
+        )
+
+    return league_data, team_data, manager_information, season_history_builder
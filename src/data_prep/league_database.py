@@ -0,0 +1,488 @@
+import time
+
+from src.app_utility.yaml_loader import load_yaml_file
+from src.data_prep import sqlite_database
+from src.data_prep.entry_records import ManagerProfile, SeasonRecord
+from src.data_prep.reshape_data import (
+    summarise_season_current,
+    summarise_season_history,
+)
+from src.data_prep.season_history import SeasonHistoryBuilder, season_history_columns
+
+# Set location and freshness of the league database
+yaml_file_path = "conf/parameters.yaml"
+parameters = load_yaml_file(yaml_file_path)
+league_database_enabled = parameters["league_database"]["enabled"]
+league_database_path = parameters["league_database"]["path"]
+league_database_max_age = parameters["league_database"]["max_age"]
+
+schema = [
+    """
+    CREATE TABLE IF NOT EXISTS leagues (
+        league_id INTEGER PRIMARY KEY,
+        league_name TEXT,
+        season_name TEXT NOT NULL,
+        gameweek TEXT NOT NULL,
+        final_gw_finished INTEGER NOT NULL,
+        saved_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS league_members (
+        league_id INTEGER NOT NULL,
+        entry_id INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        standings_id INTEGER,
+        entry_name TEXT,
+        player_name TEXT,
+        total INTEGER,
+        league_rank INTEGER,
+        PRIMARY KEY (league_id, entry_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS entries (
+        entry_id INTEGER PRIMARY KEY,
+        summary_overall_rank INTEGER,
+        player_region_iso_code_long TEXT,
+        favourite_team INTEGER,
+        profile_season_name TEXT,
+        profile_gameweek TEXT,
+        history_season_name TEXT,
+        saved_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS season_rows (
+        entry_id INTEGER NOT NULL,
+        season_name TEXT NOT NULL,
+        total_points INTEGER,
+        rank INTEGER,
+        PRIMARY KEY (entry_id, season_name)
+    )
+    """,
+    # Entry and league lookups are covered by the primary keys above
+    "CREATE INDEX IF NOT EXISTS league_members_entry ON league_members (entry_id)",
+    "CREATE INDEX IF NOT EXISTS season_rows_season ON season_rows (season_name)",
+]
+
+# league_members columns of the standings row keys, in the order the API returns them,
+# as summarise_season_current keeps the first of its two 'team_id' columns
+member_columns = {
+    "id": "standings_id",
+    "player_name": "player_name",
+    "rank": "league_rank",
+    "total": "total",
+    "entry": "entry_id",
+    "entry_name": "entry_name",
+}
+
+
+def add_entry_columns(connection):
+    """
+    Adds the fetch season and gameweek columns to databases created before they were stored.
+
+    Parameters
+    ----------
+    connection : sqlite3.Connection
+        A new connection to the league database.
+    """
+    columns = [row[1] for row in connection.execute("PRAGMA table_info(entries)")]
+    for column in ["profile_season_name", "profile_gameweek", "history_season_name"]:
+        if column not in columns:
+            connection.execute(f"ALTER TABLE entries ADD COLUMN {column} TEXT")
+
+
+def get_connection():
+    """
+    Returns this thread's connection to the league database, creating it on first use.
+
+    Returns
+    -------
+    connection : sqlite3.Connection
+        The connection for the calling thread.
+    """
+    return sqlite_database.get_connection(
+        league_database_path, schema, migrate=add_entry_columns
+    )
+
+
+def save_league(
+    league_id,
+    league_name,
+    season_name,
+    gameweek,
+    final_gw_finished,
+    team_data,
+    manager_information,
+    histories,
+    now=None,
+):
+    """
+    Stores a league, its members, their profiles and their past seasons in one transaction.
+
+    The league's previous membership is replaced. Profiles and past seasons are stored per
+    entry, so an entry in several leagues is stored once, with the season and gameweek
+    they were fetched in, see get_known_entries.
+
+    Parameters
+    ----------
+    league_id : int
+        The ID of the league.
+    league_name : str
+        The name of the league.
+    season_name : str
+        The current season.
+    gameweek : int or str
+        The current gameweek.
+    final_gw_finished : bool
+        Whether the final gameweek of the season has finished.
+    team_data : list
+        The standings rows of the league's teams.
+    manager_information : list
+        The ManagerProfile of each team.
+    histories : dict
+        The SeasonRecords of each team whose history was fetched, keyed by entry ID.
+    now : float, optional
+        The current time as a Unix timestamp.
+    """
+    now = time.time() if now is None else now
+    league_id = int(league_id)
+    members = [
+        (league_id, position) + tuple(team.get(key) for key in member_columns)
+        for position, team in enumerate(team_data)
+    ]
+    profiles = [
+        tuple(profile) + (season_name, str(gameweek), now)
+        for profile in manager_information
+    ]
+    history_entries = [(entry, season_name, now) for entry in histories]
+    season_rows = [
+        (entry,) + tuple(record)
+        for entry, records in histories.items()
+        for record in records
+    ]
+
+    connection = get_connection()
+    with connection:
+        connection.execute(
+            """
+            INSERT OR REPLACE INTO leagues
+                (league_id, league_name, season_name, gameweek, final_gw_finished, saved_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                league_id,
+                league_name,
+                season_name,
+                str(gameweek),
+                bool(final_gw_finished),
+                now,
+            ),
+        )
+        connection.execute(
+            "DELETE FROM league_members WHERE league_id = ?", (league_id,)
+        )
+        connection.executemany(
+            f"""
+            INSERT INTO league_members
+                (league_id, position, {", ".join(member_columns.values())})
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            members,
+        )
+        connection.executemany(
+            """
+            INSERT INTO entries
+                (entry_id, summary_overall_rank, player_region_iso_code_long,
+                 favourite_team, profile_season_name, profile_gameweek, saved_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (entry_id) DO UPDATE SET
+                summary_overall_rank = excluded.summary_overall_rank,
+                player_region_iso_code_long = excluded.player_region_iso_code_long,
+                favourite_team = excluded.favourite_team,
+                profile_season_name = excluded.profile_season_name,
+                profile_gameweek = excluded.profile_gameweek,
+                saved_at = excluded.saved_at
+            """,
+            profiles,
+        )
+        connection.executemany(
+            """
+            INSERT INTO entries (entry_id, history_season_name, saved_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT (entry_id) DO UPDATE SET
+                history_season_name = excluded.history_season_name,
+                saved_at = excluded.saved_at
+            """,
+            history_entries,
+        )
+        connection.executemany(
+            """
+            INSERT OR REPLACE INTO season_rows (entry_id, season_name, total_points, rank)
+            VALUES (?, ?, ?, ?)
+            """,
+            season_rows,
+        )
+
+
+def read_team_data(league_id, connection=None):
+    """
+    Reads the standings rows of a league's members in standings order.
+
+    Keys the API left out of a row, such as the totals of entries that have not played
+    yet, are left out again.
+
+    Parameters
+    ----------
+    league_id : int
+        The ID of the league.
+    connection : sqlite3.Connection, optional
+        The connection to read with. Defaults to this thread's connection.
+
+    Returns
+    -------
+    team_data : list
+        The team rows as dictionaries.
+    """
+    connection = get_connection() if connection is None else connection
+    cursor = connection.execute(
+        f"""
+        SELECT {", ".join(member_columns.values())} FROM league_members
+        WHERE league_id = ? ORDER BY position
+        """,
+        (league_id,),
+    )
+    team_data = [
+        {key: value for key, value in zip(member_columns, row) if value is not None}
+        for row in cursor
+    ]
+    return team_data
+
+
+def read_manager_information(league_id, connection=None):
+    """
+    Reads the ManagerProfiles of a league's members.
+
+    Parameters
+    ----------
+    league_id : int
+        The ID of the league.
+    connection : sqlite3.Connection, optional
+        The connection to read with. Defaults to this thread's connection.
+
+    Returns
+    -------
+    manager_information : list
+        The ManagerProfile of each member with a stored profile, in standings order.
+    """
+    connection = get_connection() if connection is None else connection
+    cursor = connection.execute(
+        """
+        SELECT e.entry_id, e.summary_overall_rank, e.player_region_iso_code_long,
+            e.favourite_team
+        FROM league_members m JOIN entries e ON e.entry_id = m.entry_id
+        WHERE m.league_id = ? AND e.profile_season_name IS NOT NULL
+        ORDER BY m.position
+        """,
+        (league_id,),
+    )
+    return [ManagerProfile(*row) for row in cursor]
+
+
+def get_known_entries(entry_ids, season_name, gameweek):
+    """
+    Reads the stored profiles and past seasons of entries that are still valid.
+
+    Past seasons only change when a season ends, so those stored in the current season are
+    valid. The overall rank in a profile changes between gameweeks, so only profiles stored
+    in the current gameweek are valid. Entries are stored once whichever league saved them,
+    so members shared with other stored leagues are found too.
+
+    Parameters
+    ----------
+    entry_ids : list
+        The entry IDs to look up.
+    season_name : str
+        The current season.
+    gameweek : int or str
+        The current gameweek.
+
+    Returns
+    -------
+    known_profiles : dict
+        The ManagerProfile of each entry with a valid profile, keyed by entry ID.
+    known_histories : dict
+        The SeasonRecords of each entry with valid past seasons, keyed by entry ID.
+    """
+    entry_ids = [int(entry_id) for entry_id in entry_ids]
+    placeholders = ", ".join("?" * len(entry_ids))
+    connection = get_connection()
+    connection.execute("BEGIN")
+    try:
+        profile_rows = connection.execute(
+            f"""
+            SELECT entry_id, summary_overall_rank, player_region_iso_code_long,
+                favourite_team
+            FROM entries
+            WHERE entry_id IN ({placeholders}) AND profile_season_name = ?
+                AND profile_gameweek = ?
+            """,
+            entry_ids + [season_name, str(gameweek)],
+        ).fetchall()
+        history_rows = connection.execute(
+            f"""
+            SELECT e.entry_id, s.season_name, s.total_points, s.rank
+            FROM entries e LEFT JOIN season_rows s ON s.entry_id = e.entry_id
+            WHERE e.entry_id IN ({placeholders}) AND e.history_season_name = ?
+            ORDER BY e.entry_id, s.season_name
+            """,
+            entry_ids + [season_name],
+        ).fetchall()
+    finally:
+        connection.rollback()
+
+    known_profiles = {row[0]: ManagerProfile(*row) for row in profile_rows}
+    known_histories = {}
+    for entry, *record in history_rows:
+        records = known_histories.setdefault(entry, [])
+        # Entries without past seasons have one row of NULLs from the outer join
+        if record[0] is not None:
+            records.append(SeasonRecord(*record))
+    known_histories = {
+        entry: tuple(records) for entry, records in known_histories.items()
+    }
+    return known_profiles, known_histories
+
+
+def read_season_history_df(league_id, connection=None):
+    """
+    Reads the past seasons of a league's members.
+
+    Parameters
+    ----------
+    league_id : int
+        The ID of the league.
+    connection : sqlite3.Connection, optional
+        The connection to read with. Defaults to this thread's connection.
+
+    Returns
+    -------
+    season_history_df : pandas.DataFrame
+        The DataFrame summarise_season_history returns for the league.
+    """
+    connection = get_connection() if connection is None else connection
+    cursor = connection.execute(
+        """
+        SELECT s.season_name, s.total_points, s.rank, m.entry_id, m.entry_name,
+            m.player_name
+        FROM league_members m JOIN season_rows s ON s.entry_id = m.entry_id
+        WHERE m.league_id = ? ORDER BY m.position, s.season_name
+        """,
+        (league_id,),
+    )
+    season_history = SeasonHistoryBuilder()
+    for column, values in zip(season_history_columns, zip(*cursor.fetchall())):
+        season_history.columns[column].extend(values)
+    return summarise_season_history(season_history=season_history)
+
+
+def read_season_current_df(league_id, team_ids, connection=None):
+    """
+    Reads the current season of a league's members.
+
+    Parameters
+    ----------
+    league_id : int
+        The ID of the league.
+    team_ids : pandas.DataFrame
+        DataFrame containing team IDs and corresponding team names.
+    connection : sqlite3.Connection, optional
+        The connection to read with. Defaults to this thread's connection.
+
+    Returns
+    -------
+    season_current_df : pandas.DataFrame or None
+        The DataFrame summarise_season_current returns for the league, or None if the
+        league is not stored.
+    """
+    connection = get_connection() if connection is None else connection
+    row = connection.execute(
+        "SELECT season_name FROM leagues WHERE league_id = ?", (league_id,)
+    ).fetchone()
+    if row is None:
+        return None
+    return summarise_season_current(
+        league_data=None,
+        team_data=read_team_data(league_id, connection),
+        manager_information=read_manager_information(league_id, connection),
+        current_season_year=row[0],
+        team_ids=team_ids,
+    )
+
+
+def read_league_tables(league_id, team_ids, max_age=None, now=None):
+    """
+    Reads a league's tables if they are fresh.
+
+    Everything is read in one transaction, so a league being saved by another process is
+    read either before or after the save.
+
+    Parameters
+    ----------
+    league_id : int
+        The ID of the league.
+    team_ids : pandas.DataFrame
+        DataFrame containing team IDs and corresponding team names.
+    max_age : float, optional
+        The maximum age of the league in seconds. Defaults to `max_age` in conf/parameters.yaml.
+    now : float, optional
+        The current time as a Unix timestamp.
+
+    Returns
+    -------
+    tables : dict or None
+        The league's row of the 'leagues' table as a dictionary, with 'team_data',
+        'manager_information', 'season_history_df' and 'season_current_df' added, or None
+        if the league is not stored or is older than `max_age`.
+    """
+    now = time.time() if now is None else now
+    max_age = league_database_max_age if max_age is None else max_age
+    league_id = int(league_id)
+    connection = get_connection()
+    connection.execute("BEGIN")
+    try:
+        row = connection.execute(
+            """
+            SELECT league_name, season_name, gameweek, final_gw_finished, saved_at
+            FROM leagues WHERE league_id = ?
+            """,
+            (league_id,),
+        ).fetchone()
+        if row is None or now - row[4] >= max_age:
+            return None
+        league_name, season_name, gameweek, final_gw_finished, saved_at = row
+        team_data = read_team_data(league_id, connection)
+        manager_information = read_manager_information(league_id, connection)
+        season_history_df = read_season_history_df(league_id, connection)
+    finally:
+        connection.rollback()
+
+    tables = {
+        "league_name": league_name,
+        "season_name": season_name,
+        "current_gamekweek": gameweek,
+        "final_gw_finished": bool(final_gw_finished),
+        "saved_at": saved_at,
+        "team_data": team_data,
+        "manager_information": manager_information,
+        "season_history_df": season_history_df,
+        "season_current_df": summarise_season_current(
+            league_data=None,
+            team_data=team_data,
+            manager_information=manager_information,
+            current_season_year=season_name,
+            team_ids=team_ids,
+        ),
+    }
+    return tables
@@ -0,0 +1,312 @@
+import os
+import shutil
+import time
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from src.app_utility.yaml_loader import load_yaml_file
+from src.data_prep import reshape_data
+
+# Set location and freshness of the Parquet league store
+yaml_file_path = "conf/parameters.yaml"
+parameters = load_yaml_file(yaml_file_path)
+league_store_enabled = parameters["league_store"]["enabled"]
+league_store_path = parameters["league_store"]["path"]
+league_store_max_age = parameters["league_store"]["max_age"]
+
+# Times a league's partitions are renamed into place while other writers race it
+swap_attempts = 3
+
+# Datasets are partitioned by league, then season
+partition_schema = pa.schema([("league_id", pa.int64()), ("season_name", pa.string())])
+partitioning = ds.partitioning(partition_schema, flavor="hive")
+
+# Stored tables and their output column order
+table_columns = {
+    "season_history": [
+        "season_name",
+        "total_points",
+        "rank",
+        "team_id",
+        "team_name",
+        "manager_name",
+        "league_position",
+    ],
+    "season_current": [
+        "season_name",
+        "total_points",
+        "rank",
+        "team_id",
+        "team_name",
+        "manager_name",
+        "league_position",
+        "nationality",
+        "favourite_team",
+    ],
+    "leagues": [
+        "season_name",
+        "league_name",
+        "final_gw_finished",
+        "current_gamekweek",
+        "saved_at",
+        "season_history_rows",
+        "season_current_rows",
+    ],
+}
+
+
+def get_table_path(table):
+    return os.path.join(league_store_path, table)
+
+
+def write_table(table, league_id, df):
+    """
+    Writes one league's rows of a table, replacing the league's previous partitions.
+
+    The rows are written under a hidden staging directory, which dataset discovery skips,
+    and then renamed into place, so a reader in another process sees either the previous
+    or the new partitions of the league, or none for the instant between the renames.
+
+    If another process writes the same league at the same time, for example the Dash and
+    Streamlit apps building it together, its partitions may land between the renames. They
+    are moved aside and the rename is tried again, up to `swap_attempts` times, after which
+    the other process's copy of the league is kept.
+
+    Parameters
+    ----------
+    table : str
+        One of the tables in `table_columns`.
+    league_id : int
+        The ID of the league.
+    df : pandas.DataFrame
+        The rows to store, with a 'season_name' column.
+    """
+    league_directory = f"league_id={league_id}"
+    league_path = os.path.join(get_table_path(table), league_directory)
+    staging_path = os.path.join(get_table_path(table), f".staging-{uuid.uuid4().hex}")
+
+    df = df[table_columns[table]].assign(league_id=league_id)
+    ds.write_dataset(
+        pa.Table.from_pandas(df, preserve_index=False),
+        base_dir=staging_path,
+        format="parquet",
+        partitioning=partitioning,
+        existing_data_behavior="overwrite_or_ignore",
+        # Single-threaded writes keep the row order within each partition
+        use_threads=False,
+    )
+
+    # A table without rows writes no partitions
+    os.makedirs(staging_path, exist_ok=True)
+    new_path = os.path.join(staging_path, league_directory)
+    for attempt in range(swap_attempts):
+        try:
+            os.rename(league_path, os.path.join(staging_path, f"previous-{attempt}"))
+        except FileNotFoundError:
+            # Not stored yet, or moved aside by another writer
+            pass
+        if not os.path.isdir(new_path):
+            break
+        try:
+            os.rename(new_path, league_path)
+            break
+        except OSError:
+            # Another writer renamed its partitions into place first
+            continue
+    shutil.rmtree(staging_path)
+
+
+def read_table(table, league_id, columns=None, season_start_year=None):
+    """
+    Reads one league's rows of a table.
+
+    Only the league's partitions, and with `season_start_year` only the matching season
+    partitions, are opened, and only the requested columns are read.
+
+    Parameters
+    ----------
+    table : str
+        One of the tables in `table_columns`.
+    league_id : int
+        The ID of the league.
+    columns : list, optional
+        The columns to read. Defaults to every column of the table.
+    season_start_year : int, optional
+        Leave out seasons starting before this year.
+
+    Returns
+    -------
+    df : pandas.DataFrame or None
+        The rows in stored order, or None if the league is not stored.
+    """
+    league_path = os.path.join(get_table_path(table), f"league_id={league_id}")
+    if not os.path.isdir(league_path):
+        return None
+
+    columns = table_columns[table] if columns is None else columns
+    dataset = ds.dataset(
+        get_table_path(table), format="parquet", partitioning=partitioning
+    )
+    expression = ds.field("league_id") == league_id
+    if season_start_year is not None:
+        expression = expression & (ds.field("season_name") >= str(season_start_year))
+    df = dataset.to_table(columns=columns, filter=expression).to_pandas()
+    return df
+
+
+def select_entry_team_id(season_current_df):
+    """
+    Keeps only the entry IDs as the 'team_id' column of the current season table.
+
+    When the standings rows have their own 'id', summarise_season_current renames both
+    it and 'entry' to 'team_id'. 'entry' follows 'id' in the standings rows, so the
+    entry IDs are the last 'team_id' column.
+
+    Parameters
+    ----------
+    season_current_df : pandas.DataFrame
+        The output of summarise_season_current.
+
+    Returns
+    -------
+    season_current_df : pandas.DataFrame
+        The table with one 'team_id' column.
+    """
+    columns = list(season_current_df.columns)
+    entry_position = len(columns) - 1 - columns[::-1].index("team_id")
+    keep = [
+        position
+        for position, column in enumerate(columns)
+        if column != "team_id" or position == entry_position
+    ]
+    return season_current_df.iloc[:, keep]
+
+
+def write_league_tables(
+    league_id,
+    league_name,
+    season_name,
+    season_history_df,
+    season_current_df,
+    final_gw_finished,
+    current_gamekweek,
+    now=None,
+):
+    """
+    Stores a league's season history and current season tables.
+
+    Parameters
+    ----------
+    league_id : int
+        The ID of the league.
+    league_name : str
+        The name of the league.
+    season_name : str
+        The current season.
+    season_history_df : pandas.DataFrame
+        The output of summarise_season_history.
+    season_current_df : pandas.DataFrame
+        The output of summarise_season_current.
+    final_gw_finished : bool
+        Whether the final gameweek of the season has finished.
+    current_gamekweek : int or str
+        The current gameweek.
+    now : float, optional
+        The current time as a Unix timestamp.
+    """
+    now = time.time() if now is None else now
+    league_id = int(league_id)
+    season_current_df = select_entry_team_id(season_current_df)
+    write_table("season_history", league_id, season_history_df)
+    write_table("season_current", league_id, season_current_df)
+    # Written last, so a league only counts as stored once both tables are. The row
+    # counts let readers tell a table without rows from one being replaced.
+    write_table(
+        "leagues",
+        league_id,
+        pd.DataFrame(
+            {
+                "season_name": [season_name],
+                "league_name": [league_name],
+                "final_gw_finished": [bool(final_gw_finished)],
+                "current_gamekweek": [str(current_gamekweek)],
+                "saved_at": [now],
+                "season_history_rows": [len(season_history_df)],
+                "season_current_rows": [len(season_current_df)],
+            }
+        ),
+    )
+
+
+def read_league_tables(league_id, max_age=None, season_start_year=None, now=None):
+    """
+    Reads a league's stored tables if they are fresh.
+
+    Parameters
+    ----------
+    league_id : int
+        The ID of the league.
+    max_age : float, optional
+        The maximum age of the tables in seconds. Defaults to `max_age` in conf/parameters.yaml.
+    season_start_year : int, optional
+        Leave out past seasons starting before this year.
+    now : float, optional
+        The current time as a Unix timestamp.
+
+    Returns
+    -------
+    tables : dict or None
+        The league's row of the 'leagues' table as a dictionary, with the
+        'season_history_df' and 'season_current_df' DataFrames added, or None if the league
+        is not stored, its tables are older than `max_age` or they are being replaced.
+    """
+    now = time.time() if now is None else now
+    max_age = league_store_max_age if max_age is None else max_age
+    league_id = int(league_id)
+    try:
+        leagues_df = read_table("leagues", league_id)
+        if leagues_df is None or len(leagues_df) == 0:
+            return None
+        tables = leagues_df.iloc[0].to_dict()
+        if now - tables["saved_at"] >= max_age:
+            return None
+        season_history_df = read_table(
+            "season_history", league_id, season_start_year=season_start_year
+        )
+        season_current_df = read_table("season_current", league_id)
+    except (OSError, pa.ArrowException):
+        # Partitions removed by another process while they were read
+        return None
+
+    # Tables without rows have no partitions. A table that should have rows but has
+    # none, or a different number, is being replaced by another process.
+    if season_history_df is None:
+        if tables["season_history_rows"]:
+            return None
+        season_history_df = pd.DataFrame(columns=table_columns["season_history"])
+    elif (
+        season_start_year is None
+        and len(season_history_df) != tables["season_history_rows"]
+    ):
+        return None
+    if season_current_df is None:
+        if tables["season_current_rows"]:
+            return None
+        season_current_df = pd.DataFrame(columns=table_columns["season_current"])
+    elif len(season_current_df) != tables["season_current_rows"]:
+        return None
+
+    # Restore the order summarise_season_history returns
+    season_history_df = season_history_df.sort_values(
+        ["season_name", "league_position"], ignore_index=True
+    )
+    # Partition columns are read back as strings, and 'season_start' is not stored
+    if reshape_data.compact_schema:
+        season_history_df = reshape_data.compact_season_dataframe(season_history_df)
+        season_current_df = reshape_data.compact_season_dataframe(season_current_df)
+    tables["season_history_df"] = season_history_df
+    tables["season_current_df"] = season_current_df
+    return tables
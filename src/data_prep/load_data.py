@@ -1,18 +1,253 @@
+import collections
+import datetime
+import functools
+import json
+import logging
+import threading
+import time
 import requests
 import concurrent.futures
 import pandas as pd
 from src.app_utility.yaml_loader import load_yaml_file
+from src.data_prep import (
+    adaptive_concurrency,
+    crawl_cancellation,
+    entry_records,
+    entry_store,
+    fetch_engine,
+    fetch_scheduler,
+    hedging,
+    http_client,
+    json_stream,
+    rate_limiter,
+    response_cache,
+    season_history,
+    single_flight,
+)
 
 # Set page limit
 yaml_file_path = "conf/parameters.yaml"
 parameters = load_yaml_file(yaml_file_path)
 page_limit = parameters["page_limit"]
+page_window = parameters["page_window"]
+fetch_engine_name = parameters["fetch_engine"]
+season_information_max_ttl = parameters["season_information_max_ttl"]
+max_retry_attempts = parameters["max_retry_attempts"]
+retry_budget = parameters["retry_budget"]
+
+logger = logging.getLogger(__name__)
+
+# Concurrent requests for the same URL share one network request
+url_flight = single_flight.SingleFlight()
+
+# Season information shared by all callers, see get_current_season_information
+_season_information = None
+_season_information_expires_at = 0.0
+_season_information_lock = threading.Lock()
+
+
+class RetryableFetchError(Exception):
+    """
+    Raised when a request fails in a way that is worth retrying later: a connection error,
+    a timeout, a 403 Forbidden (how the API blocks clients that send too fast), a 429 Too
+    Many Requests or a 5xx response.
+    """
+
+
+def is_throttled(response):
+    """
+    Checks whether the server throttled or blocked a request.
+
+    Parameters:
+    ----------
+    response : requests.Response
+        The response returned by the server.
+
+    Returns:
+    ----------
+    throttled : bool
+        True for a 403, 429 or 5xx response.
+    """
+    return response.status_code in (403, 429) or response.status_code >= 500
+
+
+def fetch_response_body(url):
+    """
+    Fetches the raw body of a response, using the on-disk response cache.
+
+    Fresh cache entries are returned without touching the network. Concurrent requests
+    for the same URL, for example from several user sessions opening the same league,
+    share one network request.
+
+    Parameters:
+    ----------
+    url : str
+        The URL to fetch data from.
+
+    Returns:
+    ----------
+    body : bytes or None
+        The response body if the request is successful, or None for other failed responses.
+
+    Raises:
+    ----------
+    RetryableFetchError
+        If the request failed with a connection error, timeout, 403, 429 or 5xx response.
+    """
+    entry = response_cache.get_cache_entry(url)
+    if entry is not None and entry.expires_at > time.time():
+        return entry.body
+
+    while True:
+        try:
+            body, shared = url_flight.do(
+                response_cache.canonical_url(url),
+                fetch_response_body_from_network,
+                url,
+                entry,
+            )
+            return body
+        except crawl_cancellation.CrawlCancelled:
+            # A shared request from a cancelled crawl is sent again for this crawl
+            crawl_cancellation.raise_if_cancelled()
+
+
+def send_request(url, headers):
+    """
+    Sends one GET request once the rate limiter and the adaptive concurrency limiter allow it.
+
+    The request's latency and outcome feed the hedging latency tracker and the adaptive
+    concurrency limiter.
+
+    Parameters:
+    ----------
+    url : str
+        The URL to fetch.
+    headers : dict
+        The request headers.
+
+    Returns:
+    ----------
+    response : requests.Response
+        The response returned by the server.
+    """
+    rate_limiter.rate_limiter.acquire()
+    ticket = adaptive_concurrency.concurrency_limiter.acquire()
+    start = time.monotonic()
+    outcome = "throttled"
+    try:
+        response = http_client.get(url, headers=headers)
+        if not is_throttled(response):
+            outcome = "ok"
+    finally:
+        latency = time.monotonic() - start
+        adaptive_concurrency.concurrency_limiter.release(ticket, latency, outcome)
+    hedging.latency_tracker.record(latency)
+    return response
+
+
+def fetch_response_body_from_network(url, entry):
+    """
+    Fetches the raw body of a response from the network, revalidating an expired cache entry.
+
+    Expired entries are revalidated with If-None-Match / If-Modified-Since, and a 304 Not Modified response
+    refreshes the entry in place instead of downloading the body again.
+
+    Network requests wait for the process-wide rate limiter. A 403, 429 or 5xx response
+    slows the limiter down and, if it has a Retry-After header, pauses it. Slow requests
+    may be hedged with a duplicate request, see hedging.hedged_call.
+
+    Parameters:
+    ----------
+    url : str
+        The URL to fetch data from.
+    entry : response_cache.CacheEntry or None
+        The expired cache entry for the URL, if there is one.
+
+    Returns:
+    ----------
+    body : bytes or None
+        The response body if the request is successful, or None for other failed responses.
+
+    Raises:
+    ----------
+    RetryableFetchError
+        If the request failed with a connection error, timeout, 403, 429 or 5xx response.
+    CrawlCancelled
+        If the crawl this request belongs to was cancelled.
+    """
+    crawl_cancellation.raise_if_cancelled()
+    headers = response_cache.get_conditional_headers(entry)
+    try:
+        response = hedging.hedged_call(send_request, url, headers=headers)
+    except requests.RequestException as error:
+        raise RetryableFetchError(url) from error
+
+    if is_throttled(response):
+        rate_limiter.rate_limiter.on_throttled()
+        retry_after = rate_limiter.parse_retry_after(
+            response.headers.get("Retry-After")
+        )
+        if retry_after is not None:
+            rate_limiter.rate_limiter.pause(retry_after)
+        raise RetryableFetchError(url)
+    rate_limiter.rate_limiter.on_success()
+
+    if entry is not None and not headers:
+        response_cache.record_revalidation(url, "no_validator")
+
+    if response.status_code == 304 and entry is not None:
+        response_cache.refresh_response(url)
+        response_cache.record_revalidation(url, "not_modified")
+        return entry.body
+
+    if response.ok:
+        if headers:
+            response_cache.record_revalidation(url, "modified")
+        response_cache.store_response(
+            url,
+            response.content,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return response.content
+    else:
+        return None
+
+
+def fetch_json(url):
+    """
+    Fetches and decodes JSON data from a given URL.
+
+    Parameters:
+    ----------
+    url : str
+        The URL to fetch data from.
+
+    Returns:
+    ----------
+    data : dict or None
+        The JSON data retrieved from the URL, or None if the request failed and is not worth retrying.
+
+    Raises:
+    ----------
+    RetryableFetchError
+        If the request failed with a connection error, timeout, 403, 429 or 5xx response.
+    """
+    body = fetch_response_body(url)
+    if body is not None:
+        data = json.loads(body)
+        return data
+    else:
+        return None
 
 
 def fetch_url(url):
     """
     Fetches data from a given URL using the requests library.
 
+    Responses go through the on-disk response cache, see fetch_response_body.
+
     Parameters:
     ----------
     url : str
@@ -22,94 +257,305 @@ def fetch_url(url):
     ----------
     data : dict or None
         The JSON data retrieved from the URL if the request is successful, otherwise None.
+        Connection errors and timeouts are treated as unsuccessful requests.
     """
-    response = requests.get(url)
-    if response.ok:
-        data = response.json()
-        return data
-    else:
+    try:
+        return fetch_json(url)
+    except RetryableFetchError:
         return None
 
 
+def fetch_url_with_retries(url, max_attempts=max_retry_attempts, fetch=None):
+    """
+    Fetches data from a given URL, retrying retryable failures with jittered exponential backoff.
+
+    Used for single requests that the rest of the pipeline waits on, such as standings pages.
+
+    Parameters:
+    ----------
+    url : str
+        The URL to fetch data from.
+    max_attempts : int
+        The maximum number of retries after the first attempt.
+    fetch : callable, optional
+        The function used for each attempt. Defaults to fetch_json.
+
+    Returns:
+    ----------
+    data : dict or None
+        The JSON data retrieved from the URL if a request is successful, otherwise None.
+    """
+    fetch = fetch_json if fetch is None else fetch
+    for attempt in range(max_attempts + 1):
+        try:
+            return fetch(url)
+        except RetryableFetchError:
+            if attempt < max_attempts:
+                time.sleep(rate_limiter.get_backoff_delay(attempt))
+    return None
+
+
+def fetch_url_or_error(url, fetch=None):
+    """
+    Fetches data from a given URL, returning retryable failures instead of raising them.
+
+    Parameters:
+    ----------
+    url : str
+        The URL to fetch data from.
+    fetch : callable, optional
+        The function used to fetch and decode the URL. Defaults to fetch_json.
+
+    Returns:
+    ----------
+    data : dict, None or RetryableFetchError
+        The JSON data, None for a failed request that is not worth retrying, or the error
+        for a request that should go into the retry queue.
+    """
+    fetch = fetch_json if fetch is None else fetch
+    try:
+        return fetch(url)
+    except RetryableFetchError as error:
+        return error
+
+
+def fetch_urls_with_threads(urls, ordered=True, fetch=fetch_url):
+    """
+    Fetches multiple URLs concurrently on the process-wide fetch scheduler.
+
+    Parameters:
+    ----------
+    urls : list
+        A list of URLs to fetch.
+    fetch : callable
+        A function taking a URL and returning the fetched data.
+    ordered : bool
+        If True, results are returned in the same order as the URLs, otherwise in completion order.
+
+    Returns:
+    ----------
+    results : list
+        A list of (url, data) tuples. Data is None for failed requests.
+    """
+    # Submit tasks to the scheduler
+    executor = fetch_scheduler.scheduler
+    futures = {executor.submit(fetch, url): url for url in urls}
+
+    if ordered:
+        completed = futures
+    else:
+        completed = concurrent.futures.as_completed(futures)
+
+    results = []
+    try:
+        for future in completed:
+            results.append((futures[future], future.result()))
+    except concurrent.futures.CancelledError:
+        raise crawl_cancellation.CrawlCancelled()
+    return results
+
+
+def fetch_urls_with_engine(urls, ordered=True, fetch=None):
+    """
+    Fetches multiple URLs with the engine set by `fetch_engine` in conf/parameters.yaml.
+
+    Requests that fail with a retryable error go into a retry queue. The queue is drained
+    at the end of the batch in rounds separated by jittered exponential backoff, for at most
+    `max_retry_attempts` rounds and `retry_budget` retried requests per batch.
+
+    Parameters:
+    ----------
+    urls : list
+        A list of URLs to fetch.
+    ordered : bool
+        If True, results are returned in the same order as the URLs, otherwise in completion order.
+    fetch : callable, optional
+        The function used to fetch and decode each URL. Defaults to fetch_json.
+
+    Returns:
+    ----------
+    results : list
+        A list of (url, data) tuples. Data is None for failed requests.
+    """
+    fetch_or_error = functools.partial(fetch_url_or_error, fetch=fetch)
+
+    def run_batch(batch_urls, batch_ordered):
+        if fetch_engine_name == "asyncio":
+            return fetch_engine.fetch_urls(
+                urls=batch_urls, fetch=fetch_or_error, ordered=batch_ordered
+            )
+        return fetch_urls_with_threads(
+            urls=batch_urls, ordered=batch_ordered, fetch=fetch_or_error
+        )
+
+    results = run_batch(urls, ordered)
+
+    # Drain the retry queue
+    retry_queue = [
+        index
+        for index, (url, data) in enumerate(results)
+        if isinstance(data, RetryableFetchError)
+    ]
+    budget = retry_budget
+    attempt = 0
+    while retry_queue and budget > 0 and attempt < max_retry_attempts:
+        time.sleep(rate_limiter.get_backoff_delay(attempt))
+        retry_indexes = retry_queue[:budget]
+        budget -= len(retry_indexes)
+        attempt += 1
+
+        retried = run_batch([results[index][0] for index in retry_indexes], True)
+        for index, result in zip(retry_indexes, retried):
+            results[index] = result
+
+        retry_queue = [
+            index
+            for index in retry_queue
+            if isinstance(results[index][1], RetryableFetchError)
+        ]
+
+    logger.info(
+        "Fetched %d URLs with %d retries, concurrency settled at %d",
+        len(urls),
+        retry_budget - budget,
+        adaptive_concurrency.concurrency_limiter.get_limit(),
+    )
+
+    return [
+        (url, None if isinstance(data, RetryableFetchError) else data)
+        for url, data in results
+    ]
+
+
 # Function to fetch URLs concurrently
-def fetch_urls_concurrently(urls):
+def fetch_urls_concurrently(urls, ordered=True, fetch=None):
     """
-    Fetches multiple URLs concurrently using ThreadPoolExecutor.
+    Fetches multiple URLs concurrently.
+    Failed requests are left out of the results.
 
     Parameters:
     ----------
     urls : list
         A list of URLs to fetch.
+    ordered : bool
+        If True, results are returned in the same order as the URLs, otherwise in completion order.
+    fetch : callable, optional
+        The function used to fetch and decode each URL. Defaults to fetch_json.
 
     Returns:
     ----------
     results : list:
         A list containing the fetched results from the URLs.
     """
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        # Submit tasks to the executor
-        futures = [executor.submit(fetch_url, url) for url in urls]
-
-        # Retrieve results as they become available
-        results = []
-        for future in concurrent.futures.as_completed(futures):
-            result = future.result()
-            if result:
-                results.append(result)
+    results = []
+    for url, result in fetch_urls_with_engine(urls=urls, ordered=ordered, fetch=fetch):
+        if result is not None:
+            results.append(result)
     return results
 
 
-def fetch_urls_concurrently_with_url(urls):
+def fetch_urls_concurrently_with_url(urls, ordered=True, fetch=None):
     """
-    Fetches multiple URLs concurrently using ThreadPoolExecutor.
+    Fetches multiple URLs concurrently.
     Returns the fetched data along with their corresponding URLs.
+    Failed requests are left out of the results.
 
     Parameters:
     ----------
     urls : list
         A list of URLs to fetch.
+    ordered : bool
+        If True, results are returned in the same order as the URLs, otherwise in completion order.
+    fetch : callable, optional
+        The function used to fetch and decode each URL. Defaults to fetch_json.
 
     Returns:
     ----------
     results : list
         A list containing dictionaries with URL and fetched data.
     """
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        # Submit tasks to the executor
-        futures = {executor.submit(fetch_url, url): url for url in urls}
-
-        # Retrieve results as they become available
-        results = []
-        for future in concurrent.futures.as_completed(futures):
-            url = futures[future]
-            result = future.result()
-            if result:
-                # Append the result with its corresponding URL
-                result_with_url = {"url": url, "data": result}
-                results.append(result_with_url)
+    results = []
+    for url, result in fetch_urls_with_engine(urls=urls, ordered=ordered, fetch=fetch):
+        if result is not None:
+            # Append the result with its corresponding URL
+            result_with_url = {"url": url, "data": result}
+            results.append(result_with_url)
     return results
 
 
-def get_current_season_information():
+def get_season_information_expiry(events, now):
     """
-    Checks if the current season is complete.
-    Gets the general bootstrap-static and all gameweeks data (events).
-    Gets the final gameweek and returns the value of the 'finished' binary key.
+    Gets the time at which cached season information should be refreshed.
 
-    Also returns the current season.
+    This is the next gameweek deadline, when the current gameweek changes, capped at
+    `season_information_max_ttl` seconds so that 'finished' flags are picked up between deadlines.
+
+    Parameters
+    ----------
+    events : list
+        The gameweeks data (events) from bootstrap-static.
+    now : float
+        The current time as a Unix timestamp.
 
     Returns
     -------
-    final_gw_finished : bool
-        There is one element in this list for each team.
-        Each element is a key value pair for the individual teams information.
-        This includes team ID, player name etc.
+    expires_at : float
+        The Unix timestamp at which the cached information expires.
+    """
+    expires_at = now + season_information_max_ttl
+    for event in events:
+        deadline = datetime.datetime.fromisoformat(event["deadline_time"]).timestamp()
+        if deadline > now:
+            expires_at = min(expires_at, deadline)
+            break
+    return expires_at
+
+
+def fetch_bootstrap_static(url):
+    """
+    Fetches bootstrap-static and decodes only its 'events' and 'teams' keys.
+
+    The player data in 'elements' and the other large arrays make up most of the payload
+    but are not used, so they are skipped without being decoded.
+
+    Parameters
+    ----------
+    url : str
+        The bootstrap-static URL.
+
+    Returns
+    -------
+    bootstrap_data : dict or None
+        The 'events' and 'teams' values, or None if the request failed.
+
+    Raises
+    ------
+    RetryableFetchError
+        If the request failed with a connection error, timeout, 403, 429 or 5xx response.
+    """
+    body = fetch_response_body(url)
+    if body is None:
+        return None
+    bootstrap_data = json_stream.decode_selected_keys(body, keys=["events", "teams"])
+    return bootstrap_data
+
 
+def fetch_current_season_information():
     """
+    Downloads bootstrap-static and extracts the current season information.
 
+    Returns
+    -------
+    season_information : tuple
+        The final_gw_finished, current_season_year, team_ids and current_gamekweek values
+        returned by get_current_season_information.
+    events : list
+        The gameweeks data (events), used to set the cache expiry.
+    """
     url = "https://fantasy.premierleague.com/api/bootstrap-static/"
-    bootstrap_data = requests.get(url)
-    bootstrap_data = bootstrap_data.json()
+    bootstrap_data = fetch_url_with_retries(url, fetch=fetch_bootstrap_static)
+    if bootstrap_data is None:
+        raise requests.HTTPError(f"Failed to fetch {url}")
 
     final_gw_finished = bootstrap_data["events"][-1]["finished"]
 
@@ -126,7 +572,270 @@ def get_current_season_information():
 
     team_ids = pd.DataFrame(bootstrap_data["teams"])[["id", "name"]]
 
-    return final_gw_finished, current_season_year, team_ids, current_gamekweek
+    season_information = (
+        final_gw_finished,
+        current_season_year,
+        team_ids,
+        current_gamekweek,
+    )
+    return season_information, bootstrap_data["events"]
+
+
+def get_current_season_information():
+    """
+    Checks if the current season is complete.
+    Gets the general bootstrap-static and all gameweeks data (events).
+    Gets the final gameweek and returns the value of the 'finished' binary key.
+
+    Also returns the current season.
+
+    The result is shared by every caller in the process and is refreshed at the next
+    gameweek deadline, so bootstrap-static is downloaded once rather than on every request.
+
+    Returns
+    -------
+    final_gw_finished : bool
+        Whether the final gameweek of the season has finished.
+    current_season_year : str
+        The current season, for example '2024/25'.
+    team_ids : pandas.DataFrame
+        DataFrame containing team IDs and corresponding team names.
+    current_gamekweek : int or str
+        The current gameweek, or 'Season Not Started'.
+    """
+    global _season_information, _season_information_expires_at
+
+    with _season_information_lock:
+        now = time.time()
+        if _season_information is None or now >= _season_information_expires_at:
+            season_information, events = fetch_current_season_information()
+            _season_information = season_information
+            _season_information_expires_at = get_season_information_expiry(
+                events=events, now=now
+            )
+
+        final_gw_finished, current_season_year, team_ids, current_gamekweek = (
+            _season_information
+        )
+
+    return final_gw_finished, current_season_year, team_ids.copy(), current_gamekweek
+
+
+def clear_current_season_information():
+    """
+    Clears the cached season information so the next call downloads it again.
+    """
+    global _season_information, _season_information_expires_at
+
+    with _season_information_lock:
+        _season_information = None
+        _season_information_expires_at = 0.0
+
+
+def get_standings_url(league_id, page_parameter, page):
+    """
+    Builds the URL for one page of a classic league's standings endpoint.
+
+    Parameters:
+    ----------
+    league_id : int
+        The ID of the league.
+    page_parameter : str
+        The query parameter to page through, either 'page_standings' or 'page_new_entries'.
+    page : int
+        The page number.
+
+    Returns:
+    ----------
+    url : str
+        The standings URL for the requested page.
+    """
+    url = f"https://fantasy.premierleague.com/api/leagues-classic/{league_id}/standings/?{page_parameter}={page}"
+    return url
+
+
+def iter_league_pages(
+    league_id,
+    page_parameter,
+    results_key,
+    page_limit=page_limit,
+    window=page_window,
+    first_page=1,
+):
+    """
+    Yields the pages of a league's standings or new entries in page order as they arrive.
+
+    The first page is fetched first. After that up to `window` following pages are kept in flight,
+    so the caller can work on page N while page N+1 is still downloading. Each page is
+    downloaded once. Paging stops at the first page where `has_next` is False, and
+    requests still in flight at that point are cancelled. Nothing is yielded if the first
+    page fails, for example for a league that does not exist.
+
+    Parameters:
+    ----------
+    league_id : int
+        The ID of the league.
+    page_parameter : str
+        The query parameter to page through, either 'page_standings' or 'page_new_entries'.
+    results_key : str
+        The key holding the paged results, either 'standings' or 'new_entries'.
+    page_limit : int or None
+        The maximum number of pages to fetch. None fetches every page.
+    window : int
+        The maximum number of pages in flight after the first page.
+    first_page : int
+        The page to start from.
+
+    Yields:
+    ----------
+    league_data : dict
+        One page payload. The first page yielded is `first_page`.
+
+    Raises:
+    ----------
+    requests.HTTPError
+        If a page after the first still fails after its retries, so a league is never
+        returned with pages missing.
+    """
+    league_data = fetch_url_with_retries(
+        get_standings_url(league_id, page_parameter, first_page)
+    )
+    if league_data is None:
+        return
+    if not league_data[results_key]["has_next"] or page_limit == 1:
+        yield league_data
+        return
+
+    executor = fetch_scheduler.scheduler
+    pending = collections.deque()
+    next_page = first_page + 1
+    last_page = None if page_limit is None else first_page + page_limit - 1
+
+    def fill_window():
+        nonlocal next_page
+        while len(pending) < window and (last_page is None or next_page <= last_page):
+            url = get_standings_url(league_id, page_parameter, next_page)
+            pending.append((next_page, executor.submit(fetch_url_with_retries, url)))
+            next_page += 1
+
+    try:
+        fill_window()
+        yield league_data
+
+        while pending:
+            page, future = pending.popleft()
+            try:
+                league_data = future.result()
+            except concurrent.futures.CancelledError:
+                raise crawl_cancellation.CrawlCancelled()
+            if league_data is None:
+                raise requests.HTTPError(
+                    f"Failed to fetch page {page} of league {league_id}"
+                )
+            has_next = league_data[results_key]["has_next"]
+            if has_next:
+                fill_window()
+            yield league_data
+            if not has_next:
+                break
+    finally:
+        for page, future in pending:
+            future.cancel()
+
+
+def stream_league_standings(league_id, page_limit=page_limit, window=page_window):
+    """
+    Yields the team results of each standings page in page order as the pages arrive.
+
+    Parameters:
+    ----------
+    league_id : int
+        The ID of the league.
+    page_limit : int or None
+        The maximum number of pages to fetch. None fetches every page.
+    window : int
+        The maximum number of pages in flight after page 1.
+
+    Yields:
+    ----------
+    team_data : list
+        The team results from one standings page.
+    """
+    for league_data in iter_league_pages(
+        league_id=league_id,
+        page_parameter="page_standings",
+        results_key="standings",
+        page_limit=page_limit,
+        window=window,
+    ):
+        yield league_data["standings"]["results"]
+
+
+def fetch_league_pages(
+    league_id, page_parameter, results_key, page_limit=page_limit, window=page_window
+):
+    """
+    Fetches the pages of a league's standings or new entries.
+
+    Parameters:
+    ----------
+    league_id : int
+        The ID of the league.
+    page_parameter : str
+        The query parameter to page through, either 'page_standings' or 'page_new_entries'.
+    results_key : str
+        The key holding the paged results, either 'standings' or 'new_entries'.
+    page_limit : int or None
+        The maximum number of pages to fetch. None fetches every page.
+    window : int
+        The maximum number of pages in flight after page 1.
+
+    Returns:
+    ----------
+    all_results : list
+        The page payloads in page order. The first element is page 1.
+    """
+    all_results = list(
+        iter_league_pages(
+            league_id=league_id,
+            page_parameter=page_parameter,
+            results_key=results_key,
+            page_limit=page_limit,
+            window=window,
+        )
+    )
+    return all_results
+
+
+def get_page_team_data(league_data, results_key):
+    """
+    Extracts the team rows from one standings or new entries page.
+
+    New entries pages give the manager's first and last names separately, so they are
+    combined into 'player_name' to match the standings rows.
+
+    Parameters:
+    ----------
+    league_data : dict
+        One page payload.
+    results_key : str
+        The key holding the paged results, either 'standings' or 'new_entries'.
+
+    Returns:
+    ----------
+    team_data : list
+        The team rows on the page.
+    """
+    if results_key not in league_data or "results" not in league_data[results_key]:
+        return []
+
+    team_data = league_data[results_key]["results"]
+    if results_key == "new_entries":
+        for team in team_data:
+            team["player_name"] = (
+                f"{team.pop('player_first_name')} {team.pop('player_last_name')}"
+            )
+    return team_data
 
 
 def get_league_data_season_started(league_id):
@@ -145,29 +854,13 @@ def get_league_data_season_started(league_id):
     team_data : list
         Team data extracted from all fetched URLs.
     """
-    urls = []
-    page = 1
-    url = f"https://fantasy.premierleague.com/api/leagues-classic/{league_id}/standings/?page_standings={page}"
-    urls.append(url)
-
-    league_data = requests.get(url).json()
-    all_results = [league_data]
-
-    while league_data["standings"]["has_next"] == True:
-        page += 1
-
-        if page > page_limit:
-            break
-
-        url = f"https://fantasy.premierleague.com/api/leagues-classic/{league_id}/standings/?page_standings={page}"
-        league_data = requests.get(url).json()
-        urls.append(url)
-        all_results.append(league_data)
+    all_results = fetch_league_pages(
+        league_id=league_id, page_parameter="page_standings", results_key="standings"
+    )
 
     team_data = []
     for item in all_results:
-        if "standings" in item and "results" in item["standings"]:
-            team_data.extend(item["standings"]["results"])
+        team_data.extend(get_page_team_data(item, results_key="standings"))
 
     return all_results[0], team_data
 
@@ -188,34 +881,15 @@ def get_league_data_season_not_started(league_id):
     team_data : list
         Team data extracted from all fetched URLs.
     """
-    urls = []
-    page = 1
-    url = f"https://fantasy.premierleague.com/api/leagues-classic/{league_id}/standings/?page_new_entries={page}"
-    urls.append(url)
-
-    league_data = requests.get(url).json()
-    all_results = [league_data]
-
-    while league_data["new_entries"]["has_next"] == True:
-        page += 1
-
-        if page > page_limit:
-            break
-
-        url = f"https://fantasy.premierleague.com/api/leagues-classic/{league_id}/standings/?page_new_entries={page}"
-        league_data = requests.get(url).json()
-        urls.append(url)
-        all_results.append(league_data)
+    all_results = fetch_league_pages(
+        league_id=league_id,
+        page_parameter="page_new_entries",
+        results_key="new_entries",
+    )
 
     team_data = []
     for item in all_results:
-        if "new_entries" in item and "results" in item["new_entries"]:
-            team_data.extend(item["new_entries"]["results"])
-
-    for team in team_data:
-        team["player_name"] = (
-            f"{team.pop('player_first_name')} {team.pop('player_last_name')}"
-        )
+        team_data.extend(get_page_team_data(item, results_key="new_entries"))
 
     return all_results[0], team_data
 
@@ -246,46 +920,12 @@ def get_league_data(league_id):
         return get_league_data_season_not_started(league_id)
 
 
-def get_league_urls(league_id):
-    """
-    Retrieves URLs for fetching league standings data for a given league ID from the Fantasy Premier League API.
-
-    Parameters:
-    ----------
-    league_id :int
-        The ID of the league for which standings URLs are to be fetched.
-
-    Returns:
-    ----------
-    urls : list
-        A list of URLs for fetching league standings data.
-    """
-    # Loop through each page
-    urls = []
-    page = 1
-    url = f"https://fantasy.premierleague.com/api/leagues-classic/{league_id}/standings/?page_standings={page}"
-    urls.append(url)
-
-    league_data = requests.get(url)
-    league_data = league_data.json()
-
-    while league_data["standings"]["has_next"] == True:
-        page += 1
-
-        url = f"https://fantasy.premierleague.com/api/leagues-classic/{league_id}/standings/?page_standings={page}"
-
-        league_data = requests.get(url)
-        league_data = league_data.json()
-
-        urls.append(url)
-
-    return urls
-
-
 def get_league_data_from_urls(league_id):
     """
     Retrieves league data and team data for a given league ID.
 
+    Every standings page is downloaded once and its results are collected as it arrives.
+
     Parameters:
     ----------
     league_id : int
@@ -298,15 +938,19 @@ def get_league_data_from_urls(league_id):
     team_data : list
         Team data extracted from all fetched URLs.
     """
-    urls = get_league_urls(league_id=league_id)
-    all_results = fetch_urls_concurrently(urls=urls)
-
+    league_data = None
     team_data = []
-    for item in all_results:
+    for item in iter_league_pages(
+        league_id=league_id,
+        page_parameter="page_standings",
+        results_key="standings",
+        page_limit=None,
+    ):
+        if league_data is None:
+            league_data = item
         if "standings" in item and "results" in item["standings"]:
             team_data.extend(item["standings"]["results"])
 
-    league_data = all_results[0]
     return league_data, team_data
 
 
@@ -332,12 +976,63 @@ def get_manager_urls(team_data):
     return urls
 
 
+def fetch_manager_profile(url):
+    """
+    Fetches an entry/{id}/ response and decodes it straight into a ManagerProfile.
+
+    Parameters
+    ----------
+    url : str
+        The entry/{id}/ URL.
+
+    Returns
+    -------
+    profile : ManagerProfile or None
+        The manager information used by the app, or None if the request failed.
+
+    Raises
+    ------
+    RetryableFetchError
+        If the request failed with a connection error, timeout, 403, 429 or 5xx response.
+    """
+    body = fetch_response_body(url)
+    if body is None:
+        return None
+    return entry_records.decode_manager_profile(body)
+
+
+def fetch_season_records(url):
+    """
+    Fetches an entry/{id}/history/ response and decodes its 'past' rows into SeasonRecords.
+
+    Parameters
+    ----------
+    url : str
+        The entry/{id}/history/ URL.
+
+    Returns
+    -------
+    records : tuple or None
+        One SeasonRecord per past season, or None if the request failed.
+
+    Raises
+    ------
+    RetryableFetchError
+        If the request failed with a connection error, timeout, 403, 429 or 5xx response.
+    """
+    body = fetch_response_body(url)
+    if body is None:
+        return None
+    return entry_records.decode_season_records(body)
+
+
 def get_managers_information_league(team_data):
     """
     Retrieves detailed information about managers in a league based on team data.
 
     This function takes a list of dictionaries containing team data as input and fetches detailed information
-    about each manager associated with the teams. The function first generates URLs for fetching manager data
+    about each manager associated with the teams. Managers already in the shared entry store are read from it
+    and only missing or stale entries are fetched. The function first generates URLs for fetching manager data
     using the provided team data. Then, it concurrently fetches data from these URLs using the
     fetch_urls_concurrently function. Finally, it filters and structures the retrieved data to extract
     relevant manager information such as entry ID, overall rank, player's region ISO code, and favourite team.
@@ -350,27 +1045,25 @@ def get_managers_information_league(team_data):
     Returns
     -------
     manager_information : list
-        A list of dictionaries containing filtered information about each manager in the league.
-        Each dictionary contains the following keys:
+        A list of ManagerProfile records with information about each manager in the league.
+        Each record has the following fields:
             - 'entry': The unique ID of the manager.
             - 'summary_overall_rank': The overall rank of the manager.
             - 'player_region_iso_code_long': The ISO code of the player's region.
             - 'favourite_team': The favourite team of the manager.
     """
-    urls = get_manager_urls(team_data=team_data)
-    all_results = fetch_urls_concurrently(urls=urls)
-
-    manager_information = []
-    for dictionary in all_results:
-        filtered_dict = {
-            "entry": dictionary.get("id"),
-            "summary_overall_rank": dictionary.get("summary_overall_rank"),
-            "player_region_iso_code_long": dictionary.get(
-                "player_region_iso_code_long"
-            ),
-            "favourite_team": dictionary.get("favourite_team"),
-        }
-        manager_information.append(filtered_dict)
+    # Only fetch entries that are not already in the shared entry store
+    entry_ids = [team["entry"] for team in team_data]
+    profiles, missing = entry_store.entry_store.get_profiles(entry_ids)
+
+    urls = get_manager_urls(team_data=[{"entry": entry} for entry in missing])
+    all_results = fetch_urls_concurrently(urls=urls, fetch=fetch_manager_profile)
+
+    for profile in all_results:
+        entry_store.entry_store.put_profile(profile.entry, profile)
+        profiles[profile.entry] = profile
+
+    manager_information = [profiles[entry] for entry in entry_ids if entry in profiles]
 
     return manager_information
 
@@ -402,9 +1095,9 @@ def get_league_history(team_data):
     Retrieves historical data for teams in a league based on team data.
 
     This function takes a list of dictionaries containing team data as input and fetches historical data
-    for each team in the league. It generates URLs for fetching team history data using the provided team data
-    and fetches data from these URLs concurrently. Then, it enhances each historical data entry with additional
-    information including team ID, team name, and manager name.
+    for each team in the league that is not already in the shared entry store. It generates URLs for fetching team history data using the provided team data
+    and fetches data from these URLs concurrently. Then, it appends each team's past seasons, together with
+    its team ID, team name and manager name, to a columnar season history.
 
     Parameters
     ----------
@@ -413,37 +1106,31 @@ def get_league_history(team_data):
 
     Returns
     -------
-    league_history : slist
-        A list of dictionaries containing historical data for all teams in the league.
-        Each dictionary represents a historical entry and includes the following keys:
+    league_history : SeasonHistoryBuilder
+        The past seasons of all teams in the league, with the columns:
+            - 'season_name', 'total_points' and 'rank' of the season.
             - 'team_id': The unique ID of the team.
             - 'team_name': The name of the team.
             - 'manager_name': The name of the manager.
-            - Other historical data keys provided by the Fantasy Premier League API.
     """
 
-    urls = get_team_urls(team_data=team_data)
-    all_results = fetch_urls_concurrently_with_url(urls=urls)
+    # Only fetch entries that are not already in the shared entry store
+    entry_ids = [team["entry"] for team in team_data]
+    histories, missing = entry_store.entry_store.get_histories(entry_ids)
+
+    urls = get_team_urls(team_data=[{"entry": entry} for entry in missing])
+    url_entries = dict(zip(urls, missing))
+    all_results = fetch_urls_concurrently_with_url(
+        urls=urls, fetch=fetch_season_records
+    )
 
     for result in all_results:
-        # Get the URL
-        url = result["url"]
-        # Extract team_id from URL
-        start_index = url.find("entry/") + len("entry/")
-        end_index = url.find("/history/")
-        team_id = url[start_index:end_index]
-        # Add team_id to each dictionary in the 'past' key
-        for item in result["data"]["past"]:
-            # Find the corresponding team data
-            for team in team_data:
-                if team["entry"] == int(team_id):
-                    # Add team_name and manager_name to the dictionary
-                    item["team_id"] = int(team_id)
-                    item["team_name"] = team["entry_name"]
-                    item["manager_name"] = team["player_name"]
-                    break
-
-    # Extract 'past' dictionaries into one big list
-    league_history = [item for result in all_results for item in result["data"]["past"]]
+        team_id = url_entries[result["url"]]
+        entry_store.entry_store.put_history(team_id, result["data"])
+        histories[team_id] = result["data"]
+
+    league_history = season_history.SeasonHistoryBuilder()
+    for team in team_data:
+        league_history.add_team(team=team, records=histories.get(team["entry"], ()))
 
     return league_history
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 
@@ -18,36 +19,10 @@ def filter_rehsaped_season_history(season_start_year, df):
         The filtered DataFrame containing season history.
 
     """
-    df = df[df["season_name"].str[:4].astype(int) >= season_start_year]
-
-    return df
-
-
-def get_seasons_by_positions(df, position, column_name):
-    """
-    Get seasons won, runners-up, or third-place finish for each team.
-
-    Parameters
-    ----------
-    df : pandas.DataFrame
-        The DataFrame containing season data.
-    position : int
-        The position to filter the data by.
-    column_name : str
-        The name of the column to store the result.
-
-    Returns
-    -------
-    df : pandas.DataFrame
-        A DataFrame containing seasons won, runners-up, or third-place finishes for each team.
-
-    """
-    df = (
-        df[df["league_position"] == position]
-        .groupby(["team_name", "manager_name"])["season_name"]
-        .apply(lambda x: ", ".join(map(str, x)))
-        .reset_index(name=column_name)
-    )
+    if "season_start" in df.columns:
+        df = df[df["season_start"] >= season_start_year]
+    else:
+        df = df[df["season_name"].str[:4].astype(int) >= season_start_year]
 
     return df
 
@@ -58,6 +33,8 @@ def get_season_overview(df, manager_information, team_ids):
 
     This function aggregates various statistics for each team across seasons, including the number of times they won, were runners-up or finished third, the total number of seasons played, the maximum points achieved in a season, the minimum rank attained in a season, and more.
 
+    The counts and best seasons are computed with one grouped aggregation and two stable sorts, and the season strings in a single pass over the rows.
+
     Parameters
     ----------
     df : pandas.DataFrame
@@ -73,54 +50,21 @@ def get_season_overview(df, manager_information, team_ids):
         A DataFrame summarizing the performance of teams across seasons, including aggregated statistics.
 
     """
-    # Get max value
-    max_points_season_index = df.groupby("team_name")["total_points"].idxmax()
-
-    # Create a DataFrame with both 'team' and 'ranking' columns for each group
-    max_points_season_df = df.loc[
-        max_points_season_index, ["team_name", "manager_name", "season_name"]
-    ]
-    max_points_season_df.rename(
-        columns={"season_name": "max_points_season_year"}, inplace=True
-    )
-
-    # Get max value
-    min_rank_season_index = df.groupby("team_name")["rank"].idxmin()
-
-    # Create a DataFrame with both 'team' and 'ranking' columns for each group
-    min_rank_season_df = df.loc[
-        min_rank_season_index, ["team_name", "manager_name", "season_name"]
-    ]
-    min_rank_season_df.rename(
-        columns={"season_name": "min_rank_season_year"}, inplace=True
-    )
-
-    # Group by 'team' and aggregate values of 'score' column into a string
-    seasons_played = (
-        df.groupby(["team_name", "manager_name"])["season_name"]
-        .apply(lambda x: ", ".join(map(str, x)))
-        .reset_index(name="seasons_played_years")
-    )
-
-    seasons_first = get_seasons_by_positions(
-        df=df, position=1, column_name="seasons_won_years"
-    )
-
-    seasons_second = get_seasons_by_positions(
-        df=df, position=2, column_name="seasons_runner_up_years"
-    )
-
-    seasons_third = get_seasons_by_positions(
-        df=df, position=3, column_name="seasons_third_years"
-    )
+    team_keys = ["team_name", "manager_name"]
 
     # Get aggregated stats
+    league_position = df["league_position"]
     seasons_overview = (
-        df.groupby(["team_id", "team_name", "manager_name"])
+        df.assign(
+            won=league_position == 1,
+            runner_up=league_position == 2,
+            third=league_position == 3,
+        )
+        .groupby(["team_id"] + team_keys, observed=True)
         .agg(
-            seasons_won=("league_position", lambda x: (x == 1).sum()),
-            seasons_runner_up=("league_position", lambda x: (x == 2).sum()),
-            seasons_third=("league_position", lambda x: (x == 3).sum()),
+            seasons_won=("won", "sum"),
+            seasons_runner_up=("runner_up", "sum"),
+            seasons_third=("third", "sum"),
             seasons_played=("season_name", "nunique"),
             maximum_points=("total_points", "max"),
             minimum_rank=("rank", "min"),
@@ -128,17 +72,86 @@ def get_season_overview(df, manager_information, team_ids):
         .reset_index()
     )
 
+    team_groups = df.groupby(team_keys, observed=True)
+    team_seasons = pd.DataFrame(index=team_groups.size().index)
+
+    # Seasons of each team name's best points and rank. Stable sorts keep the first of
+    # tied rows, as idxmax and idxmin do
+    for column, ascending, season_column in [
+        ("total_points", False, "max_points_season_year"),
+        ("rank", True, "min_rank_season_year"),
+    ]:
+        best_seasons = (
+            df.sort_values(column, ascending=ascending, kind="stable")
+            .drop_duplicates("team_name")
+            .set_index(team_keys)["season_name"]
+        )
+        team_seasons[season_column] = best_seasons.reindex(team_seasons.index)
+
+    # Collect the seasons played and top three finishes of every team in one pass
+    seasons_played = [[] for _ in range(len(team_seasons))]
+    seasons_by_position = {
+        position: [[] for _ in range(len(team_seasons))] for position in [1, 2, 3]
+    }
+    for team, season_name, position in zip(
+        team_groups.ngroup(), df["season_name"], league_position
+    ):
+        seasons_played[team].append(season_name)
+        if position in seasons_by_position:
+            seasons_by_position[position][team].append(season_name)
+
+    for column_name, seasons_by_team in [
+        ("seasons_played_years", seasons_played),
+        ("seasons_won_years", seasons_by_position[1]),
+        ("seasons_runner_up_years", seasons_by_position[2]),
+        ("seasons_third_years", seasons_by_position[3]),
+    ]:
+        # A position nobody finished in has the type of the season column, as the
+        # groupby apply on no rows that this replaces returned
+        team_seasons[column_name] = pd.Series(
+            [
+                ", ".join(map(str, seasons)) if seasons else np.nan
+                for seasons in seasons_by_team
+            ],
+            index=team_seasons.index,
+            dtype=object if any(seasons_by_team) else df["season_name"].dtype,
+        )
+
     # Join together
+    seasons_overview = seasons_overview.merge(
+        right=team_seasons.reset_index(), on=team_keys, how="left"
+    )
+
+    seasons_overview = add_manager_details_and_rank(
+        seasons_overview=seasons_overview,
+        manager_information=manager_information,
+        team_ids=team_ids,
+    )
+
+    return seasons_overview
+
+
+def add_manager_details_and_rank(seasons_overview, manager_information, team_ids):
+    """
+    Add manager information and favourite team names to the season overview and rank the teams by titles.
+
+    Parameters
+    ----------
+    seasons_overview : pandas.DataFrame
+        The aggregated statistics for each team, with a 'team_id' column.
+    manager_information : list
+        Information about managers for all teams in the league.
+    team_ids : pandas.DataFrame
+        DataFrame containing team IDs and corresponding team names.
+
+    Returns
+    -------
+    seasons_overview : pandas.DataFrame
+        The season overview sorted by titles, runners-up and third places, with a 'rank' column.
+
+    """
     seasons_overview = (
         seasons_overview.merge(
-            right=max_points_season_df, on=["team_name", "manager_name"], how="left"
-        )
-        .merge(right=min_rank_season_df, on=["team_name", "manager_name"], how="left")
-        .merge(right=seasons_played, on=["team_name", "manager_name"], how="left")
-        .merge(right=seasons_first, on=["team_name", "manager_name"], how="left")
-        .merge(right=seasons_second, on=["team_name", "manager_name"], how="left")
-        .merge(right=seasons_third, on=["team_name", "manager_name"], how="left")
-        .merge(
             right=pd.DataFrame(manager_information),
             left_on=["team_id"],
             right_on=["entry"],
@@ -184,11 +197,14 @@ def aggreagte_season_by_position(position, df, column_name):
 
     """
     df = df[df["league_position"] == position]
-    df["Cumulative_Count"] = df.groupby("team_name").cumcount() + 1
+    df["Cumulative_Count"] = df.groupby("team_name", observed=True).cumcount() + 1
 
-    df["team_name"] = df["team_name"] + " (" + df["Cumulative_Count"].astype(str) + ")"
+    df["team_name"] = (
+        df["team_name"].astype(str) + " (" + df["Cumulative_Count"].astype(str) + ")"
+    )
 
-    df = df[["season_name", "manager_name", "team_name"]]
+    # Plain strings, so seasons without a team in this position can be filled with ""
+    df = df[["season_name", "manager_name", "team_name"]].astype(str)
 
     rename_columns = {
         "season_name": "Season",
@@ -278,7 +294,7 @@ def get_titles_won_summary(df):
     df = df.rename(columns=rename_columns)
 
     # Fill nulls
-    df = df.fillna("")
+    df["Winning Seasons"] = df["Winning Seasons"].fillna("")
 
     return df
 
@@ -321,13 +337,13 @@ def reformat_season_overview(df):
     df["Best Points in a Season"] = (
         df["Best Points in a Season"].map("{:,.0f}".format)
         + " ("
-        + df["max_points_season_year"]
+        + df["max_points_season_year"].astype(str)
         + ")"
     )
     df["Best Rank in a Season"] = (
         df["Best Rank in a Season"].map("{:,.0f}".format)
         + " ("
-        + df["min_rank_season_year"]
+        + df["min_rank_season_year"].astype(str)
         + ")"
     )
 
@@ -401,7 +417,7 @@ def get_all_time_table(df):
         Total Seasons Played, and Average Rank, sorted by Total Points in descending order.
     """
     all_time_table = (
-        df.groupby(["manager_name", "team_name"])
+        df.groupby(["manager_name", "team_name"], observed=True)
         .agg(
             {
                 "total_points": ["sum", "mean"],
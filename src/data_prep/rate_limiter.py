@@ -0,0 +1,156 @@
+import email.utils
+import random
+import threading
+import time
+
+from src.app_utility.yaml_loader import load_yaml_file
+
+# Set request rate and backoff parameters
+yaml_file_path = "conf/parameters.yaml"
+parameters = load_yaml_file(yaml_file_path)
+rate_limit = parameters["rate_limit"]
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket shared by every request in the process.
+
+    The bucket starts at `max_rate`, the sustained rate the API is known to allow, and
+    never goes above it. The rate is halved each time the server throttles or blocks
+    (403, 429 or 5xx). While requests are waiting on the bucket, each successful response
+    raises it by `recovery_step`, back up to `max_rate`. A Retry-After header pauses the
+    whole bucket until the given time.
+
+    Parameters
+    ----------
+    max_rate : float
+        The sustained number of requests per second.
+    min_rate : float
+        The lowest rate the bucket backs off to.
+    burst : int
+        The maximum number of tokens that can be saved up.
+    recovery_step : float, optional
+        The rate increase per successful response. Defaults to `recovery_step` in
+        conf/parameters.yaml.
+    """
+
+    def __init__(self, max_rate, min_rate, burst, recovery_step=None):
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.rate = max_rate
+        self.recovery_step = (
+            rate_limit["recovery_step"] if recovery_step is None else recovery_step
+        )
+        self.limited = False
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self):
+        """
+        Blocks until a request may be sent.
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    self._refill(now)
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                    # The rate, not the API, is holding requests back
+                    self.limited = True
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """
+        Stops all requests for a number of seconds, for example from a Retry-After header.
+
+        Parameters
+        ----------
+        seconds : float
+            How long to pause for.
+        """
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+    def on_throttled(self):
+        """
+        Halves the request rate after a 403, 429 or 5xx response.
+        """
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.limited = False
+
+    def on_success(self):
+        """
+        Raises the request rate after a successful response, if requests were waiting.
+        """
+        with self.lock:
+            if not self.limited:
+                return
+            self.limited = False
+            self.rate = min(self.max_rate, self.rate + self.recovery_step)
+
+
+def parse_retry_after(value):
+    """
+    Parses a Retry-After header into a number of seconds.
+
+    Parameters
+    ----------
+    value : str or None
+        The header value, either a number of seconds or an HTTP date.
+
+    Returns
+    -------
+    seconds : float or None
+        The number of seconds to wait, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def get_backoff_delay(attempt):
+    """
+    Gets a jittered exponential backoff delay.
+
+    Parameters
+    ----------
+    attempt : int
+        The retry attempt, starting from 0.
+
+    Returns
+    -------
+    delay : float
+        A random delay between 0 and min(max_backoff, base_backoff * 2 ** attempt) seconds.
+    """
+    cap = min(rate_limit["max_backoff"], rate_limit["base_backoff"] * 2**attempt)
+    return random.uniform(0, cap)
+
+
+# Process-wide limiter used by every load_data fetcher
+rate_limiter = TokenBucket(
+    max_rate=rate_limit["max_rate"],
+    min_rate=rate_limit["min_rate"],
+    burst=rate_limit["burst"],
+)
@@ -1,5 +1,93 @@
 import pandas as pd
 
+from src.app_utility.yaml_loader import load_yaml_file
+from src.data_prep.season_history import SeasonHistoryBuilder
+
+# Set whether the season tables use the compact schema
+yaml_file_path = "conf/parameters.yaml"
+parameters = load_yaml_file(yaml_file_path)
+compact_schema = parameters["compact_schema"]
+
+# Compact types of the season tables' integer and repeated string columns
+compact_integer_dtypes = {
+    "total_points": "int32",
+    "rank": "int32",
+    "team_id": "int32",
+    "league_position": "int32",
+}
+compact_category_columns = ["team_name", "manager_name", "nationality"]
+# Start year of the first Fantasy Premier League season
+first_season_start_year = 2002
+
+
+def get_season_names(last_season_start_year):
+    """
+    Lists every season name from the first season up to a season.
+
+    Parameters
+    ----------
+    last_season_start_year : int
+        The start year of the last season to list.
+
+    Returns
+    -------
+    season_names : list
+        The season names, such as '2023/24', in order.
+    """
+    return [
+        f"{year}/{str(year + 1)[2:]}"
+        for year in range(first_season_start_year, last_season_start_year + 1)
+    ]
+
+
+def compact_season_dataframe(df):
+    """
+    Converts a season table to the compact schema.
+
+    Team names, manager names and nationalities become categoricals, and seasons an
+    ordered categorical, so each distinct string is held once. The season categories are
+    every season up to the latest in the table, so a table read with its earlier seasons
+    left out has the same dtype as the full table. Points, ranks, team IDs and
+    league positions become 32-bit integers, unless they have missing values. The
+    integer start year of each season is added as 'season_start'.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The output of summarise_season_history or summarise_season_current.
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        The table with compact column types.
+
+    """
+    df = df.copy()
+    # Columns are converted by position, as the current season can have two 'team_id' columns
+    for position, column in enumerate(df.columns):
+        values = df.iloc[:, position]
+        if column == "season_name":
+            season_names = values.dropna()
+            last_season_start_year = (
+                int(season_names.astype(str).str[:4].max())
+                if len(season_names)
+                else first_season_start_year - 1
+            )
+            values = values.astype(
+                pd.CategoricalDtype(
+                    get_season_names(last_season_start_year), ordered=True
+                )
+            )
+        elif column in compact_category_columns:
+            values = values.astype("category")
+        elif column in compact_integer_dtypes and values.notna().all():
+            values = values.astype(compact_integer_dtypes[column])
+        df.isetitem(position, values)
+
+    df["season_start"] = df["season_name"].astype(str).str[:4].astype("int16")
+
+    return df
+
 
 def summarise_season_current(
     league_data, team_data, manager_information, current_season_year, team_ids
@@ -86,6 +174,9 @@ def summarise_season_current(
 
     season_current_df = season_current_df[columns_to_output]
 
+    if compact_schema:
+        season_current_df = compact_season_dataframe(season_current_df)
+
     return season_current_df
 
 
@@ -95,8 +186,8 @@ def summarise_season_history(season_history):
 
     Parameters
     ----------
-    season_history : dict
-        Data about previous seasons.
+    season_history : SeasonHistoryBuilder or list
+        Data about previous seasons, either collected column by column or as a list of rows.
 
     Returns
     -------
@@ -105,7 +196,10 @@ def summarise_season_history(season_history):
 
     """
     # Rank current season
-    season_history_df = pd.DataFrame.from_dict(season_history)
+    if isinstance(season_history, SeasonHistoryBuilder):
+        season_history_df = season_history.to_dataframe()
+    else:
+        season_history_df = pd.DataFrame.from_dict(season_history)
 
     # Rank season data
     season_history_df["league_position"] = (
@@ -121,4 +215,7 @@ def summarise_season_history(season_history):
         ["season_name", "league_position"], ignore_index=True
     )
 
+    if compact_schema:
+        season_history_df = compact_season_dataframe(season_history_df)
+
     return season_history_df
@@ -0,0 +1,328 @@
+import collections
+import re
+import threading
+import time
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from src.app_utility.yaml_loader import load_yaml_file
+from src.data_prep import sqlite_database
+
+# Set cache location and per-endpoint TTLs
+yaml_file_path = "conf/parameters.yaml"
+parameters = load_yaml_file(yaml_file_path)
+response_cache_enabled = parameters["response_cache"]["enabled"]
+response_cache_path = parameters["response_cache"]["path"]
+response_cache_ttl = parameters["response_cache"]["ttl"]
+response_cache_prune_every = parameters["response_cache"]["prune_every"]
+response_cache_prune_after = parameters["response_cache"]["prune_after"]
+
+# Endpoint families, checked in order against the URL path
+endpoint_families = [
+    ("history", re.compile(r"/api/entry/\d+/history/$")),
+    ("entry", re.compile(r"/api/entry/\d+/$")),
+    ("standings", re.compile(r"/api/leagues-classic/\d+/standings/$")),
+    ("bootstrap", re.compile(r"/api/bootstrap-static/$")),
+]
+
+schema = [
+    """
+    CREATE TABLE IF NOT EXISTS responses (
+        url TEXT PRIMARY KEY,
+        body BLOB NOT NULL,
+        fetched_at REAL NOT NULL,
+        expires_at REAL NOT NULL,
+        etag TEXT,
+        last_modified TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at)",
+]
+
+# Responses stored by this process, see store_response
+_store_count = 0
+_store_count_lock = threading.Lock()
+
+# Revalidation outcomes per endpoint family, see record_revalidation
+_revalidation_stats = {}
+_revalidation_stats_lock = threading.Lock()
+
+CacheEntry = collections.namedtuple(
+    "CacheEntry", ["body", "expires_at", "etag", "last_modified"]
+)
+
+
+def canonical_url(url):
+    """
+    Normalises a URL so equivalent requests share one cache key.
+
+    The scheme and host are lower-cased, the path gets a trailing slash and the query
+    parameters are sorted.
+
+    Parameters
+    ----------
+    url : str
+        The URL to normalise.
+
+    Returns
+    -------
+    url : str
+        The canonical URL.
+    """
+    parts = urlsplit(url)
+    path = parts.path if parts.path.endswith("/") else parts.path + "/"
+    query = urlencode(sorted(parse_qsl(parts.query)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ""))
+
+
+def get_endpoint_family(url):
+    """
+    Gets the endpoint family of a URL, used to choose its TTL.
+
+    Parameters
+    ----------
+    url : str
+        The URL to classify.
+
+    Returns
+    -------
+    family : str or None
+        One of 'history', 'entry', 'standings' or 'bootstrap', or None for other endpoints.
+    """
+    path = urlsplit(url).path
+    for family, pattern in endpoint_families:
+        if pattern.search(path):
+            return family
+    return None
+
+
+def get_ttl(url):
+    """
+    Gets the time to live in seconds for responses from a URL.
+
+    Parameters
+    ----------
+    url : str
+        The URL of the response.
+
+    Returns
+    -------
+    ttl : int
+        The TTL from conf/parameters.yaml, or 0 if responses from this URL are not cached.
+    """
+    family = get_endpoint_family(url)
+    return response_cache_ttl.get(family, 0) if family else 0
+
+
+def add_validator_columns(connection):
+    """
+    Adds the validator columns to caches created before revalidation was supported.
+
+    Parameters
+    ----------
+    connection : sqlite3.Connection
+        A new connection to the cache database.
+    """
+    columns = [row[1] for row in connection.execute("PRAGMA table_info(responses)")]
+    for column in ["etag", "last_modified"]:
+        if column not in columns:
+            connection.execute(f"ALTER TABLE responses ADD COLUMN {column} TEXT")
+
+
+def get_connection():
+    """
+    Returns this thread's connection to the cache database, creating it on first use.
+
+    Returns
+    -------
+    connection : sqlite3.Connection
+        The connection for the calling thread.
+    """
+    return sqlite_database.get_connection(
+        response_cache_path, schema, migrate=add_validator_columns
+    )
+
+
+def get_cache_entry(url):
+    """
+    Gets the cache entry for a URL, whether or not it has expired.
+
+    Parameters
+    ----------
+    url : str
+        The URL of the response.
+
+    Returns
+    -------
+    entry : CacheEntry or None
+        The uncompressed body, expiry time and validators, or None if the URL is not cached.
+    """
+    if not response_cache_enabled or get_ttl(url) <= 0:
+        return None
+
+    row = (
+        get_connection()
+        .execute(
+            "SELECT body, expires_at, etag, last_modified FROM responses WHERE url = ?",
+            (canonical_url(url),),
+        )
+        .fetchone()
+    )
+    if row is None:
+        return None
+    return CacheEntry(zlib.decompress(row[0]), row[1], row[2], row[3])
+
+
+def get_conditional_headers(entry):
+    """
+    Builds the headers used to revalidate an expired cache entry.
+
+    Parameters
+    ----------
+    entry : CacheEntry or None
+        The cache entry to revalidate.
+
+    Returns
+    -------
+    headers : dict
+        If-None-Match and If-Modified-Since headers for the validators the entry has.
+    """
+    headers = {}
+    if entry is None:
+        return headers
+    if entry.etag:
+        headers["If-None-Match"] = entry.etag
+    if entry.last_modified:
+        headers["If-Modified-Since"] = entry.last_modified
+    return headers
+
+
+def store_response(url, body, etag=None, last_modified=None, now=None):
+    """
+    Stores a response body compressed, with an expiry set by its endpoint family.
+
+    The first store in a process and every `prune_every` stores after it delete the
+    entries that expired more than `prune_after` seconds ago, so the cache does not grow
+    without bound. Entries that expired more recently are kept for revalidation.
+
+    Parameters
+    ----------
+    url : str
+        The URL of the response.
+    body : bytes
+        The raw response body.
+    etag : str, optional
+        The ETag header of the response.
+    last_modified : str, optional
+        The Last-Modified header of the response.
+    now : float, optional
+        The current time as a Unix timestamp.
+    """
+    global _store_count
+    ttl = get_ttl(url)
+    if not response_cache_enabled or ttl <= 0:
+        return
+    now = time.time() if now is None else now
+    with _store_count_lock:
+        prune = _store_count % response_cache_prune_every == 0
+        _store_count += 1
+    if prune:
+        clear_expired_responses(now=now - response_cache_prune_after)
+
+    connection = get_connection()
+    with connection:
+        connection.execute(
+            """
+            INSERT OR REPLACE INTO responses (url, body, fetched_at, expires_at, etag, last_modified)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                canonical_url(url),
+                zlib.compress(body),
+                now,
+                now + ttl,
+                etag,
+                last_modified,
+            ),
+        )
+
+
+def refresh_response(url, now=None):
+    """
+    Marks a cache entry as fresh again after the server answered 304 Not Modified.
+
+    Parameters
+    ----------
+    url : str
+        The URL of the response.
+    now : float, optional
+        The current time as a Unix timestamp.
+    """
+    ttl = get_ttl(url)
+    if not response_cache_enabled or ttl <= 0:
+        return
+    now = time.time() if now is None else now
+
+    connection = get_connection()
+    with connection:
+        connection.execute(
+            "UPDATE responses SET fetched_at = ?, expires_at = ? WHERE url = ?",
+            (now, now + ttl, canonical_url(url)),
+        )
+
+
+def record_revalidation(url, outcome):
+    """
+    Counts the outcome of a revalidation request for the URL's endpoint family.
+
+    Parameters
+    ----------
+    url : str
+        The URL that was revalidated.
+    outcome : str
+        'not_modified' for a 304, 'modified' for a full response to a conditional request,
+        or 'no_validator' when the expired entry had no ETag or Last-Modified to send.
+    """
+    family = get_endpoint_family(url)
+    with _revalidation_stats_lock:
+        family_stats = _revalidation_stats.setdefault(
+            family, {"not_modified": 0, "modified": 0, "no_validator": 0}
+        )
+        family_stats[outcome] += 1
+
+
+def get_revalidation_stats():
+    """
+    Gets the revalidation outcomes recorded in this process.
+
+    Returns
+    -------
+    stats : dict
+        A dictionary keyed by endpoint family with the counts of each outcome, showing
+        whether the FPL CDN honours conditional requests.
+    """
+    with _revalidation_stats_lock:
+        return {family: dict(counts) for family, counts in _revalidation_stats.items()}
+
+
+def clear_expired_responses(now=None):
+    """
+    Deletes expired entries from the cache.
+
+    Parameters
+    ----------
+    now : float, optional
+        The current time as a Unix timestamp.
+
+    Returns
+    -------
+    deleted : int
+        The number of entries deleted.
+    """
+    now = time.time() if now is None else now
+    connection = get_connection()
+    with connection:
+        cursor = connection.execute(
+            "DELETE FROM responses WHERE expires_at <= ?", (now,)
+        )
+    return cursor.rowcount
@@ -0,0 +1,373 @@
+import bisect
+import collections
+
+import numpy as np
+import pandas as pd
+
+from src.data_prep.output_league_seasons_history import add_manager_details_and_rank
+from src.data_prep.season_history import season_history_columns
+
+TeamTotals = collections.namedtuple(
+    "TeamTotals",
+    [
+        "seasons",
+        "total_points",
+        "rank_total",
+        "maximum_points",
+        "max_points_season_year",
+        "minimum_rank",
+        "min_rank_season_year",
+    ],
+)
+
+
+def is_included(season_name, season_start_year):
+    return season_start_year is None or int(season_name[:4]) >= season_start_year
+
+
+class TeamAggregate:
+    """
+    One team's past seasons, kept as compact (season_name, total_points, rank) tuples.
+    """
+
+    __slots__ = ("team_id", "team_name", "manager_name", "seasons")
+
+    def __init__(self, team_id, team_name, manager_name):
+        self.team_id = team_id
+        self.team_name = team_name
+        self.manager_name = manager_name
+        self.seasons = []
+
+    def add(self, season_name, total_points, rank):
+        self.seasons.append((season_name, total_points, rank))
+
+    def get_totals(self, season_start_year=None):
+        """
+        Totals the team's seasons from a start year.
+
+        Parameters
+        ----------
+        season_start_year : int, optional
+            Seasons starting before this year are left out. None includes every season.
+
+        Returns
+        -------
+        totals : TeamTotals or None
+            The team's season names, points and rank totals and its best points and rank
+            with their seasons, or None if the team has no season from the start year.
+        """
+        seasons = [
+            season
+            for season in self.seasons
+            if is_included(season[0], season_start_year)
+        ]
+        if not seasons:
+            return None
+        # Ties go to the earliest season, as idxmax/idxmin on the sorted history do
+        max_points_season_year, maximum_points, _ = min(
+            seasons, key=lambda season: (-season[1], season[0])
+        )
+        min_rank_season_year, _, minimum_rank = min(
+            seasons, key=lambda season: (season[2], season[0])
+        )
+        return TeamTotals(
+            seasons=[season_name for season_name, _, _ in seasons],
+            total_points=sum(total_points for _, total_points, _ in seasons),
+            rank_total=sum(rank for _, _, rank in seasons),
+            maximum_points=maximum_points,
+            max_points_season_year=max_points_season_year,
+            minimum_rank=minimum_rank,
+            min_rank_season_year=min_rank_season_year,
+        )
+
+
+class SeasonAggregator:
+    """
+    Folds a league's past seasons into per-team aggregates as they arrive.
+
+    Used instead of SeasonHistoryBuilder for leagues too large to hold every past-season
+    row. Each team keeps a compact tuple per season, and each season keeps only the teams
+    that can finish in its top `podium_size` league positions, so memory grows with the
+    number of teams rather than with the size of the history responses. Every season is
+    kept, so the season overview, all-time table and podium finishes can be built from the
+    same aggregates for any start year.
+
+    Parameters
+    ----------
+    podium_size : int
+        The number of league positions kept per season.
+    """
+
+    def __init__(self, podium_size=3):
+        self.podium_size = podium_size
+        self.teams = {}
+        self.podiums = {}
+        self.season_names = {}
+
+    def add_team(self, team, records):
+        """
+        Folds a team's past seasons into the aggregates.
+
+        Parameters
+        ----------
+        team : dict
+            The team's standings row, with 'entry', 'entry_name' and 'player_name' keys.
+        records : tuple
+            The team's SeasonRecords.
+        """
+        team_id = team["entry"]
+        for record in records:
+            # Share one string per season between all teams
+            season_name = self.season_names.setdefault(
+                record.season_name, record.season_name
+            )
+            aggregate = self.teams.get(team_id)
+            if aggregate is None:
+                aggregate = TeamAggregate(
+                    team_id=team_id,
+                    team_name=team["entry_name"],
+                    manager_name=team["player_name"],
+                )
+                self.teams[team_id] = aggregate
+            aggregate.add(season_name, record.total_points, record.rank)
+            self._add_to_podium(season_name, record, team_id)
+
+    def _add_to_podium(self, season_name, record, team_id):
+        podium = self.podiums.setdefault(season_name, [])
+        bisect.insort(podium, (record.rank, team_id, record.total_points))
+        # Keep every team tied with the last podium place
+        last = self.podium_size - 1
+        while len(podium) > self.podium_size and podium[-1][0] > podium[last][0]:
+            podium.pop()
+
+    def get_podium_positions(self, season_start_year=None):
+        """
+        Gets the league positions of the teams in each season's podium.
+
+        Positions are ranked as in summarise_season_history, so tied teams share the
+        truncated average of their positions.
+
+        Parameters
+        ----------
+        season_start_year : int, optional
+            Seasons starting before this year are left out. None includes every season.
+
+        Returns
+        -------
+        positions : list
+            (season_name, league_position, rank, team_id, total_points) tuples sorted by
+            season and league position.
+        """
+        positions = []
+        for season_name, podium in self.podiums.items():
+            if not is_included(season_name, season_start_year):
+                continue
+            ranks = [rank for rank, team_id, total_points in podium]
+            for rank, team_id, total_points in podium:
+                better = bisect.bisect_left(ranks, rank)
+                tied = bisect.bisect_right(ranks, rank) - better
+                league_position = int(better + (tied + 1) / 2)
+                if league_position <= self.podium_size:
+                    positions.append(
+                        (season_name, league_position, rank, team_id, total_points)
+                    )
+        positions.sort()
+        return positions
+
+    def get_podium_df(self, season_start_year=None):
+        """
+        Builds the season history rows of the podium finishes.
+
+        The rows have the columns of summarise_season_history, so the league summary and
+        top-three functions can run on them unchanged.
+
+        Parameters
+        ----------
+        season_start_year : int, optional
+            Seasons starting before this year are left out. None includes every season.
+
+        Returns
+        -------
+        podium_df : pandas.DataFrame
+            One row per podium finish, sorted by season and league position.
+        """
+        rows = []
+        for (
+            season_name,
+            league_position,
+            rank,
+            team_id,
+            total_points,
+        ) in self.get_podium_positions(season_start_year):
+            team = self.teams[team_id]
+            rows.append(
+                (
+                    season_name,
+                    total_points,
+                    rank,
+                    team_id,
+                    team.team_name,
+                    team.manager_name,
+                    league_position,
+                )
+            )
+        podium_df = pd.DataFrame(
+            rows, columns=season_history_columns + ["league_position"]
+        )
+        return podium_df
+
+    def get_season_overview(
+        self, manager_information, team_ids, season_start_year=None
+    ):
+        """
+        Builds the season overview from the aggregates.
+
+        Parameters
+        ----------
+        manager_information : list
+            Information about managers for all teams in the league.
+        team_ids : pandas.DataFrame
+            DataFrame containing team IDs and corresponding team names.
+        season_start_year : int, optional
+            Seasons starting before this year are left out. None includes every season.
+
+        Returns
+        -------
+        seasons_overview : pandas.DataFrame
+            The same table get_season_overview builds from the full season history.
+        """
+        podium_seasons = {}
+        for (
+            season_name,
+            league_position,
+            rank,
+            team_id,
+            total_points,
+        ) in self.get_podium_positions(season_start_year):
+            podium_seasons.setdefault((team_id, league_position), []).append(
+                season_name
+            )
+
+        def get_years(team_id, position):
+            seasons = podium_seasons.get((team_id, position))
+            return ", ".join(seasons) if seasons else np.nan
+
+        teams = []
+        for team_id in sorted(self.teams):
+            team = self.teams[team_id]
+            totals = team.get_totals(season_start_year)
+            if totals is not None:
+                teams.append((team, totals))
+        seasons_overview = pd.DataFrame(
+            {
+                "team_id": [team.team_id for team, totals in teams],
+                "team_name": [team.team_name for team, totals in teams],
+                "manager_name": [team.manager_name for team, totals in teams],
+                "seasons_won": [
+                    len(podium_seasons.get((team.team_id, 1), ()))
+                    for team, totals in teams
+                ],
+                "seasons_runner_up": [
+                    len(podium_seasons.get((team.team_id, 2), ()))
+                    for team, totals in teams
+                ],
+                "seasons_third": [
+                    len(podium_seasons.get((team.team_id, 3), ()))
+                    for team, totals in teams
+                ],
+                "seasons_played": [len(set(totals.seasons)) for team, totals in teams],
+                "maximum_points": [totals.maximum_points for team, totals in teams],
+                "minimum_rank": [totals.minimum_rank for team, totals in teams],
+                "max_points_season_year": [
+                    totals.max_points_season_year for team, totals in teams
+                ],
+                "min_rank_season_year": [
+                    totals.min_rank_season_year for team, totals in teams
+                ],
+                "seasons_played_years": [
+                    ", ".join(sorted(totals.seasons)) for team, totals in teams
+                ],
+                "seasons_won_years": [
+                    get_years(team.team_id, 1) for team, totals in teams
+                ],
+                "seasons_runner_up_years": [
+                    get_years(team.team_id, 2) for team, totals in teams
+                ],
+                "seasons_third_years": [
+                    get_years(team.team_id, 3) for team, totals in teams
+                ],
+            }
+        )
+
+        seasons_overview = add_manager_details_and_rank(
+            seasons_overview=seasons_overview,
+            manager_information=manager_information,
+            team_ids=team_ids,
+        )
+
+        return seasons_overview
+
+    def get_all_time_table(self, season_start_year=None):
+        """
+        Builds the all-time table from the aggregates.
+
+        Parameters
+        ----------
+        season_start_year : int, optional
+            Seasons starting before this year are left out. None includes every season.
+
+        Returns
+        -------
+        all_time_table : pandas.DataFrame
+            The same table get_all_time_table builds from the full season history.
+        """
+        teams = []
+        for team in self.teams.values():
+            team_totals = team.get_totals(season_start_year)
+            if team_totals is not None:
+                teams.append((team, team_totals))
+        totals = (
+            pd.DataFrame(
+                {
+                    "manager_name": [team.manager_name for team, _ in teams],
+                    "team_name": [team.team_name for team, _ in teams],
+                    "total_points": [
+                        team_totals.total_points for _, team_totals in teams
+                    ],
+                    "seasons_played": [
+                        len(team_totals.seasons) for _, team_totals in teams
+                    ],
+                    "rank_total": [team_totals.rank_total for _, team_totals in teams],
+                }
+            )
+            .groupby(["manager_name", "team_name"])
+            .sum()
+            .reset_index()
+        )
+
+        all_time_table = pd.DataFrame(
+            {
+                "Manager": totals["manager_name"],
+                "Team": totals["team_name"],
+                "Total Points": totals["total_points"],
+                "Average Points": totals["total_points"] / totals["seasons_played"],
+                "Total Seasons Played": totals["seasons_played"],
+                "Average Rank": totals["rank_total"] / totals["seasons_played"],
+            }
+        )
+
+        all_time_table = all_time_table.sort_values(by="Total Points", ascending=False)
+
+        # Round average points and rank to  no decimal places
+        all_time_table["Average Points"] = (
+            all_time_table["Average Points"].round(0).astype(int)
+        )
+
+        all_time_table["Average Rank"] = (
+            all_time_table["Average Rank"].round(0).astype(int)
+        )
+
+        return all_time_table
+
+    def __len__(self):
+        return len(self.teams)
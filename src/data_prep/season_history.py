@@ -0,0 +1,58 @@
+import pandas as pd
+
+from src.data_prep.entry_records import SeasonRecord
+
+# Columns of the season history, in output order
+season_history_columns = list(SeasonRecord._fields) + [
+    "team_id",
+    "team_name",
+    "manager_name",
+]
+
+
+class SeasonHistoryBuilder:
+    """
+    Collects the past seasons of a league's teams column by column.
+
+    Each team's SeasonRecords are appended straight onto one list per column, so no
+    per-row dictionaries are built and the season history DataFrame is allocated once
+    in to_dataframe.
+    """
+
+    def __init__(self):
+        self.columns = {column: [] for column in season_history_columns}
+
+    def add_team(self, team, records):
+        """
+        Appends a team's past seasons.
+
+        Parameters
+        ----------
+        team : dict
+            The team's standings row, with 'entry', 'entry_name' and 'player_name' keys.
+        records : tuple
+            The team's SeasonRecords.
+        """
+        columns = self.columns
+        for record in records:
+            columns["season_name"].append(record.season_name)
+            columns["total_points"].append(record.total_points)
+            columns["rank"].append(record.rank)
+        count = len(records)
+        columns["team_id"].extend([team["entry"]] * count)
+        columns["team_name"].extend([team["entry_name"]] * count)
+        columns["manager_name"].extend([team["player_name"]] * count)
+
+    def to_dataframe(self):
+        """
+        Builds the season history DataFrame.
+
+        Returns
+        -------
+        season_history_df : pandas.DataFrame
+            One row per team and past season, with the columns in `season_history_columns`.
+        """
+        return pd.DataFrame(self.columns, columns=season_history_columns)
+
+    def __len__(self):
+        return len(self.columns["season_name"])
@@ -0,0 +1,71 @@
+import threading
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one in-flight computation.
+
+    The first caller for a key runs the function. Callers that arrive while it is running
+    wait for it and receive the same result, or the same exception.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, function, *args, **kwargs):
+        """
+        Runs `function(*args, **kwargs)` unless a call for `key` is already in flight.
+
+        Parameters
+        ----------
+        key : hashable
+            The key identifying identical calls.
+        function : callable
+            The function to run.
+
+        Returns
+        -------
+        result : object
+            The value returned by the function.
+        shared : bool
+            True if the result came from a call started by another caller. Shared results
+            are the same object for every caller, so callers that mutate them should copy.
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            if call is None:
+                call = {"done": threading.Event(), "result": None, "error": None}
+                self.calls[key] = call
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"], True
+
+        try:
+            call["result"] = function(*args, **kwargs)
+        except BaseException as error:
+            call["error"] = error
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call["done"].set()
+        return call["result"], False
+
+    def in_flight(self):
+        """
+        Gets the number of keys currently being computed.
+
+        Returns
+        -------
+        count : int
+            The number of in-flight calls.
+        """
+        with self.lock:
+            return len(self.calls)
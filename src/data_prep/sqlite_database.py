@@ -0,0 +1,47 @@
+import os
+import sqlite3
+import threading
+
+_local = threading.local()
+
+
+def get_connection(path, schema, migrate=None):
+    """
+    Returns this thread's connection to a SQLite database, creating it on first use.
+
+    Connections are kept per thread and path. The database runs in WAL mode so Streamlit
+    and Dash worker processes can read it while another process writes.
+
+    Parameters
+    ----------
+    path : str
+        The path of the database file. Its directory is created if it does not exist.
+    schema : list
+        The statements creating the database's tables and indexes if they do not exist.
+    migrate : callable, optional
+        Called with a new connection after the schema statements, to update databases
+        created with an earlier schema.
+
+    Returns
+    -------
+    connection : sqlite3.Connection
+        The connection for the calling thread.
+    """
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    connection = connections.get(path)
+    if connection is None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        for statement in schema:
+            connection.execute(statement)
+        if migrate is not None:
+            migrate(connection)
+        connection.commit()
+        connections[path] = connection
+    return connection
@@ -1,5 +1,6 @@
 import streamlit as st
 import base64
+import concurrent.futures
 import altair as alt
 import pandas as pd
 
@@ -14,9 +15,22 @@ from src.app_utility.app_tools import (
     remove_starting_the,
 )
 from src.app_utility.create_output_tables import (
+    get_league_tables_chunked,
+    get_league_tables_streaming,
     get_team_and_league_data,
     get_team_and_league_data_filtered_summarised,
 )
+from src.app_utility.yaml_loader import load_yaml_file
+from src.data_prep.league_chunks import get_progress
+
+# Build tables from running aggregates or stored chunks for very large leagues
+yaml_file_path = "conf/parameters.yaml"
+parameters = load_yaml_file(yaml_file_path)
+streaming_aggregation = parameters["streaming_aggregation"]
+large_league = parameters["large_league"]
+
+# Seconds between progress updates of a large-league crawl
+progress_interval = 2
 
 # Hide deploy button
 st.markdown(
@@ -35,6 +49,50 @@ st.markdown(
 latest_season_start = get_most_recent_august_start()
 
 
+def get_league_tables_chunked_with_progress(league_id, season_start_year):
+    """
+    Gets the output tables of a league in large-league mode, showing the crawl's progress.
+
+    The crawl runs on a worker thread while this script thread polls the stored chunks
+    and updates a progress message.
+
+    Parameters
+    ----------
+    league_id : int
+        The ID of the league.
+    season_start_year : int
+        The start year of the seasons to include.
+
+    Returns
+    -------
+    tuple
+        The values returned by get_league_tables_chunked.
+    """
+    progress_text = st.empty()
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    try:
+        future = executor.submit(
+            get_league_tables_chunked,
+            league_id=league_id,
+            season_start_year=season_start_year,
+        )
+        while True:
+            try:
+                league_tables = future.result(timeout=progress_interval)
+                break
+            except concurrent.futures.TimeoutError:
+                progress = get_progress(league_id=league_id)
+                if progress is not None and not progress["complete"]:
+                    progress_text.caption(
+                        f"Crawled {progress['pages']:,} pages ({progress['teams']:,} teams)..."
+                    )
+    finally:
+        # A rerun stops this script but not the crawl, whose chunks are kept for the next run
+        executor.shutdown(wait=False)
+        progress_text.empty()
+    return league_tables
+
+
 def main():
     try:
         st.title("FPL League History")
@@ -102,36 +160,69 @@ def main():
             # Get data
 
             with st.spinner(text="Getting league data..."):
-                (
-                    league_data,
-                    manager_information,
-                    team_ids,
-                    final_gw_finished,
-                    season_history,
-                    season_current_df,
-                    season_history_df,
-                    current_gamekweek,
-                    team_data,
-                ) = get_team_and_league_data(league_id=int(league_id))
-
-                (
-                    league_name,
-                    league_summary_kpis,
-                    seasons_top_three_output,
-                    titles_won_summary_output,
-                    season_overview_output,
-                    season_current_df_output,
-                    season_history_df_output,
-                    all_time_table_output,
-                ) = get_team_and_league_data_filtered_summarised(
-                    league_data=league_data,
-                    manager_information=manager_information,
-                    team_ids=team_ids,
-                    season_current_df=season_current_df,
-                    season_history_df=season_history_df,
-                    season_start_year=season_start_year,
-                    team_data=team_data,
-                )
+                if large_league["enabled"]:
+                    (
+                        league_name,
+                        league_summary_kpis,
+                        seasons_top_three_output,
+                        titles_won_summary_output,
+                        season_overview_output,
+                        season_current_df_output,
+                        season_history_df_output,
+                        all_time_table_output,
+                        final_gw_finished,
+                        current_gamekweek,
+                    ) = get_league_tables_chunked_with_progress(
+                        league_id=int(league_id), season_start_year=season_start_year
+                    )
+                elif streaming_aggregation:
+                    (
+                        league_name,
+                        league_summary_kpis,
+                        seasons_top_three_output,
+                        titles_won_summary_output,
+                        season_overview_output,
+                        season_current_df_output,
+                        season_history_df_output,
+                        all_time_table_output,
+                        final_gw_finished,
+                        current_gamekweek,
+                    ) = get_league_tables_streaming(
+                        league_id=int(league_id), season_start_year=season_start_year
+                    )
+                else:
+                    (
+                        league_data,
+                        manager_information,
+                        team_ids,
+                        final_gw_finished,
+                        season_history,
+                        season_current_df,
+                        season_history_df,
+                        current_gamekweek,
+                        team_data,
+                    ) = get_team_and_league_data(
+                        league_id=int(league_id), season_start_year=season_start_year
+                    )
+
+                    (
+                        league_name,
+                        league_summary_kpis,
+                        seasons_top_three_output,
+                        titles_won_summary_output,
+                        season_overview_output,
+                        season_current_df_output,
+                        season_history_df_output,
+                        all_time_table_output,
+                    ) = get_team_and_league_data_filtered_summarised(
+                        league_data=league_data,
+                        manager_information=manager_information,
+                        team_ids=team_ids,
+                        season_current_df=season_current_df,
+                        season_history_df=season_history_df,
+                        season_start_year=season_start_year,
+                        team_data=team_data,
+                    )
 
             league_summary_kpis.reset_index(inplace=True)
             league_summary_kpis.columns = ["", league_name]
@@ -0,0 +1,105 @@
+import pandas as pd
+from src.app_utility import create_output_tables
+from src.data_prep.entry_records import ManagerProfile, SeasonRecord
+from src.data_prep.season_history import SeasonHistoryBuilder
+
+
+def get_records(entry):
+    return (
+        SeasonRecord("2022/23", 2000 + entry, 500 * entry),
+        SeasonRecord("2023/24", 2100 - entry, 900 - entry),
+    )
+
+
+def get_refreshed_league():
+    # Standings rows as the API returns them, with their own 'id'
+    team_data = [
+        {
+            "id": 9000 + entry,
+            "event_total": 50,
+            "player_name": f"Manager {entry}",
+            "rank": position,
+            "last_rank": position,
+            "rank_sort": position,
+            "total": 400 - entry,
+            "entry": entry,
+            "entry_name": f"Team {entry}",
+        }
+        for position, entry in enumerate([3, 1, 2], start=1)
+    ]
+    manager_information = [
+        ManagerProfile(entry, 1000 * entry, "England", entry) for entry in [1, 2, 3]
+    ]
+    season_history = SeasonHistoryBuilder()
+    for team in team_data:
+        season_history.add_team(team=team, records=get_records(team["entry"]))
+    league_data = {"league": {"name": "League"}}
+    return league_data, team_data, manager_information, season_history
+
+
+def test_build_team_and_league_data_loads_stored_league(mocker, tmp_path):
+    mocker.patch("src.data_prep.league_store.league_store_path", str(tmp_path))
+    mocker.patch("src.data_prep.league_store.league_store_enabled", True)
+    mocker.patch("src.data_prep.league_database.league_database_enabled", False)
+    team_ids = pd.DataFrame({"id": [1, 2, 3], "name": ["Arsenal", "Spurs", "Burnley"]})
+    mocker.patch(
+        "src.app_utility.create_output_tables.get_current_season_information",
+        return_value=(False, "2024/25", team_ids, 5),
+    )
+    refresh_league = mocker.patch(
+        "src.app_utility.create_output_tables.refresh_league",
+        side_effect=lambda league_id: get_refreshed_league(),
+    )
+
+    built = create_output_tables.build_team_and_league_data(7)
+    # Only the seasons the caller uses are read from the store
+    stored = create_output_tables.build_team_and_league_data(7, season_start_year=2023)
+
+    assert refresh_league.call_count == 1
+    assert sorted(stored[1]) == sorted(get_refreshed_league()[2])
+    assert set(stored[6]["season_name"]) == {"2023/24"}
+    for built_table, stored_table in zip(
+        create_output_tables.get_team_and_league_data_filtered_summarised(
+            *[built[index] for index in [0, 1, 2, 5, 6]], 2023, built[8]
+        ),
+        create_output_tables.get_team_and_league_data_filtered_summarised(
+            *[stored[index] for index in [0, 1, 2, 5, 6]], 2023, stored[8]
+        ),
+    ):
+        if isinstance(built_table, pd.DataFrame):
+            # The apps hide the index
+            pd.testing.assert_frame_equal(
+                stored_table.reset_index(drop=True), built_table.reset_index(drop=True)
+            )
+        else:
+            assert stored_table == built_table
+
+
+def test_get_league_tables_streaming_crawls_once_per_league(mocker):
+    mocker.patch.dict(
+        "src.app_utility.create_output_tables.league_aggregates", clear=True
+    )
+    team_ids = pd.DataFrame({"id": [1, 2, 3], "name": ["Arsenal", "Spurs", "Burnley"]})
+    mocker.patch(
+        "src.app_utility.create_output_tables.get_current_season_information",
+        return_value=(False, "2024/25", team_ids, 5),
+    )
+
+    def fake_crawl_league(league_id, page_limit, season_history):
+        league_data, team_data, manager_information, builder = get_refreshed_league()
+        for team in team_data:
+            season_history.add_team(team=team, records=get_records(team["entry"]))
+        return league_data, team_data, manager_information, season_history
+
+    crawl_league = mocker.patch(
+        "src.app_utility.create_output_tables.crawl_league",
+        side_effect=fake_crawl_league,
+    )
+
+    all_seasons = create_output_tables.get_league_tables_streaming(7, 2022)
+    last_season = create_output_tables.get_league_tables_streaming(7, 2023)
+
+    assert crawl_league.call_count == 1
+    # All-time tables cover two seasons, then one
+    assert all_seasons[7]["Total Seasons Played"].tolist() == [2, 2, 2]
+    assert last_season[7]["Total Seasons Played"].tolist() == [1, 1, 1]
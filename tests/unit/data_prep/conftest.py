@@ -0,0 +1,34 @@
+import random
+import pytest
+from src.data_prep.entry_records import SeasonRecord
+
+
+@pytest.fixture
+def make_league():
+    """Returns a factory of standings rows and SeasonRecords for a random league."""
+
+    def make_league(number_of_teams, seed=0):
+        generator = random.Random(seed)
+        seasons = [f"{year}/{str(year + 1)[2:]}" for year in range(2012, 2024)]
+        ranks = {
+            season: generator.sample(range(1, 10**6), number_of_teams)
+            for season in seasons
+        }
+        league = []
+        for index in range(number_of_teams):
+            team = {
+                "entry": 100 + index,
+                "entry_name": f"Team {index}",
+                "player_name": f"Manager {index}",
+            }
+            first_season = generator.randrange(len(seasons))
+            records = tuple(
+                SeasonRecord(
+                    season, 2600 - ranks[season][index] // 1000, ranks[season][index]
+                )
+                for season in seasons[first_season:]
+            )
+            league.append((team, records))
+        return league
+
+    return make_league
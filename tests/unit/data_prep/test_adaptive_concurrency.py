@@ -0,0 +1,55 @@
+from src.data_prep.adaptive_concurrency import AIMDLimiter
+
+
+def make_limiter():
+    return AIMDLimiter(
+        initial=4,
+        minimum=1,
+        maximum=8,
+        increase=1,
+        decrease_factor=0.5,
+        spike_factor=4,
+    )
+
+
+def test_limit_increases_additively_and_is_capped():
+    limiter = make_limiter()
+
+    for _ in range(4):
+        ticket = limiter.acquire()
+        limiter.release(ticket, latency=0.1, outcome="ok")
+    assert limiter.get_limit() == 4
+
+    for _ in range(100):
+        ticket = limiter.acquire()
+        limiter.release(ticket, latency=0.1, outcome="ok")
+    assert limiter.get_limit() == 8
+
+
+def test_limit_decreases_on_throttling_and_latency_spikes():
+    limiter = make_limiter()
+    ticket = limiter.acquire()
+    limiter.release(ticket, latency=0.1, outcome="ok")
+
+    ticket = limiter.acquire()
+    limiter.release(ticket, latency=0.1, outcome="throttled")
+    assert limiter.get_limit() == 2
+
+    # Much slower than the smoothed latency
+    ticket = limiter.acquire()
+    limiter.release(ticket, latency=1.0, outcome="ok")
+    assert limiter.get_limit() == 1
+
+
+def test_concurrent_errors_decrease_the_limit_once():
+    limiter = make_limiter()
+    tickets = [limiter.acquire() for _ in range(4)]
+
+    for ticket in tickets:
+        limiter.release(ticket, latency=0.1, outcome="throttled")
+    assert limiter.get_limit() == 2
+
+    # A request started after the decrease can cut the limit again
+    ticket = limiter.acquire()
+    limiter.release(ticket, latency=0.1, outcome="throttled")
+    assert limiter.get_limit() == 1
@@ -0,0 +1,42 @@
+import threading
+import pytest
+from src.data_prep.crawl_cancellation import (
+    CrawlCancelled,
+    CrawlRegistry,
+    crawl_context,
+    raise_if_cancelled,
+)
+from src.data_prep.fetch_scheduler import FetchScheduler
+
+
+def test_new_crawl_cancels_previous_crawl_of_same_client():
+    registry = CrawlRegistry()
+    first = registry.start("client-a")
+    other_client = registry.start("client-b")
+    second = registry.start("client-a")
+
+    assert first.is_cancelled()
+    assert not second.is_cancelled()
+    assert not other_client.is_cancelled()
+
+    registry.finish("client-a", first)
+    assert registry.crawls["client-a"] is second
+
+
+def test_cancel_cancels_queued_fetches():
+    scheduler = FetchScheduler(max_workers=1)
+    registry = CrawlRegistry()
+    release = threading.Event()
+    scheduler.submit(release.wait)
+
+    handle = registry.start("client")
+    with crawl_context(handle):
+        queued = scheduler.submit(lambda: "ran")
+        registry.start("client")
+
+        assert queued.cancelled()
+        with pytest.raises(CrawlCancelled):
+            raise_if_cancelled()
+
+    release.set()
+    scheduler.shutdown()
@@ -0,0 +1,56 @@
+import json
+import pandas as pd
+from src.data_prep.entry_records import (
+    ManagerProfile,
+    SeasonRecord,
+    decode_manager_profile,
+    decode_season_records,
+)
+
+
+def test_decode_manager_profile():
+    body = json.dumps(
+        {
+            "id": 7,
+            "favourite_team": 3,
+            "player_first_name": "Ann",
+            "player_region_iso_code_long": "ENG",
+            "summary_overall_rank": 1234,
+            "leagues": {"classic": [{"id": 1, "name": "League"}]},
+        }
+    ).encode()
+
+    assert decode_manager_profile(body) == ManagerProfile(
+        entry=7,
+        summary_overall_rank=1234,
+        player_region_iso_code_long="ENG",
+        favourite_team=3,
+    )
+
+
+def test_decode_season_records():
+    body = json.dumps(
+        {
+            "current": [{"event": 1, "points": 60}],
+            "past": [
+                {"season_name": "2022/23", "total_points": 2100, "rank": 5000},
+                {"season_name": "2023/24", "total_points": 2300, "rank": 900},
+            ],
+            "chips": [{"name": "wildcard"}],
+        }
+    ).encode()
+
+    assert decode_season_records(body) == (
+        SeasonRecord("2022/23", 2100, 5000),
+        SeasonRecord("2023/24", 2300, 900),
+    )
+    assert decode_season_records(b'{"current": [], "past": [], "chips": []}') == ()
+
+
+def test_records_build_dataframes():
+    profiles = [ManagerProfile(1, 10, "ENG", 3), ManagerProfile(2, 20, None, None)]
+
+    df = pd.DataFrame(profiles)
+
+    assert list(df.columns) == list(ManagerProfile._fields)
+    assert df["summary_overall_rank"].tolist() == [10, 20]
@@ -0,0 +1,27 @@
+from src.data_prep.entry_store import EntryStore
+
+
+def test_get_profiles_returns_fresh_and_missing():
+    store = EntryStore(profile_ttl=100, history_ttl=1000, max_entries=10)
+    store.put_profile(1, {"entry": 1}, now=0)
+    store.put_profile(2, {"entry": 2}, now=0)
+
+    found, missing = store.get_profiles([1, 2, 3], now=50)
+    assert found == {1: {"entry": 1}, 2: {"entry": 2}}
+    assert missing == [3]
+
+    # Profiles go stale before histories
+    store.put_history(1, [{"season_name": "2022/23"}], now=0)
+    assert store.get_profiles([1], now=500) == ({}, [1])
+    assert store.get_histories([1], now=500) == ({1: [{"season_name": "2022/23"}]}, [])
+
+
+def test_least_recently_used_entries_are_evicted():
+    store = EntryStore(profile_ttl=100, history_ttl=100, max_entries=2)
+    store.put_profile(1, {}, now=0)
+    store.put_profile(2, {}, now=0)
+    store.get_profiles([1], now=1)
+    store.put_profile(3, {}, now=2)
+
+    assert len(store) == 2
+    assert store.get_profiles([1, 2, 3], now=3)[1] == [2]
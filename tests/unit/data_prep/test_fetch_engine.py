@@ -0,0 +1,43 @@
+import asyncio
+import threading
+import time
+from src.data_prep import fetch_engine
+
+
+def test_fetch_urls_ordered_and_unordered():
+    def fetch(url):
+        time.sleep(0.05 if url == "slow" else 0)
+        return url.upper()
+
+    ordered = fetch_engine.fetch_urls(["slow", "fast"], fetch=fetch, ordered=True)
+    unordered = fetch_engine.fetch_urls(["slow", "fast"], fetch=fetch, ordered=False)
+
+    assert ordered == [("slow", "SLOW"), ("fast", "FAST")]
+    assert unordered == [("fast", "FAST"), ("slow", "SLOW")]
+
+
+def test_fetch_urls_respects_concurrency_limit():
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def fetch(url):
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        return url
+
+    fetch_engine.fetch_urls([str(i) for i in range(20)], fetch=fetch, concurrency=3)
+
+    assert max_in_flight <= 3
+
+
+def test_run_coroutine_inside_running_loop():
+    async def caller():
+        return fetch_engine.fetch_urls(["a"], fetch=lambda url: url)
+
+    assert asyncio.run(caller()) == [("a", "a")]
@@ -0,0 +1,41 @@
+import threading
+from src.data_prep.fetch_scheduler import FetchScheduler, fetch_key_context
+
+
+def test_queues_are_served_round_robin():
+    scheduler = FetchScheduler(max_workers=1)
+    started = threading.Event()
+    release = threading.Event()
+    order = []
+
+    def block():
+        started.set()
+        release.wait()
+
+    with fetch_key_context("big-league"):
+        scheduler.submit(block)
+        started.wait()
+        big = [scheduler.submit(order.append, f"big-{i}") for i in range(4)]
+    with fetch_key_context("small-league"):
+        small = [scheduler.submit(order.append, f"small-{i}") for i in range(2)]
+
+    assert scheduler.queue_depth() == {"big-league": 4, "small-league": 2}
+
+    release.set()
+    for future in big + small:
+        future.result(timeout=5)
+
+    assert order == ["big-0", "small-0", "big-1", "small-1", "big-2", "big-3"]
+    scheduler.shutdown()
+
+
+def test_cancelled_fetches_do_not_run():
+    scheduler = FetchScheduler(max_workers=1)
+    release = threading.Event()
+    scheduler.submit(release.wait)
+    cancelled = scheduler.submit(lambda: "ran")
+
+    assert cancelled.cancel()
+    release.set()
+    scheduler.shutdown()
+    assert cancelled.cancelled()
@@ -0,0 +1,80 @@
+import concurrent.futures
+import time
+import pytest
+import requests
+from src.data_prep import hedging
+from src.data_prep.hedging import HedgeBudget, LatencyTracker
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(window=100)
+    assert tracker.percentile(percentile=90, min_samples=1) is None
+
+    for latency in range(1, 101):
+        tracker.record(latency / 100)
+
+    assert tracker.percentile(percentile=90, min_samples=50) == 0.91
+    assert tracker.percentile(percentile=90, min_samples=500) is None
+
+
+def test_hedge_budget_caps_hedges():
+    budget = HedgeBudget(max_fraction=0.1)
+    for _ in range(20):
+        budget.record_request()
+
+    assert [budget.try_hedge() for _ in range(3)] == [True, True, False]
+
+
+def test_hedged_call_uses_first_answer(mocker):
+    mocker.patch.dict(hedging.hedging_parameters, {"enabled": True})
+    mocker.patch("src.data_prep.hedging.get_hedge_delay", return_value=0.01)
+    mocker.patch("src.data_prep.hedging.hedge_budget", HedgeBudget(max_fraction=1))
+    calls = []
+
+    def request(url):
+        calls.append(url)
+        # The first call stalls, the hedge answers straight away
+        if len(calls) == 1:
+            time.sleep(0.5)
+            return "slow"
+        return "fast"
+
+    start = time.monotonic()
+    assert hedging.hedged_call(request, "url") == "fast"
+    assert time.monotonic() - start < 0.4
+    assert calls == ["url", "url"]
+
+
+def test_hedged_call_prefers_success_when_both_finish_together(mocker):
+    mocker.patch.dict(hedging.hedging_parameters, {"enabled": True})
+    mocker.patch("src.data_prep.hedging.get_hedge_delay", return_value=0.01)
+    mocker.patch("src.data_prep.hedging.hedge_budget", HedgeBudget(max_fraction=1))
+    primary = concurrent.futures.Future()
+    primary.set_exception(requests.ConnectionError("reset"))
+    hedge = concurrent.futures.Future()
+    hedge.set_result("answer")
+    executor = mocker.patch("src.data_prep.hedging.get_executor").return_value
+    executor.submit.side_effect = [primary, hedge]
+    # The primary is still running at the hedge delay, then both are done together
+    mocker.patch(
+        "concurrent.futures.wait",
+        side_effect=[(set(), {primary}), ([primary, hedge], set())],
+    )
+
+    assert hedging.hedged_call(lambda: None) == "answer"
+
+
+def test_hedged_call_raises_when_every_call_fails(mocker):
+    mocker.patch.dict(hedging.hedging_parameters, {"enabled": True})
+    mocker.patch("src.data_prep.hedging.get_hedge_delay", return_value=0.01)
+    mocker.patch("src.data_prep.hedging.hedge_budget", HedgeBudget(max_fraction=1))
+    calls = []
+
+    def request():
+        calls.append(1)
+        time.sleep(0.05)
+        raise requests.ConnectionError("reset")
+
+    with pytest.raises(requests.ConnectionError):
+        hedging.hedged_call(request)
+    assert len(calls) == 2
@@ -0,0 +1,26 @@
+from src.data_prep import http_client
+
+
+def test_get_session_is_shared():
+    http_client.reset_session()
+    session = http_client.get_session()
+
+    assert http_client.get_session() is session
+
+    adapter = session.get_adapter("https://fantasy.premierleague.com/api/")
+    assert adapter._pool_maxsize == http_client.fetch_concurrency
+
+    http_client.reset_session()
+    assert http_client.get_session() is not session
+
+
+def test_get_uses_default_timeouts(mocker):
+    session = mocker.MagicMock()
+    mocker.patch("src.data_prep.http_client.get_session", return_value=session)
+
+    http_client.get("https://fantasy.premierleague.com/api/bootstrap-static/")
+
+    session.get.assert_called_once_with(
+        "https://fantasy.premierleague.com/api/bootstrap-static/",
+        timeout=(http_client.connect_timeout, http_client.read_timeout),
+    )
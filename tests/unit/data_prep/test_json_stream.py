@@ -0,0 +1,35 @@
+import json
+import pytest
+from src.data_prep.json_stream import decode_selected_keys, skip_value
+
+
+def test_decode_selected_keys():
+    document = {
+        "chips": [{"name": "wildcard", "note": "a ] in a string"}],
+        "events": [{"id": 1, "deadline_time": "2024-08-16T17:30:00Z"}],
+        "game_settings": {"text": 'quotes \\" and { braces }'},
+        "total_players": 100,
+        "teams": [{"id": 1, "name": "Arsenal"}],
+        "elements": [{"id": 1, "web_name": "Saka"}],
+    }
+
+    for text in [json.dumps(document), json.dumps(document, indent=2)]:
+        assert decode_selected_keys(text.encode(), keys=["events", "teams"]) == {
+            "events": document["events"],
+            "teams": document["teams"],
+        }
+
+
+def test_decode_selected_keys_missing_key():
+    assert decode_selected_keys('{"a": 1, "b": [2]}', keys=["b", "c"]) == {"b": [2]}
+
+
+def test_decode_selected_keys_rejects_non_objects():
+    with pytest.raises(ValueError):
+        decode_selected_keys("[1, 2]", keys=["a"])
+
+
+def test_skip_value():
+    text = '{"a": [1, "]", {"b": "}"}], "c": 2}'
+    assert text[skip_value(text, 6) :] == ', "c": 2}'
+    assert skip_value(text, 0) == len(text)
@@ -0,0 +1,55 @@
+from src.data_prep import league_chunks
+from src.data_prep.entry_records import ManagerProfile, SeasonRecord
+
+
+def test_store_and_iter_chunks(mocker, tmp_path):
+    mocker.patch(
+        "src.data_prep.league_chunks.league_chunks_path",
+        str(tmp_path / "chunks.sqlite"),
+    )
+    for first_page, entry, has_next in [(1, 1, True), (3, 2, False)]:
+        league_chunks.store_chunk(
+            league_id=7,
+            first_page=first_page,
+            pages=2,
+            league_data={"league": {"name": "League"}, "standings": {}},
+            team_data=[{"entry": entry, "entry_name": "A", "player_name": "Ann"}],
+            manager_information=[ManagerProfile(entry, 10, "England", 1)],
+            histories={entry: (SeasonRecord("2023/24", 2000, 5),)},
+            complete=not has_next,
+            now=100,
+        )
+
+    state = league_chunks.get_crawl_state(7)
+    chunks = list(league_chunks.iter_chunks(7))
+
+    assert state == league_chunks.CrawlState(
+        league_data={"league": {"name": "League"}},
+        pages_done=4,
+        teams_done=2,
+        complete=True,
+        started_at=100,
+    )
+    assert [teams[0]["entry"] for teams, profiles, histories in chunks] == [1, 2]
+    assert chunks[1][1] == [ManagerProfile(2, 10, "England", 1)]
+    assert chunks[1][2] == {2: (SeasonRecord("2023/24", 2000, 5),)}
+
+    league_chunks.clear_league(7)
+    assert league_chunks.get_crawl_state(7) is None
+
+
+def test_get_progress_includes_chunk_in_progress(mocker, tmp_path):
+    mocker.patch(
+        "src.data_prep.league_chunks.league_chunks_path",
+        str(tmp_path / "chunks.sqlite"),
+    )
+    assert league_chunks.get_progress(7) is None
+
+    league_chunks.set_chunk_progress(7, pages=3, teams=150)
+    assert league_chunks.get_progress(7) == {
+        "pages": 3,
+        "teams": 150,
+        "complete": False,
+    }
+    league_chunks.set_chunk_progress(7, pages=None, teams=0)
+    assert league_chunks.get_progress(7) is None
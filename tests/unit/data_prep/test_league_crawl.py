@@ -0,0 +1,285 @@
+import json
+import logging
+import pytest
+import requests
+from src.data_prep import league_chunks, league_database, load_data
+from src.data_prep.entry_records import ManagerProfile, SeasonRecord
+from src.data_prep.entry_store import EntryStore
+from src.data_prep.league_crawl import (
+    EntryHistories,
+    crawl_league,
+    crawl_league_in_chunks,
+    refresh_league,
+)
+
+
+@pytest.fixture
+def fake_api(mocker):
+    mocker.patch(
+        "src.data_prep.load_data.get_current_season_information",
+        return_value=(False, "2024/25", None, 5),
+    )
+    pages = [
+        {
+            "league": {"name": "League"},
+            "standings": {
+                "has_next": True,
+                "results": [{"entry": 1, "entry_name": "A", "player_name": "Ann"}],
+            },
+        },
+        {
+            "standings": {
+                "has_next": False,
+                "results": [{"entry": 2, "entry_name": "B", "player_name": "Bob"}],
+            },
+        },
+    ]
+    mocker.patch("src.data_prep.load_data.iter_league_pages", return_value=iter(pages))
+    store = EntryStore(profile_ttl=100, history_ttl=100, max_entries=10)
+    mocker.patch("src.data_prep.entry_store.entry_store", store)
+    mocker.patch("src.data_prep.rate_limiter.get_backoff_delay", return_value=0)
+    return store
+
+
+def test_crawl_league_fetches_profiles_and_histories(mocker, fake_api):
+    attempts = []
+
+    def fake_fetch_response_body(url):
+        attempts.append(url)
+        entry = int(url.split("/")[5])
+        # The first history request for entry 2 fails and is retried at the end
+        if url.endswith("2/history/") and attempts.count(url) == 1:
+            raise load_data.RetryableFetchError(url)
+        if url.endswith("/history/"):
+            history = {
+                "current": [{"event": 1}],
+                "past": [
+                    {"season_name": "2023/24", "total_points": 2000, "rank": entry}
+                ],
+                "chips": [],
+            }
+            return json.dumps(history).encode()
+        profile = {"id": entry, "summary_overall_rank": entry * 10, "favourite_team": 1}
+        return json.dumps(profile).encode()
+
+    mocker.patch(
+        "src.data_prep.load_data.fetch_response_body",
+        side_effect=fake_fetch_response_body,
+    )
+
+    league_data, team_data, manager_information, season_history = crawl_league(1)
+
+    assert league_data["league"]["name"] == "League"
+    assert [team["entry"] for team in team_data] == [1, 2]
+    assert [manager.summary_overall_rank for manager in manager_information] == [
+        10,
+        20,
+    ]
+    assert season_history.to_dataframe().to_dict(orient="records") == [
+        {
+            "season_name": "2023/24",
+            "total_points": 2000,
+            "rank": 1,
+            "team_id": 1,
+            "team_name": "A",
+            "manager_name": "Ann",
+        },
+        {
+            "season_name": "2023/24",
+            "total_points": 2000,
+            "rank": 2,
+            "team_id": 2,
+            "team_name": "B",
+            "manager_name": "Bob",
+        },
+    ]
+
+
+def test_crawl_league_skips_stored_entries(mocker, fake_api):
+    fake_api.put_profile(1, ManagerProfile(1, 1, None, None))
+    fake_api.put_history(1, ())
+    fetch = mocker.patch(
+        "src.data_prep.load_data.fetch_response_body",
+        side_effect=lambda url: b'{"id": 2, "past": []}',
+    )
+
+    crawl_league(1)
+
+    assert sorted(call.args[0] for call in fetch.call_args_list) == [
+        "https://fantasy.premierleague.com/api/entry/2/",
+        "https://fantasy.premierleague.com/api/entry/2/history/",
+    ]
+
+
+def test_crawl_league_logs_revalidation_stats(mocker, fake_api, caplog):
+    mocker.patch(
+        "src.data_prep.load_data.fetch_response_body",
+        side_effect=lambda url: b'{"id": 1, "past": []}',
+    )
+    mocker.patch(
+        "src.data_prep.response_cache.get_revalidation_stats",
+        return_value={"history": {"not_modified": 7, "modified": 2, "no_validator": 1}},
+    )
+
+    with caplog.at_level(logging.INFO, logger="src.data_prep.league_crawl"):
+        crawl_league(1)
+
+    assert "history: 7 not modified, 2 refetched, 1 without validators" in caplog.text
+
+
+def test_crawl_league_streams_histories_into_collector(mocker, fake_api):
+    fake_api.put_history(1, (SeasonRecord("2023/24", 2000, 5),))
+    mocker.patch(
+        "src.data_prep.load_data.fetch_response_body",
+        side_effect=lambda url: b'{"id": 2, "past": [{"season_name": "2023/24", "total_points": 1900, "rank": 9}]}',
+    )
+    collector = mocker.Mock()
+
+    league_data, team_data, manager_information, season_history = crawl_league(
+        1, season_history=collector
+    )
+
+    assert season_history is collector
+    assert sorted(
+        (call.args[0]["entry"], call.args[1])
+        for call in collector.add_team.call_args_list
+    ) == [
+        (1, (SeasonRecord("2023/24", 2000, 5),)),
+        (2, (SeasonRecord("2023/24", 1900, 9),)),
+    ]
+    # Streamed histories are still kept in the entry store
+    assert fake_api.get_histories([2]) == ({2: (SeasonRecord("2023/24", 1900, 9),)}, [])
+
+
+def test_crawl_league_reuses_streamed_histories_in_another_league(mocker, fake_api):
+    pages = list(load_data.iter_league_pages.return_value)
+    mocker.patch(
+        "src.data_prep.load_data.iter_league_pages",
+        side_effect=lambda **kwargs: iter(pages),
+    )
+    fetch = mocker.patch(
+        "src.data_prep.load_data.fetch_response_body",
+        side_effect=lambda url: b'{"id": 1, "past": []}',
+    )
+
+    # Two leagues share both members
+    crawl_league(1, season_history=EntryHistories())
+    fetch.reset_mock()
+    league_data, team_data, manager_information, season_history = crawl_league(
+        2, season_history=EntryHistories()
+    )
+
+    assert fetch.call_count == 0
+    assert season_history == {1: (), 2: ()}
+
+
+def test_crawl_league_in_chunks_resumes_after_failure(mocker, tmp_path):
+    mocker.patch(
+        "src.data_prep.league_chunks.league_chunks_path",
+        str(tmp_path / "chunks.sqlite"),
+    )
+    mocker.patch(
+        "src.data_prep.load_data.get_current_season_information",
+        return_value=(False, "2024/25", None, 5),
+    )
+    calls = []
+
+    def fake_crawl_league(league_id, page_limit, season_history, first_page, on_page):
+        calls.append(first_page)
+        # The second chunk fails the first time it is crawled
+        if first_page == 3 and calls.count(3) == 1:
+            raise requests.HTTPError("interrupted")
+        team_data = []
+        for page in range(first_page, min(first_page + page_limit, 6)):
+            team = {"entry": page, "entry_name": f"T{page}", "player_name": f"M{page}"}
+            team_data.append(team)
+            season_history.add_team(team, (SeasonRecord("2023/24", 2000, page),))
+            on_page({"standings": {"has_next": page < 5, "results": [team]}})
+        league_data = {"league": {"name": "League"}}
+        profiles = [ManagerProfile(team["entry"], 1, None, None) for team in team_data]
+        return league_data, team_data, profiles, season_history
+
+    mocker.patch(
+        "src.data_prep.league_crawl.crawl_league", side_effect=fake_crawl_league
+    )
+
+    with pytest.raises(requests.HTTPError):
+        crawl_league_in_chunks(1, chunk_pages=2)
+    state = crawl_league_in_chunks(1, chunk_pages=2)
+
+    assert calls == [1, 3, 3, 5]
+    assert (state.pages_done, state.teams_done, state.complete) == (5, 5, True)
+    chunks = list(league_chunks.iter_chunks(1))
+    assert [team["entry"] for teams, _, _ in chunks for team in teams] == [
+        1,
+        2,
+        3,
+        4,
+        5,
+    ]
+    assert chunks[2][2] == {5: (SeasonRecord("2023/24", 2000, 5),)}
+
+
+def test_refresh_league_fetches_only_new_members(mocker, fake_api, tmp_path):
+    mocker.patch(
+        "src.data_prep.league_database.league_database_path",
+        str(tmp_path / "leagues.sqlite"),
+    )
+    members = [1, 2]
+
+    def fake_iter_league_pages(**kwargs):
+        results = [
+            {"entry": entry, "entry_name": f"T{entry}", "player_name": f"M{entry}"}
+            for entry in members
+        ]
+        yield {
+            "league": {"name": "League"},
+            "standings": {"has_next": False, "results": results},
+        }
+
+    mocker.patch(
+        "src.data_prep.load_data.iter_league_pages", side_effect=fake_iter_league_pages
+    )
+
+    def fake_fetch_response_body(url):
+        entry = int(url.split("/")[5])
+        if url.endswith("/history/"):
+            return json.dumps(
+                {
+                    "past": [
+                        {"season_name": "2023/24", "total_points": 2000, "rank": entry}
+                    ]
+                }
+            ).encode()
+        return json.dumps({"id": entry, "summary_overall_rank": entry}).encode()
+
+    fetch = mocker.patch(
+        "src.data_prep.load_data.fetch_response_body",
+        side_effect=fake_fetch_response_body,
+    )
+
+    refresh_league(1)
+    assert fetch.call_count == 4
+
+    # Entry 1 leaves and entry 3 joins within the same gameweek
+    fetch.reset_mock()
+    fake_api.entries.clear()
+    members[:] = [2, 3]
+    league_data, team_data, manager_information, season_history = refresh_league(1)
+
+    assert sorted(call.args[0] for call in fetch.call_args_list) == [
+        "https://fantasy.premierleague.com/api/entry/3/",
+        "https://fantasy.premierleague.com/api/entry/3/history/",
+    ]
+    assert [profile.entry for profile in manager_information] == [2, 3]
+    assert season_history.to_dataframe()["rank"].tolist() == [2, 3]
+    assert [team["entry"] for team in league_database.read_team_data(1)] == [2, 3]
+
+    # The first build of another league reuses entries the first league stored
+    fetch.reset_mock()
+    fake_api.entries.clear()
+    members[:] = [1, 3]
+    league_data, team_data, manager_information, season_history = refresh_league(2)
+
+    assert fetch.call_count == 0
+    assert season_history.to_dataframe()["rank"].tolist() == [1, 3]
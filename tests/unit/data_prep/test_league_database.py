@@ -0,0 +1,157 @@
+import pandas as pd
+from src.data_prep import league_database
+from src.data_prep.entry_records import ManagerProfile, SeasonRecord
+from src.data_prep.reshape_data import (
+    summarise_season_current,
+    summarise_season_history,
+)
+from src.data_prep.season_history import SeasonHistoryBuilder
+
+
+def get_league(entries):
+    team_data = [
+        {
+            "id": 100 + entry,
+            "event_total": 50,
+            "player_name": f"Manager {entry}",
+            "rank": position,
+            "last_rank": position,
+            "rank_sort": position,
+            "total": 400 - entry,
+            "entry": entry,
+            "entry_name": f"Team {entry}",
+        }
+        for position, entry in enumerate(entries, start=1)
+    ]
+    manager_information = [
+        ManagerProfile(entry, 1000 * entry, "England", 3 if entry % 2 else None)
+        for entry in entries
+    ]
+    histories = {
+        entry: tuple(
+            SeasonRecord(season_name, 2000 + entry, rank * entry)
+            for season_name, rank in [("2021/22", 700), ("2022/23", 300)][entry % 2 :]
+        )
+        for entry in entries
+    }
+    return team_data, manager_information, histories
+
+
+def test_read_league_tables_match_summaries(mocker, tmp_path):
+    mocker.patch(
+        "src.data_prep.league_database.league_database_path",
+        str(tmp_path / "leagues.sqlite"),
+    )
+    team_ids = pd.DataFrame({"id": [3, 4], "name": ["Arsenal", "Chelsea"]})
+    assert league_database.read_league_tables(7, team_ids=team_ids) is None
+
+    # Entry 2 is a member of both leagues
+    for league_id, entries in [(8, [2, 5]), (7, [3, 1, 2])]:
+        team_data, manager_information, histories = get_league(entries)
+        league_database.save_league(
+            league_id=league_id,
+            league_name=f"League {league_id}",
+            season_name="2024/25",
+            gameweek=5,
+            final_gw_finished=False,
+            team_data=team_data,
+            manager_information=manager_information,
+            histories=histories,
+            now=100,
+        )
+    season_history = SeasonHistoryBuilder()
+    for team in team_data:
+        season_history.add_team(team=team, records=histories[team["entry"]])
+
+    tables = league_database.read_league_tables(
+        7, team_ids=team_ids, max_age=60, now=130
+    )
+
+    assert tables["league_name"] == "League 7"
+    assert tables["current_gamekweek"] == "5"
+    assert tables["manager_information"] == manager_information
+    pd.testing.assert_frame_equal(
+        tables["season_history_df"],
+        summarise_season_history(season_history=season_history),
+    )
+    pd.testing.assert_frame_equal(
+        tables["season_current_df"],
+        summarise_season_current(
+            league_data=None,
+            team_data=team_data,
+            manager_information=manager_information,
+            current_season_year="2024/25",
+            team_ids=team_ids,
+        ),
+    )
+    assert (
+        league_database.read_league_tables(7, team_ids=team_ids, max_age=60, now=200)
+        is None
+    )
+
+
+def test_save_league_replaces_membership(mocker, tmp_path):
+    mocker.patch(
+        "src.data_prep.league_database.league_database_path",
+        str(tmp_path / "leagues.sqlite"),
+    )
+    for entries in [[1, 2, 3], [2, 4]]:
+        team_data, manager_information, histories = get_league(entries)
+        league_database.save_league(
+            league_id=7,
+            league_name="League",
+            season_name="2024/25",
+            gameweek=5,
+            final_gw_finished=False,
+            team_data=team_data,
+            manager_information=manager_information,
+            histories=histories,
+        )
+
+    assert [team["entry"] for team in league_database.read_team_data(7)] == [2, 4]
+    assert set(league_database.read_season_history_df(7)["team_id"]) == {2, 4}
+
+
+def test_get_known_entries_by_season_and_gameweek(mocker, tmp_path):
+    mocker.patch(
+        "src.data_prep.league_database.league_database_path",
+        str(tmp_path / "leagues.sqlite"),
+    )
+    assert league_database.get_known_entries([1, 2], "2024/25", 5) == ({}, {})
+
+    # Entry 2 has no past seasons, its profile and the history of entry 3 failed to fetch
+    team_data, manager_information, histories = get_league([1, 2, 3])
+    league_database.save_league(
+        league_id=7,
+        league_name="League",
+        season_name="2024/25",
+        gameweek=5,
+        final_gw_finished=False,
+        team_data=team_data,
+        manager_information=[p for p in manager_information if p.entry != 2],
+        histories={1: histories[1], 2: ()},
+    )
+    # Another league saves entry 1 again in the next gameweek, and entry 5
+    team_data, manager_information, other_histories = get_league([1, 5])
+    league_database.save_league(
+        league_id=8,
+        league_name="Other league",
+        season_name="2024/25",
+        gameweek=6,
+        final_gw_finished=False,
+        team_data=team_data,
+        manager_information=manager_information,
+        histories=other_histories,
+    )
+
+    entry_ids = [1, 2, 3, 4, 5]
+    known_profiles, known_histories = league_database.get_known_entries(
+        entry_ids, "2024/25", 5
+    )
+    assert known_profiles == {3: ManagerProfile(3, 3000, "England", 3)}
+    assert known_histories == {1: histories[1], 2: (), 5: other_histories[5]}
+    assert league_database.get_known_entries(entry_ids, "2024/25", 6)[0] == {
+        1: ManagerProfile(1, 1000, "England", 3),
+        5: ManagerProfile(5, 5000, "England", 3),
+    }
+    assert league_database.get_known_entries(entry_ids, "2025/26", 1) == ({}, {})
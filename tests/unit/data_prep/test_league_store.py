@@ -0,0 +1,275 @@
+import os
+import shutil
+import pandas as pd
+from src.data_prep import league_store, reshape_data
+from src.data_prep.output_league_seasons_history import (
+    filter_rehsaped_season_history,
+    get_seasons_by_top_three_teams,
+)
+from src.data_prep.reshape_data import summarise_season_history
+
+
+def test_write_and_read_league_tables(mocker, tmp_path):
+    mocker.patch("src.data_prep.league_store.league_store_path", str(tmp_path))
+    season_history_df = summarise_season_history(
+        [
+            {
+                "season_name": season_name,
+                "total_points": 2000 + team_id,
+                "rank": rank,
+                "team_id": team_id,
+                "team_name": f"Team {team_id}",
+                "manager_name": f"Manager {team_id}",
+            }
+            for season_name, team_id, rank in [
+                ("2021/22", 1, 500),
+                ("2021/22", 2, 100),
+                ("2022/23", 1, 50),
+                ("2022/23", 2, 900),
+                ("2023/24", 2, 10),
+            ]
+        ]
+    )
+    season_current_df = pd.DataFrame(
+        {
+            "season_name": ["2024/25", "2024/25"],
+            "total_points": [300, 280],
+            "rank": [1000, None],
+            "team_id": [2, 1],
+            "team_name": ["Team 2", "Team 1"],
+            "manager_name": ["Manager 2", "Manager 1"],
+            "league_position": [1, 2],
+            "nationality": ["England", None],
+            "favourite_team": [3, None],
+        }
+    )
+
+    assert league_store.read_league_tables(league_id=7) is None
+    for league_id in [7, 8]:
+        league_store.write_league_tables(
+            league_id=league_id,
+            league_name="League",
+            season_name="2024/25",
+            season_history_df=season_history_df,
+            season_current_df=season_current_df,
+            final_gw_finished=False,
+            current_gamekweek=5,
+            now=100,
+        )
+
+    tables = league_store.read_league_tables(league_id=7, max_age=60, now=130)
+
+    assert tables["league_name"] == "League"
+    assert tables["current_gamekweek"] == "5"
+    pd.testing.assert_frame_equal(tables["season_history_df"], season_history_df)
+    pd.testing.assert_frame_equal(tables["season_current_df"], season_current_df)
+    assert league_store.read_league_tables(league_id=7, max_age=60, now=200) is None
+
+
+def test_read_table_selects_columns_and_seasons(mocker, tmp_path):
+    mocker.patch("src.data_prep.league_store.league_store_path", str(tmp_path))
+    df = pd.DataFrame(
+        {
+            "season_name": ["2018/19", "2019/20", "2020/21"],
+            "total_points": [1, 2, 3],
+            "rank": [1, 2, 3],
+            "team_id": [1, 1, 1],
+            "team_name": ["A", "A", "A"],
+            "manager_name": ["Ann", "Ann", "Ann"],
+            "league_position": [1, 1, 1],
+        }
+    )
+    league_store.write_table("season_history", 7, df)
+
+    result = league_store.read_table(
+        "season_history", 7, columns=["season_name", "rank"], season_start_year=2019
+    )
+
+    assert result.to_dict(orient="list") == {
+        "season_name": ["2019/20", "2020/21"],
+        "rank": [2, 3],
+    }
+
+
+def test_read_league_tables_in_compact_schema(mocker, tmp_path):
+    mocker.patch("src.data_prep.league_store.league_store_path", str(tmp_path))
+    mocker.patch("src.data_prep.reshape_data.compact_schema", True)
+    season_history_df = summarise_season_history(
+        [
+            {
+                "season_name": "2022/23",
+                "total_points": 2000,
+                "rank": 5,
+                "team_id": 1,
+                "team_name": "Team 1",
+                "manager_name": "Manager 1",
+            }
+        ]
+    )
+    season_current_df = reshape_data.compact_season_dataframe(
+        pd.DataFrame(
+            {
+                "season_name": ["2024/25"],
+                "total_points": [300],
+                "rank": [1000],
+                "team_id": [1],
+                "team_name": ["Team 1"],
+                "manager_name": ["Manager 1"],
+                "league_position": [1],
+                "nationality": ["England"],
+                "favourite_team": [3],
+            }
+        )
+    )
+    league_store.write_league_tables(
+        league_id=7,
+        league_name="League",
+        season_name="2024/25",
+        season_history_df=season_history_df,
+        season_current_df=season_current_df,
+        final_gw_finished=False,
+        current_gamekweek=5,
+        now=100,
+    )
+
+    tables = league_store.read_league_tables(league_id=7, max_age=60, now=130)
+
+    pd.testing.assert_frame_equal(tables["season_history_df"], season_history_df)
+    pd.testing.assert_frame_equal(tables["season_current_df"], season_current_df)
+
+
+def test_filtered_read_matches_fresh_build_in_compact_schema(mocker, tmp_path):
+    mocker.patch("src.data_prep.league_store.league_store_path", str(tmp_path))
+    mocker.patch("src.data_prep.reshape_data.compact_schema", True)
+    season_history_df = summarise_season_history(
+        [
+            {
+                "season_name": season_name,
+                "total_points": 2000 + team_id,
+                "rank": rank,
+                "team_id": team_id,
+                "team_name": f"Team {team_id}",
+                "manager_name": f"Manager {team_id}",
+            }
+            for season_name, team_id, rank in [
+                ("2021/22", 1, 500),
+                ("2021/22", 2, 100),
+                ("2022/23", 1, 50),
+                ("2022/23", 2, 900),
+                ("2023/24", 2, 10),
+            ]
+        ]
+    )
+    league_store.write_league_tables(
+        league_id=7,
+        league_name="League",
+        season_name="2024/25",
+        season_history_df=season_history_df,
+        season_current_df=reshape_data.compact_season_dataframe(
+            pd.DataFrame(
+                {
+                    "season_name": ["2024/25"],
+                    "total_points": [300],
+                    "rank": [1000],
+                    "team_id": [1],
+                    "team_name": ["Team 1"],
+                    "manager_name": ["Manager 1"],
+                    "league_position": [1],
+                    "nationality": ["England"],
+                    "favourite_team": [3],
+                }
+            )
+        ),
+        final_gw_finished=False,
+        current_gamekweek=5,
+        now=100,
+    )
+
+    tables = league_store.read_league_tables(
+        league_id=7, max_age=60, season_start_year=2022, now=130
+    )
+
+    fresh_df = filter_rehsaped_season_history(
+        season_start_year=2022, df=season_history_df
+    )
+    assert tables["season_history_df"]["season_name"].dtype == (
+        fresh_df["season_name"].dtype
+    )
+    pd.testing.assert_frame_equal(
+        get_seasons_by_top_three_teams(tables["season_history_df"]),
+        get_seasons_by_top_three_teams(fresh_df.reset_index(drop=True)),
+    )
+
+
+def test_read_league_tables_while_table_is_replaced(mocker, tmp_path):
+    mocker.patch("src.data_prep.league_store.league_store_path", str(tmp_path))
+    season_history_df = summarise_season_history(
+        [
+            {
+                "season_name": "2022/23",
+                "total_points": 2000,
+                "rank": 5,
+                "team_id": 1,
+                "team_name": "Team 1",
+                "manager_name": "Manager 1",
+            }
+        ]
+    )
+    season_current_df = pd.DataFrame(
+        columns=league_store.table_columns["season_current"]
+    )
+    league_store.write_league_tables(
+        league_id=7,
+        league_name="League",
+        season_name="2024/25",
+        season_history_df=season_history_df,
+        season_current_df=season_current_df,
+        final_gw_finished=False,
+        current_gamekweek=5,
+        now=100,
+    )
+
+    # Only the league's partition directories are left, with no staging directories
+    assert sorted(os.listdir(tmp_path / "season_history")) == ["league_id=7"]
+    assert os.listdir(tmp_path / "season_current") == []
+    tables = league_store.read_league_tables(league_id=7, max_age=60, now=130)
+    assert len(tables["season_history_df"]) == 1
+    assert len(tables["season_current_df"]) == 0
+
+    # Between the renames of another process's write, the partitions are missing
+    shutil.rmtree(tmp_path / "season_history" / "league_id=7")
+    assert league_store.read_league_tables(league_id=7, max_age=60, now=130) is None
+
+
+def test_write_table_retries_when_another_writer_swaps_first(mocker, tmp_path):
+    mocker.patch("src.data_prep.league_store.league_store_path", str(tmp_path))
+    league_path = str(tmp_path / "season_history" / "league_id=7")
+    rename = os.rename
+    raced = []
+
+    def racing_rename(source, destination):
+        # Another process puts its partitions in place just before the first swap
+        if destination == league_path and not raced:
+            raced.append(source)
+            os.makedirs(os.path.join(league_path, "season_name=2021%2F22"))
+            open(os.path.join(league_path, "season_name=2021%2F22", "x"), "w").close()
+        rename(source, destination)
+
+    mocker.patch("src.data_prep.league_store.os.rename", side_effect=racing_rename)
+    season_history_df = summarise_season_history(
+        [
+            {
+                "season_name": "2022/23",
+                "total_points": 2000,
+                "rank": 5,
+                "team_id": 1,
+                "team_name": "Team 1",
+                "manager_name": "Manager 1",
+            }
+        ]
+    )
+
+    league_store.write_table("season_history", 7, season_history_df)
+
+    assert os.listdir(tmp_path / "season_history") == ["league_id=7"]
+    assert os.listdir(league_path) == ["season_name=2022%2F23"]
@@ -0,0 +1,307 @@
+import datetime
+import pytest
+import pandas as pd
+import requests
+from src.data_prep import response_cache
+from src.data_prep.entry_records import SeasonRecord
+from src.data_prep.entry_store import EntryStore
+from src.data_prep.rate_limiter import TokenBucket
+from src.data_prep.load_data import (
+    fetch_league_pages,
+    fetch_response_body,
+    fetch_season_records,
+    fetch_url,
+    fetch_urls_concurrently,
+    fetch_urls_concurrently_with_url,
+    clear_current_season_information,
+    get_current_season_information,
+    get_league_data_from_urls,
+    get_league_history,
+    get_season_information_expiry,
+    iter_league_pages,
+    RetryableFetchError,
+    stream_league_standings,
+)
+
+
+def make_fake_league(number_of_pages, results_key="standings"):
+    """Returns a fake fetch_url serving `number_of_pages` pages and the requested URLs."""
+    requested = []
+
+    def fake_fetch_url(url):
+        requested.append(url)
+        page = int(url.split("=")[-1])
+        if page > number_of_pages:
+            return {results_key: {"has_next": False, "results": []}}
+        return {
+            "league": {"name": "League"},
+            results_key: {
+                "has_next": page < number_of_pages,
+                "results": [{"entry": page}],
+            },
+        }
+
+    return fake_fetch_url, requested
+
+
+def test_iter_league_pages_starts_from_first_page(mocker):
+    fake_fetch_url, requested = make_fake_league(number_of_pages=10)
+    mocker.patch("src.data_prep.load_data.fetch_json", side_effect=fake_fetch_url)
+
+    pages = iter_league_pages(
+        league_id=1,
+        page_parameter="page_standings",
+        results_key="standings",
+        page_limit=3,
+        window=4,
+        first_page=5,
+    )
+
+    assert [page["standings"]["results"][0]["entry"] for page in pages] == [5, 6, 7]
+    assert sorted(int(url.split("=")[-1]) for url in requested) == [5, 6, 7]
+
+
+def test_iter_league_pages_raises_on_failed_page(mocker):
+    fake_fetch_url, requested = make_fake_league(number_of_pages=5)
+
+    def flaky_fetch_url(url):
+        # Page 3 keeps failing after its retries
+        return None if url.endswith("=3") else fake_fetch_url(url)
+
+    mocker.patch("src.data_prep.load_data.fetch_json", side_effect=flaky_fetch_url)
+
+    pages = iter_league_pages(
+        league_id=1,
+        page_parameter="page_standings",
+        results_key="standings",
+        page_limit=None,
+        window=2,
+    )
+
+    assert next(pages)["standings"]["results"][0]["entry"] == 1
+    assert next(pages)["standings"]["results"][0]["entry"] == 2
+    with pytest.raises(requests.HTTPError, match="page 3 of league 1"):
+        next(pages)
+
+
+def test_fetch_league_pages_returns_pages_in_order(mocker):
+    fake_fetch_url, requested = make_fake_league(number_of_pages=6)
+    mocker.patch("src.data_prep.load_data.fetch_json", side_effect=fake_fetch_url)
+
+    pages = fetch_league_pages(
+        league_id=1,
+        page_parameter="page_standings",
+        results_key="standings",
+        page_limit=10,
+        window=4,
+    )
+
+    assert [page["standings"]["results"][0]["entry"] for page in pages] == [
+        1,
+        2,
+        3,
+        4,
+        5,
+        6,
+    ]
+    # Each page is requested once, plus at most one window of look-ahead pages
+    assert len(requested) == len(set(requested))
+    assert 6 <= len(requested) <= 10
+
+
+def test_fetch_league_pages_respects_page_limit(mocker):
+    fake_fetch_url, requested = make_fake_league(
+        number_of_pages=20, results_key="new_entries"
+    )
+    mocker.patch("src.data_prep.load_data.fetch_json", side_effect=fake_fetch_url)
+
+    pages = fetch_league_pages(
+        league_id=1,
+        page_parameter="page_new_entries",
+        results_key="new_entries",
+        page_limit=3,
+        window=4,
+    )
+
+    assert len(pages) == 3
+    assert all("page_new_entries" in url for url in requested)
+    assert len(requested) == 3
+
+
+def test_fetch_urls_concurrently_keeps_url_order(mocker):
+    mocker.patch(
+        "src.data_prep.load_data.fetch_json",
+        side_effect=lambda url: None if url == "b" else {"url": url},
+    )
+
+    assert fetch_urls_concurrently(["a", "b", "c"]) == [{"url": "a"}, {"url": "c"}]
+
+
+def test_stream_league_standings_yields_results_per_page(mocker):
+    fake_fetch_url, requested = make_fake_league(number_of_pages=3)
+    mocker.patch("src.data_prep.load_data.fetch_json", side_effect=fake_fetch_url)
+
+    stream = stream_league_standings(league_id=1, page_limit=10, window=2)
+
+    assert next(stream) == [{"entry": 1}]
+    assert list(stream) == [[{"entry": 2}], [{"entry": 3}]]
+
+
+def test_get_league_data_from_urls_fetches_each_page_once(mocker):
+    fake_fetch_url, requested = make_fake_league(number_of_pages=2)
+    mocker.patch("src.data_prep.load_data.fetch_json", side_effect=fake_fetch_url)
+
+    league_data, team_data = get_league_data_from_urls(league_id=1)
+
+    assert league_data["standings"]["results"] == [{"entry": 1}]
+    assert team_data == [{"entry": 1}, {"entry": 2}]
+    assert len(requested) == len(set(requested))
+
+
+@pytest.mark.parametrize("engine", ["asyncio", "threads"])
+def test_fetch_urls_concurrently_with_url_engines(mocker, engine):
+    mocker.patch("src.data_prep.load_data.fetch_engine_name", engine)
+    mocker.patch(
+        "src.data_prep.load_data.fetch_json",
+        side_effect=lambda url: None if url == "b" else {"url": url},
+    )
+
+    results = fetch_urls_concurrently_with_url(["a", "b", "c"])
+
+    assert results == [
+        {"url": "a", "data": {"url": "a"}},
+        {"url": "c", "data": {"url": "c"}},
+    ]
+
+
+def test_get_current_season_information_is_cached(mocker):
+    clear_current_season_information()
+    events = [{"deadline_time": "2099-08-16T17:30:00Z"}]
+    season_information = (False, "2099/00", pd.DataFrame({"id": [1], "name": ["A"]}), 1)
+    fetch = mocker.patch(
+        "src.data_prep.load_data.fetch_current_season_information",
+        return_value=(season_information, events),
+    )
+
+    first = get_current_season_information()
+    second = get_current_season_information()
+
+    assert fetch.call_count == 1
+    assert first[1] == second[1] == "2099/00"
+    pd.testing.assert_frame_equal(first[2], second[2])
+
+    clear_current_season_information()
+    get_current_season_information()
+    assert fetch.call_count == 2
+    clear_current_season_information()
+
+
+def test_get_season_information_expiry():
+    events = [
+        {"deadline_time": "2024-08-16T17:30:00Z"},
+        {"deadline_time": "2024-08-24T10:00:00Z"},
+    ]
+    now = datetime.datetime(
+        2024, 8, 24, 9, 30, tzinfo=datetime.timezone.utc
+    ).timestamp()
+
+    # Next deadline is 30 minutes away
+    assert get_season_information_expiry(events=events, now=now) == now + 1800
+
+    # No deadlines left, so the maximum TTL is used
+    later = now + 10 * 24 * 3600
+    assert get_season_information_expiry(events=events, now=later) > later
+
+
+def test_fetch_url_serves_cache_hits_without_network(mocker):
+    entry = response_cache.CacheEntry(b'{"id": 1}', float("inf"), None, None)
+    mocker.patch("src.data_prep.response_cache.get_cache_entry", return_value=entry)
+    get = mocker.patch("src.data_prep.http_client.get")
+
+    assert fetch_url("https://fantasy.premierleague.com/api/entry/1/") == {"id": 1}
+    get.assert_not_called()
+
+
+def test_fetch_url_revalidates_expired_entries(mocker):
+    entry = response_cache.CacheEntry(b'{"id": 1}', 0.0, '"abc"', None)
+    mocker.patch("src.data_prep.response_cache.get_cache_entry", return_value=entry)
+    refresh = mocker.patch("src.data_prep.response_cache.refresh_response")
+    record = mocker.patch("src.data_prep.response_cache.record_revalidation")
+    get = mocker.patch("src.data_prep.http_client.get")
+    get.return_value.status_code = 304
+
+    url = "https://fantasy.premierleague.com/api/entry/1/"
+    assert fetch_url(url) == {"id": 1}
+    get.assert_called_once_with(url, headers={"If-None-Match": '"abc"'})
+    refresh.assert_called_once_with(url)
+    record.assert_called_once_with(url, "not_modified")
+
+
+@pytest.mark.parametrize("status_code", [403, 429, 503])
+def test_throttled_responses_slow_the_rate_limiter(mocker, status_code):
+    mocker.patch("src.data_prep.response_cache.get_cache_entry", return_value=None)
+    mocker.patch("src.data_prep.adaptive_concurrency.concurrency_limiter")
+    bucket = TokenBucket(max_rate=20, min_rate=1, burst=20)
+    mocker.patch("src.data_prep.rate_limiter.rate_limiter", bucket)
+    get = mocker.patch("src.data_prep.http_client.get")
+    get.return_value.status_code = status_code
+    get.return_value.headers = {}
+
+    with pytest.raises(RetryableFetchError):
+        fetch_response_body("https://fantasy.premierleague.com/api/entry/1/")
+    assert bucket.rate == 10
+
+
+@pytest.mark.parametrize("engine", ["asyncio", "threads"])
+def test_failed_urls_are_retried_at_end_of_batch(mocker, engine):
+    mocker.patch("src.data_prep.load_data.fetch_engine_name", engine)
+    mocker.patch("src.data_prep.rate_limiter.get_backoff_delay", return_value=0)
+    attempts = {"b": 0, "c": 0}
+
+    def flaky_fetch_json(url):
+        if url in attempts:
+            attempts[url] += 1
+            # "b" recovers on its second attempt, "c" never does
+            if url == "c" or attempts[url] < 2:
+                raise RetryableFetchError(url)
+        return {"url": url}
+
+    mocker.patch("src.data_prep.load_data.fetch_json", side_effect=flaky_fetch_json)
+    mocker.patch("src.data_prep.load_data.max_retry_attempts", 3)
+    mocker.patch("src.data_prep.load_data.retry_budget", 2)
+
+    results = fetch_urls_concurrently(["a", "b", "c"])
+
+    assert results == [{"url": "a"}, {"url": "b"}]
+    # The budget of two retries is shared by "b" and "c"
+    assert attempts == {"b": 2, "c": 2}
+
+
+def test_get_league_history_only_fetches_missing_entries(mocker):
+    store = EntryStore(profile_ttl=100, history_ttl=100, max_entries=10)
+    store.put_history(1, (SeasonRecord("2022/23", 2100, 5),))
+    mocker.patch("src.data_prep.entry_store.entry_store", store)
+    fetch = mocker.patch(
+        "src.data_prep.load_data.fetch_urls_concurrently_with_url",
+        return_value=[
+            {
+                "url": "https://fantasy.premierleague.com/api/entry/2/history/",
+                "data": (SeasonRecord("2022/23", 1900, 9),),
+            }
+        ],
+    )
+    team_data = [
+        {"entry": 1, "entry_name": "Team A", "player_name": "Manager A"},
+        {"entry": 2, "entry_name": "Team B", "player_name": "Manager B"},
+    ]
+
+    league_history = get_league_history(team_data=team_data)
+
+    fetch.assert_called_once_with(
+        urls=["https://fantasy.premierleague.com/api/entry/2/history/"],
+        fetch=fetch_season_records,
+    )
+    league_history_df = league_history.to_dataframe()
+    assert league_history_df["team_name"].tolist() == ["Team A", "Team B"]
+    assert league_history_df["rank"].tolist() == [5, 9]
+    assert store.get_histories([2])[0][2] == (SeasonRecord("2022/23", 1900, 9),)
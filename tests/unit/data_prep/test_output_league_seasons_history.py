@@ -0,0 +1,123 @@
+import pandas as pd
+import pytest
+from src.data_prep.entry_records import ManagerProfile
+from src.data_prep.output_league_seasons_history import (
+    add_manager_details_and_rank,
+    get_season_overview,
+)
+from src.data_prep.reshape_data import (
+    compact_season_dataframe,
+    summarise_season_history,
+)
+
+
+def get_season_overview_reference(df, manager_information, team_ids):
+    """The groupby, apply and merge implementation get_season_overview replaced."""
+
+    def get_seasons_by_positions(df, position, column_name):
+        return (
+            df[df["league_position"] == position]
+            .groupby(["team_name", "manager_name"], observed=True)["season_name"]
+            .apply(lambda x: ", ".join(map(str, x)))
+            .reset_index(name=column_name)
+        )
+
+    max_points_season_index = df.groupby("team_name", observed=True)[
+        "total_points"
+    ].idxmax()
+    max_points_season_df = df.loc[
+        max_points_season_index, ["team_name", "manager_name", "season_name"]
+    ].rename(columns={"season_name": "max_points_season_year"})
+    min_rank_season_index = df.groupby("team_name", observed=True)["rank"].idxmin()
+    min_rank_season_df = df.loc[
+        min_rank_season_index, ["team_name", "manager_name", "season_name"]
+    ].rename(columns={"season_name": "min_rank_season_year"})
+    seasons_played = (
+        df.groupby(["team_name", "manager_name"], observed=True)["season_name"]
+        .apply(lambda x: ", ".join(map(str, x)))
+        .reset_index(name="seasons_played_years")
+    )
+    seasons_overview = (
+        df.groupby(["team_id", "team_name", "manager_name"], observed=True)
+        .agg(
+            seasons_won=("league_position", lambda x: (x == 1).sum()),
+            seasons_runner_up=("league_position", lambda x: (x == 2).sum()),
+            seasons_third=("league_position", lambda x: (x == 3).sum()),
+            seasons_played=("season_name", "nunique"),
+            maximum_points=("total_points", "max"),
+            minimum_rank=("rank", "min"),
+        )
+        .reset_index()
+    )
+    keys = ["team_name", "manager_name"]
+    seasons_overview = (
+        seasons_overview.merge(right=max_points_season_df, on=keys, how="left")
+        .merge(right=min_rank_season_df, on=keys, how="left")
+        .merge(right=seasons_played, on=keys, how="left")
+        .merge(
+            right=get_seasons_by_positions(df, 1, "seasons_won_years"),
+            on=keys,
+            how="left",
+        )
+        .merge(
+            right=get_seasons_by_positions(df, 2, "seasons_runner_up_years"),
+            on=keys,
+            how="left",
+        )
+        .merge(
+            right=get_seasons_by_positions(df, 3, "seasons_third_years"),
+            on=keys,
+            how="left",
+        )
+    )
+    return add_manager_details_and_rank(seasons_overview, manager_information, team_ids)
+
+
+def get_history_df(league, renamed_teams):
+    return summarise_season_history(
+        [
+            dict(
+                record._asdict(),
+                team_id=team["entry"],
+                team_name=renamed_teams.get(team["entry"], team["entry_name"]),
+                manager_name=team["player_name"],
+            )
+            for team, records in league
+            for record in records
+        ]
+    )
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize(
+    "number_of_teams, renamed_teams",
+    [
+        (60, {}),
+        # Two managers with the same team name, and one manager with two entries
+        (60, {101: "Team 0", 103: "Team 2"}),
+        # Nobody finishes third
+        (2, {}),
+    ],
+)
+def test_get_season_overview_matches_reference(
+    make_league, compact, number_of_teams, renamed_teams
+):
+    league = make_league(number_of_teams=number_of_teams)
+    for team, records in league[:3]:
+        team["player_name"] = "Manager 0"
+    manager_information = [
+        ManagerProfile(team["entry"], 1000, "England", team["entry"] % 4)
+        for team, records in league
+    ]
+    team_ids = pd.DataFrame({"id": [1, 2, 3], "name": ["Arsenal", "Spurs", "Burnley"]})
+    df = get_history_df(league, renamed_teams)
+    # Tied points and ranks within a team
+    df.loc[df["team_id"] == 100, ["total_points", "rank"]] = [2000, 5000]
+    if compact:
+        df = compact_season_dataframe(df)
+
+    pd.testing.assert_frame_equal(
+        get_season_overview(df, manager_information, team_ids),
+        get_season_overview_reference(df, manager_information, team_ids),
+        check_dtype=True,
+    )
@@ -0,0 +1,59 @@
+import email.utils
+import time
+from src.data_prep.rate_limiter import TokenBucket, get_backoff_delay, parse_retry_after
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+    retry_at = email.utils.formatdate(time.time() + 60, usegmt=True)
+    assert 55 <= parse_retry_after(retry_at) <= 60
+
+
+def test_get_backoff_delay_is_capped():
+    for attempt in range(20):
+        assert 0 <= get_backoff_delay(attempt) <= 30
+
+
+def test_token_bucket_adapts_rate():
+    bucket = TokenBucket(max_rate=8, min_rate=1, burst=2, recovery_step=0.5)
+
+    bucket.on_throttled()
+    bucket.on_throttled()
+    assert bucket.rate == 2
+
+    for _ in range(100):
+        bucket.limited = True
+        bucket.on_success()
+    assert bucket.rate == 8
+
+    for _ in range(10):
+        bucket.on_throttled()
+    assert bucket.rate == 1
+
+
+def test_token_bucket_never_exceeds_max_rate():
+    bucket = TokenBucket(max_rate=20, min_rate=1, burst=2, recovery_step=0.5)
+
+    # Successes without requests waiting on the bucket leave the rate alone
+    bucket.on_throttled()
+    bucket.on_success()
+    assert bucket.rate == 10
+
+    for _ in range(100):
+        bucket.limited = True
+        bucket.on_success()
+    assert bucket.rate == 20
+
+
+def test_token_bucket_limits_burst():
+    bucket = TokenBucket(max_rate=50, min_rate=1, burst=2)
+
+    start = time.monotonic()
+    for _ in range(4):
+        bucket.acquire()
+
+    # Two tokens are available straight away, the other two take 1/50s each
+    assert time.monotonic() - start >= 0.03
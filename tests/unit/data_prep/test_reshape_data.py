@@ -0,0 +1,86 @@
+import pandas as pd
+from src.app_utility.create_output_tables import (
+    get_team_and_league_data_filtered_summarised,
+)
+from src.data_prep.entry_records import ManagerProfile
+from src.data_prep.reshape_data import (
+    summarise_season_current,
+    summarise_season_history,
+)
+
+
+def get_output_tables(league):
+    team_data = [
+        dict(team, id=team["entry"] - 99, total=2000 - index, rank=index + 1)
+        for index, (team, records) in enumerate(league)
+    ]
+    manager_information = [
+        ManagerProfile(team["entry"], 1000, "England", team["entry"] % 3 + 1)
+        for team in team_data
+    ]
+    team_ids = pd.DataFrame({"id": [1, 2, 3], "name": ["Arsenal", "Spurs", "Burnley"]})
+    season_history_df = summarise_season_history(
+        [
+            dict(
+                record._asdict(),
+                team_id=team["entry"],
+                team_name=team["entry_name"],
+                manager_name=team["player_name"],
+            )
+            for team, records in league
+            for record in records
+        ]
+    )
+    season_current_df = summarise_season_current(
+        league_data=None,
+        team_data=team_data,
+        manager_information=manager_information,
+        current_season_year="2024/25",
+        team_ids=team_ids,
+    )
+    output_tables = get_team_and_league_data_filtered_summarised(
+        league_data={"league": {"name": "League"}},
+        manager_information=manager_information,
+        team_ids=team_ids,
+        season_current_df=season_current_df,
+        season_history_df=season_history_df,
+        season_start_year=2015,
+        team_data=team_data,
+    )
+    return season_history_df, season_current_df, output_tables
+
+
+def test_compact_schema_keeps_output_tables(mocker, make_league):
+    league = make_league(number_of_teams=40)
+    season_history_df, season_current_df, output_tables = get_output_tables(league)
+    mocker.patch("src.data_prep.reshape_data.compact_schema", True)
+    compact_history_df, compact_current_df, compact_output_tables = get_output_tables(
+        league
+    )
+
+    assert compact_history_df["team_name"].dtype == "category"
+    assert compact_history_df["season_name"].dtype.ordered
+    assert compact_history_df["rank"].dtype == "int32"
+    assert compact_history_df["season_start"].dtype == "int16"
+    assert (
+        compact_history_df.memory_usage(deep=True).sum()
+        < season_history_df.memory_usage(deep=True).sum() / 2
+    )
+    pd.testing.assert_frame_equal(
+        compact_current_df.drop(columns="season_start"),
+        season_current_df,
+        check_dtype=False,
+        check_categorical=False,
+    )
+    for compact_output, output in zip(compact_output_tables, output_tables):
+        if isinstance(output, pd.DataFrame):
+            pd.testing.assert_frame_equal(
+                compact_output,
+                output,
+                check_dtype=False,
+                check_categorical=False,
+                check_column_type=False,
+                check_index_type=False,
+            )
+        else:
+            assert compact_output == output
@@ -0,0 +1,82 @@
+import pytest
+from src.data_prep import response_cache
+
+
+@pytest.fixture
+def cache_path(tmp_path, mocker):
+    path = str(tmp_path / "responses.sqlite")
+    mocker.patch("src.data_prep.response_cache.response_cache_path", path)
+    mocker.patch("src.data_prep.response_cache.response_cache_enabled", True)
+    mocker.patch(
+        "src.data_prep.response_cache.response_cache_ttl",
+        {"history": 1000, "entry": 100, "standings": 10},
+    )
+    return path
+
+
+def test_canonical_url():
+    assert (
+        response_cache.canonical_url(
+            "HTTPS://Fantasy.PremierLeague.com/api/leagues-classic/1/standings?page_standings=2&a=1"
+        )
+        == "https://fantasy.premierleague.com/api/leagues-classic/1/standings/?a=1&page_standings=2"
+    )
+
+
+def test_get_endpoint_family():
+    base = "https://fantasy.premierleague.com/api"
+    assert response_cache.get_endpoint_family(f"{base}/entry/1/history/") == "history"
+    assert response_cache.get_endpoint_family(f"{base}/entry/1/") == "entry"
+    assert (
+        response_cache.get_endpoint_family(
+            f"{base}/leagues-classic/1/standings/?page_standings=1"
+        )
+        == "standings"
+    )
+    assert response_cache.get_endpoint_family(f"{base}/fixtures/") is None
+
+
+def test_store_and_get_cache_entry(cache_path):
+    url = "https://fantasy.premierleague.com/api/entry/1/"
+    response_cache.store_response(url, b'{"id": 1}', now=0)
+
+    entry = response_cache.get_cache_entry(url)
+    assert (entry.body, entry.expires_at) == (b'{"id": 1}', 100)
+
+    # Endpoints without a TTL are never stored
+    other_url = "https://fantasy.premierleague.com/api/fixtures/"
+    response_cache.store_response(other_url, b"[]", now=0)
+    assert response_cache.get_cache_entry(other_url) is None
+
+    assert response_cache.clear_expired_responses(now=150) == 1
+
+
+def test_store_response_prunes_long_expired_entries(cache_path, mocker):
+    mocker.patch("src.data_prep.response_cache._store_count", 0)
+    mocker.patch("src.data_prep.response_cache.response_cache_prune_every", 3)
+    mocker.patch("src.data_prep.response_cache.response_cache_prune_after", 1000)
+    base = "https://fantasy.premierleague.com/api/entry"
+    for entry in range(4):
+        response_cache.store_response(f"{base}/{entry}/", b"{}", now=entry * 600)
+
+    # The fourth store, at 1800, prunes entries that expired by 800 and keeps entry 2,
+    # which expired at 1300, for revalidation
+    assert response_cache.get_cache_entry(f"{base}/0/") is None
+    assert response_cache.get_cache_entry(f"{base}/1/") is None
+    assert response_cache.get_cache_entry(f"{base}/2/").expires_at == 1300
+
+
+def test_refresh_response_and_revalidation_stats(cache_path):
+    url = "https://fantasy.premierleague.com/api/entry/1/history/"
+    response_cache.store_response(url, b"{}", etag='"v1"', now=0)
+
+    entry = response_cache.get_cache_entry(url)
+    assert response_cache.get_conditional_headers(entry) == {"If-None-Match": '"v1"'}
+
+    response_cache.refresh_response(url, now=5000)
+    assert response_cache.get_cache_entry(url).expires_at == 6000
+
+    before = response_cache.get_revalidation_stats().get("history", {})
+    response_cache.record_revalidation(url, "not_modified")
+    after = response_cache.get_revalidation_stats()["history"]
+    assert after["not_modified"] == before.get("not_modified", 0) + 1
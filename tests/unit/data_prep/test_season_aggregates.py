@@ -0,0 +1,70 @@
+import random
+import pandas as pd
+from src.data_prep.entry_records import ManagerProfile, SeasonRecord
+from src.data_prep.output_league_seasons_history import (
+    filter_rehsaped_season_history,
+    get_all_time_table,
+    get_season_overview,
+    get_seasons_by_top_three_teams,
+)
+from src.data_prep.output_league_summary import get_best_rank_points
+from src.data_prep.reshape_data import summarise_season_history
+from src.data_prep.season_aggregates import SeasonAggregator
+from src.data_prep.season_history import SeasonHistoryBuilder
+
+
+def test_season_aggregator_matches_full_history(make_league):
+    league = make_league(number_of_teams=40)
+    manager_information = [
+        ManagerProfile(team["entry"], 1000, "England", team["entry"] % 3 + 1)
+        for team, records in league
+    ]
+    team_ids = pd.DataFrame({"id": [1, 2, 3], "name": ["Arsenal", "Spurs", "Burnley"]})
+
+    builder = SeasonHistoryBuilder()
+    for team, records in league:
+        builder.add_team(team=team, records=records)
+    season_history_df = summarise_season_history(builder)
+
+    # One aggregator serves every start year
+    aggregator = SeasonAggregator()
+    for team, records in random.Random(1).sample(league, len(league)):
+        aggregator.add_team(team=team, records=records)
+
+    for season_start_year in [2012, 2015, 2021]:
+        df = filter_rehsaped_season_history(
+            season_start_year=season_start_year, df=season_history_df
+        )
+        podium_df = aggregator.get_podium_df(season_start_year)
+
+        pd.testing.assert_frame_equal(
+            aggregator.get_season_overview(
+                manager_information, team_ids, season_start_year
+            ),
+            get_season_overview(df, manager_information, team_ids),
+        )
+        pd.testing.assert_frame_equal(
+            aggregator.get_all_time_table(season_start_year), get_all_time_table(df)
+        )
+        pd.testing.assert_frame_equal(
+            get_seasons_by_top_three_teams(podium_df),
+            get_seasons_by_top_three_teams(df),
+        )
+        for column in ["rank", "total_points"]:
+            assert get_best_rank_points(podium_df, column) == get_best_rank_points(
+                df, column
+            )
+
+
+def test_season_aggregator_keeps_ties_on_the_podium():
+    aggregator = SeasonAggregator()
+    for entry, rank in enumerate([50, 10, 40, 40, 20, 90]):
+        team = {"entry": entry, "entry_name": f"T{entry}", "player_name": f"M{entry}"}
+        aggregator.add_team(team=team, records=(SeasonRecord("2023/24", 2000, rank),))
+
+    podium_df = aggregator.get_podium_df()
+
+    # Tied third and fourth places both truncate to third, as in summarise_season_history
+    assert podium_df["team_id"].tolist() == [1, 4, 2, 3]
+    assert podium_df["league_position"].tolist() == [1, 2, 3, 3]
+    assert len(aggregator) == 6
@@ -0,0 +1,49 @@
+import pandas as pd
+from src.data_prep.entry_records import SeasonRecord
+from src.data_prep.reshape_data import summarise_season_history
+from src.data_prep.season_history import SeasonHistoryBuilder, season_history_columns
+
+
+def test_season_history_builder():
+    builder = SeasonHistoryBuilder()
+    builder.add_team(
+        team={"entry": 1, "entry_name": "Team A", "player_name": "Manager A"},
+        records=(SeasonRecord("2022/23", 2100, 900), SeasonRecord("2023/24", 2200, 50)),
+    )
+    builder.add_team(
+        team={"entry": 2, "entry_name": "Team B", "player_name": "Manager B"},
+        records=(),
+    )
+
+    df = builder.to_dataframe()
+
+    assert len(builder) == 2
+    assert list(df.columns) == season_history_columns
+    assert df["team_name"].tolist() == ["Team A", "Team A"]
+    assert df["rank"].tolist() == [900, 50]
+
+
+def test_summarise_season_history_accepts_builder():
+    teams = [
+        ({"entry": 1, "entry_name": "A", "player_name": "Ann"}, 900),
+        ({"entry": 2, "entry_name": "B", "player_name": "Bob"}, 50),
+    ]
+    builder = SeasonHistoryBuilder()
+    rows = []
+    for team, rank in teams:
+        builder.add_team(team=team, records=(SeasonRecord("2023/24", 2000, rank),))
+        rows.append(
+            {
+                "season_name": "2023/24",
+                "total_points": 2000,
+                "rank": rank,
+                "team_id": team["entry"],
+                "team_name": team["entry_name"],
+                "manager_name": team["player_name"],
+            }
+        )
+
+    pd.testing.assert_frame_equal(
+        summarise_season_history(builder), summarise_season_history(rows)
+    )
+    assert summarise_season_history(builder)["team_name"].tolist() == ["B", "A"]
@@ -0,0 +1,42 @@
+import threading
+import time
+import pytest
+from src.data_prep.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_computation():
+    flight = SingleFlight()
+    calls = []
+
+    def slow_function(value):
+        calls.append(value)
+        time.sleep(0.05)
+        return {"value": value}
+
+    results = []
+
+    def caller():
+        results.append(flight.do("key", slow_function, 1))
+
+    threads = [threading.Thread(target=caller) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert [result for result, shared in results].count({"value": 1}) == 5
+    assert [shared for result, shared in results].count(False) == 1
+    assert flight.in_flight() == 0
+
+
+def test_errors_are_shared_and_key_is_released():
+    flight = SingleFlight()
+
+    def failing_function():
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        flight.do("key", failing_function)
+
+    assert flight.do("key", lambda: 1) == (1, False)
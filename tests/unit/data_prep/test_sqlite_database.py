@@ -0,0 +1,27 @@
+import threading
+
+from src.data_prep import sqlite_database
+
+
+def test_get_connection_per_thread_and_path(mocker, tmp_path):
+    path = str(tmp_path / "stores" / "test.sqlite")
+    schema = ["CREATE TABLE IF NOT EXISTS items (id INTEGER PRIMARY KEY)"]
+    migrate = mocker.Mock()
+
+    connection = sqlite_database.get_connection(path, schema, migrate=migrate)
+    assert sqlite_database.get_connection(path, schema, migrate=migrate) is connection
+    assert migrate.call_count == 1
+    assert connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    assert connection.execute("SELECT COUNT(*) FROM items").fetchone() == (0,)
+
+    other_path = str(tmp_path / "other.sqlite")
+    assert sqlite_database.get_connection(other_path, schema) is not connection
+
+    connections = []
+    thread = threading.Thread(
+        target=lambda: connections.append(sqlite_database.get_connection(path, schema))
+    )
+    thread.start()
+    thread.join()
+    assert connections[0] is not connection
+    assert migrate.call_count == 1